@@ -0,0 +1,80 @@
+"""
+임베딩 저장소(embedding_store) 마이크로벤치마크
+
+사용법: python benchmarks/bench_embedding_store.py [--rows 1000,5000,20000] [--dim 768] [--number 50]
+무작위 정규화 벡터로 임시 저장소를 만들어 행 수/dtype별로
+다시 여는 시간, 상위 k 코사인 검색 시간(행렬곱 + argpartition), 기존 방식(파이썬 float 리스트 + 전체 정렬)을 비교합니다.
+시작 전에 상위 k 결과가 전체 정렬 결과와 같은지 확인합니다.
+"""
+import sys
+import time
+import timeit
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from embedding_store import EmbeddingStore, normalize, top_k_cosine  # noqa: E402
+
+
+def legacy_top_k(vectors, query, k):
+    """기존 방식 (비교용) - 리스트 내적 후 전체 정렬"""
+    scores = [sum(a * b for a, b in zip(vector, query)) for vector in vectors]
+    return sorted(range(len(scores)), key=lambda i: -scores[i])[:k]
+
+
+def check_equivalence(rng: np.random.Generator, k: int = 10):
+    matrix = normalize(rng.standard_normal((2000, 64)))
+    query = normalize(rng.standard_normal(64))[0]
+    expected = list(np.argsort(-(matrix @ query), kind="stable")[:k])
+    assert [row for row, _ in top_k_cosine(matrix, query, k)] == expected
+    print(f"✅ 상위 {k}개 일치: 2,000행 x 64차원")
+
+
+def bench(func, number: int) -> float:
+    """호출당 평균 시간 (밀리초)"""
+    best = min(timeit.repeat(func, number=number, repeat=5))
+    return best / number * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description='임베딩 저장소 마이크로벤치마크')
+    parser.add_argument('--rows', default='1000,5000,20000', help='행 수 목록')
+    parser.add_argument('--dim', type=int, default=768, help='임베딩 차원')
+    parser.add_argument('--number', '-n', type=int, default=50, help='반복 횟수')
+    parser.add_argument('-k', type=int, default=10, help='상위 k')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    check_equivalence(rng)
+
+    print(f"{'dtype':>7} | {'행 수':>7} | {'열기(ms)':>9} | {'검색(ms)':>9} | {'기존(ms)':>10} | {'디스크(MB)':>10}")
+    print("-" * 68)
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in (int(value) for value in args.rows.split(',')):
+            vectors = rng.standard_normal((rows, args.dim)).astype(np.float32)
+            keys = [f"{i:064x}" for i in range(rows)]
+            query = vectors[rows // 2]
+            # 기존 방식은 느리므로 1,000행까지만 측정
+            legacy = None
+            if rows <= 1000:
+                as_lists = normalize(vectors).tolist()
+                query_list = normalize(query)[0].tolist()
+                legacy = bench(lambda: legacy_top_k(as_lists, query_list, args.k), 1)
+            for dtype in ("float32", "float16"):
+                path = Path(workdir) / f"{dtype}-{rows}"
+                EmbeddingStore(str(path), model="bench", dtype=dtype).add(keys, vectors)
+                started = time.perf_counter()
+                store = EmbeddingStore(str(path))
+                opened = (time.perf_counter() - started) * 1e3
+                search = bench(lambda: store.search(query, args.k), args.number)
+                size = (path / "vectors.npy").stat().st_size / 2**20
+                legacy_text = f"{legacy:>10.1f}" if legacy is not None else f"{'-':>10}"
+                print(f"{dtype:>7} | {rows:>7,} | {opened:>9.2f} | {search:>9.3f} | {legacy_text} | {size:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+근거 압축(evidence_compress) 예산 확인 및 마이크로벤치마크
+
+사용법: python benchmarks/bench_evidence_compress.py [--number 20] [--budget 1500] [--cases 300]
+시작 전에 문장 부호 없는 긴 본문, 짧은 줄만 있는 본문, 일반 본문을 섞은 무작위 섹션 묶음으로
+압축 결과(대안인 섹션별 자르기 포함)가 쿼리당 토큰 예산을 넘지 않는지 확인하고,
+페이지 수별 compress_sections 호출 비용과 압축 비율을 출력합니다.
+"""
+import sys
+import random
+import timeit
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from evidence_compress import compress_sections, estimate_tokens, truncate_sections  # noqa: E402
+
+SENTENCES = [
+    "인공지능 모델 경량화 기술은 최근 2년 사이 빠르게 발전하고 있습니다.",
+    "전문가들은 향후 시장 규모가 두 배 이상 성장할 것으로 전망합니다.",
+    "Recent studies show steady adoption across industries with measurable gains.",
+    "주요 기업들은 데이터 센터 전력 효율을 높이기 위해 투자를 확대하고 있다.",
+    "The report highlights case studies from healthcare, finance and manufacturing.",
+]
+TOPIC = "인공지능 모델 경량화 시장 전망"
+
+
+def random_word(rng: random.Random) -> str:
+    """한글 음절 2~4개짜리 무작위 단어 (문장 부호 없는 본문용)"""
+    return "".join(chr(0xAC00 + rng.randrange(2000)) for _ in range(rng.randint(2, 4)))
+
+
+def build_section(rng: random.Random, kind: str, size: int) -> str:
+    """kind: unpunctuated(문장 부호/줄바꿈 없는 본문), short_lines(짧은 줄만), normal(일반 문장)"""
+    if kind == "unpunctuated":
+        return " ".join(random_word(rng) for _ in range(size // 3))
+    if kind == "short_lines":
+        return "\n".join(random_word(rng) for _ in range(size // 3))
+    # 같은 문장이 반복되면 중복 제거로 거의 다 빠지므로 문장마다 무작위 단어를 덧붙임
+    return " ".join(f"{rng.choice(SENTENCES)[:-1]} {' '.join(random_word(rng) for _ in range(6))}."
+                    for _ in range(max(1, size // 60)))
+
+
+def body_tokens(sections) -> int:
+    return sum(estimate_tokens(body) for _, body in sections)
+
+
+def check_budget(rng: random.Random, count: int, budget: int):
+    """무작위 섹션 묶음에서 압축 결과가 예산을 넘지 않는지 확인 (고를 문장이 없으면 섹션별 자르기)"""
+    for i in range(count):
+        case_budget = rng.choice([1, 50, budget // 3, budget])
+        sections = [(f"📄 {n}\n", build_section(rng, rng.choice(["unpunctuated", "short_lines", "normal"]),
+                                                rng.choice([100, 2000, 8000])))
+                    for n in range(rng.randint(1, 6))]
+        compressed, stats = compress_sections(sections, TOPIC, case_budget)
+        if not compressed:
+            compressed = truncate_sections(sections, case_budget)
+        tokens = body_tokens(compressed)
+        assert tokens <= case_budget, (i, case_budget, tokens)
+        assert not stats.compressed_tokens or stats.compressed_tokens == tokens, (i, stats.compressed_tokens, tokens)
+    # 리뷰에서 재현된 경우: 문장 부호 없는 한국어 본문 두 개 (~2.4k 토큰씩)
+    sections = [(f"📄 {n}\n", build_section(rng, "unpunctuated", 7200)) for n in (1, 2)]
+    compressed, stats = compress_sections(sections, TOPIC, budget)
+    assert compressed and stats.compressed_tokens <= budget, (stats.compressed_tokens, budget)
+    print(f"✅ 예산 확인: 무작위 섹션 묶음 {count}개, 문장 부호 없는 본문 {body_tokens(sections)} → "
+          f"{stats.compressed_tokens} 토큰 (예산 {budget})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='근거 압축 예산 확인 및 마이크로벤치마크')
+    parser.add_argument('--number', '-n', type=int, default=20, help='반복 횟수')
+    parser.add_argument('--budget', type=int, default=1500, help='쿼리당 토큰 예산')
+    parser.add_argument('--cases', type=int, default=300, help='예산 확인용 무작위 섹션 묶음 수')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    check_budget(rng, args.cases, args.budget)
+
+    print(f"{'페이지':>6} | {'원문 토큰':>9} | {'압축 토큰':>9} | {'비율':>6} | {'호출(ms)':>9}")
+    print("-" * 52)
+    for pages in (1, 3, 5, 10):
+        sections = [(f"📄 {n}\n", build_section(rng, "normal", 3000)) for n in range(pages)]
+        _, stats = compress_sections(sections, TOPIC, args.budget)
+        best = min(timeit.repeat(lambda: compress_sections(sections, TOPIC, args.budget),
+                                 number=args.number, repeat=3))
+        print(f"{pages:>6} | {stats.original_tokens:>9,} | {stats.compressed_tokens:>9,} | {stats.ratio:>6.3f} | "
+              f"{best / args.number * 1e3:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
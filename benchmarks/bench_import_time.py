@@ -0,0 +1,98 @@
+"""
+시작 시간 벤치마크 (python -X importtime 기반)
+
+사용법:
+  python benchmarks/bench_import_time.py                   # main, dnd 임포트 시간 측정
+  python benchmarks/bench_import_time.py --save-baseline   # 현재 결과를 기준값으로 저장
+  python benchmarks/bench_import_time.py --tolerance 0.3   # 기준값 대비 30% 초과 시 실패
+
+무거운 모듈(crewai, litellm, pydantic, requests)이 시작 시점에 임포트되거나
+기준값 대비 임포트 시간이 허용 범위를 넘으면 종료 코드 1을 반환합니다.
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BASELINE_FILE = Path(__file__).resolve().parent / "import_time_baseline.json"
+
+# 시작 시점에 임포트되면 안 되는 모듈
+HEAVY_MODULES = ("crewai", "litellm", "pydantic", "requests")
+
+ENTRY_MODULES = ("main", "dnd")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str):
+    """-X importtime 출력 파싱 - (최상위 누적 시간(µs), {모듈: 누적 시간})"""
+    # logs/, saves/ 디렉터리가 저장소에 생기지 않도록 임시 디렉터리에서 실행
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, PYTHONPATH=str(REPO_ROOT), PYTHONDONTWRITEBYTECODE="1")
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=workdir, env=env, capture_output=True, text=True
+        )
+    if proc.returncode != 0:
+        raise RuntimeError(f"'{module}' 임포트 실패:\n{proc.stderr[-2000:]}")
+
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative.get(module, 0), cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description='main.py / dnd.py 시작 시간 벤치마크')
+    parser.add_argument('--runs', '-n', type=int, default=5, help='측정 반복 횟수 (중앙값 사용)')
+    parser.add_argument('--top', type=int, default=10, help='가장 느린 모듈 표시 개수')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='기준값 대비 허용 증가율')
+    parser.add_argument('--save-baseline', action='store_true', help='측정 결과를 기준값으로 저장')
+    args = parser.parse_args()
+
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    results = {}
+    failed = False
+
+    for module in ENTRY_MODULES:
+        samples = []
+        cumulative = {}
+        for _ in range(args.runs):
+            total, cumulative = measure(module)
+            samples.append(total)
+        median_ms = statistics.median(samples) / 1000
+        results[module] = median_ms
+
+        print(f"\n📦 import {module}: {median_ms:.1f}ms (중앙값, {args.runs}회)")
+        slowest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        for name, micros in slowest:
+            print(f"   {micros / 1000:8.1f}ms  {name}")
+
+        loaded_heavy = [name for name in HEAVY_MODULES if name in cumulative]
+        if loaded_heavy:
+            print(f"   ❌ 시작 시점에 무거운 모듈 임포트됨: {', '.join(loaded_heavy)}")
+            failed = True
+
+        if module in baseline:
+            limit = baseline[module] * (1 + args.tolerance)
+            status = "✅" if median_ms <= limit else "❌"
+            print(f"   {status} 기준값 {baseline[module]:.1f}ms (허용 {limit:.1f}ms)")
+            failed = failed or median_ms > limit
+
+    if args.save_baseline:
+        BASELINE_FILE.write_text(json.dumps(results, indent=2))
+        print(f"\n💾 기준값 저장: {BASELINE_FILE}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+오프라인 엔드투엔드 벤치마크 (스텁 LLM 서버 + 가짜 검색/웹 페이지)
+
+사용법:
+  python benchmarks/bench_offline.py                          # 모든 시나리오 실행
+  python benchmarks/bench_offline.py -s game -s unified       # 일부 시나리오만
+  python benchmarks/bench_offline.py --latency 0.2 --tps 50   # 느린 서버 모델링
+  python benchmarks/bench_offline.py --save-baseline          # 현재 결과를 기준값으로 저장
+  python benchmarks/bench_offline.py --tolerance 0.3          # 기준값 대비 30% 초과 시 실패
+
+시나리오:
+  game     DnDGameEngine.process_input 턴 처리
+  unified  UnifiedResearchCrew.research
+  improved ImprovedResearchCrew.run_research (에이전트 모드)
+  pipeline ImprovedResearchCrew.run_research (파이프라인 모드 - 리서처 에이전트 생략)
+  study    study/study.py UniversalResearchCrew.research
+  codegen  study/codegen.py 알고리즘 문제 생성 크루
+  session  study/dnd_game.py 캐릭터/캠페인 생성 크루
+
+실제 LLM 서버와 DuckDuckGo 없이 같은 조건에서 반복 측정할 수 있도록
+모든 LLM 호출은 StubLLMServer로, DDGS는 FakeDDGS로 향한다.
+기준값 대비 지연 시간이 허용 범위를 넘으면 종료 코드 1을 반환합니다.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BASELINE_FILE = Path(__file__).resolve().parent / "offline_baseline.json"
+
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from stub_backends import StubLLMServer, FakeDDGS  # noqa: E402
+
+SCENARIOS = ("game", "unified", "improved", "pipeline", "study", "codegen", "session")
+
+
+def configure_environment(server: StubLLMServer):
+    """저장소 모듈 임포트 전에 LLM 설정을 스텁 서버로 지정"""
+    os.environ["DEFAULT_URL"] = server.base_url
+    os.environ["DEFAULT_LLM"] = "stub-model"
+    os.environ["DEFAULT_API_KEY"] = "benchmark"
+    os.environ["FAST_START"] = "false"
+    os.environ.setdefault("METRICS_FILE", "")
+    os.environ["OTEL_SDK_DISABLED"] = "true"
+    os.environ["CREWAI_DISABLE_TELEMETRY"] = "true"
+    # 검색은 FakeDDGS만 사용 (실행 간 로컬 검색 인덱스가 쌓여 결과가 달라지지 않게)
+    os.environ.setdefault("SEARCH_PROVIDERS", "ddgs")
+    # 검색 계획 캐시를 쓰지 않음 (반복 실행마다 계획 단계까지 측정)
+    os.environ.setdefault("PLANNER_CACHE", "0")
+    # LiteLLM 모델 가격표 원격 다운로드 생략 (오프라인 실행)
+    os.environ["LITELLM_LOCAL_MODEL_COST_MAP"] = "True"
+
+
+@contextlib.contextmanager
+def quiet(enabled: bool):
+    """CrewAI verbose 출력 숨기기"""
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def summarize(samples):
+    from metrics import Histogram
+    histogram = Histogram()
+    for value in samples:
+        histogram.add(value)
+    return histogram.summary()
+
+
+# ===== 시나리오 =====
+def run_game(args):
+    from game_logic import DnDGameEngine
+    engine = DnDGameEngine()
+    engine.start_game()
+    actions = ["주변을 조사한다", "여관 주인에게 말을 건다", "동굴로 향한다", "횃불을 켠다", "공격한다"]
+    samples = []
+    for i in range(args.turns):
+        start = time.perf_counter()
+        engine.process_input(actions[i % len(actions)])
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_unified(args):
+    import fixed_search_tool
+    import unified_research_crew
+    fixed_search_tool.DDGS = FakeDDGS
+    samples = []
+    for _ in range(args.runs):
+        crew = unified_research_crew.UnifiedResearchCrew(
+            unified_research_crew.ResearchConfig(args.topic, search_queries_count=args.queries)
+        )
+        start = time.perf_counter()
+        crew.research()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_improved(args, pipeline: bool = False):
+    import fixed_search_tool
+    import improved_research_crew
+    fixed_search_tool.DDGS = FakeDDGS
+    samples = []
+    for _ in range(args.runs):
+        crew = improved_research_crew.ImprovedResearchCrew(args.topic, pipeline=pipeline)
+        start = time.perf_counter()
+        crew.run_research()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_pipeline(args):
+    return run_improved(args, pipeline=True)
+
+
+def run_study(args):
+    from study import study
+    study.DDGS = FakeDDGS
+    samples = []
+    for _ in range(args.runs):
+        crew = study.UniversalResearchCrew(study.ResearchConfig(args.topic, search_queries_count=args.queries))
+        start = time.perf_counter()
+        crew.research()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_codegen(args):
+    from crewai import Crew, Process
+    from study import codegen
+    samples = []
+    for i in range(args.runs):
+        tasks, _topic = codegen.create_problem_tasks("초급", "기본 수학", i + 1)
+        crew = Crew(agents=[codegen.problem_creator, codegen.solution_provider, codegen.tutor],
+                    tasks=tasks, process=Process.sequential, verbose=False)
+        start = time.perf_counter()
+        crew.kickoff()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_session(args):
+    from crewai import Crew, Process
+    from study import dnd_game
+    game_setup = {"num_players": 2, "fantasy_setting": "중세 판타지", "level": 1, "campaign_length": "단편"}
+    samples = []
+    for _ in range(args.runs):
+        character_tasks = [dnd_game.create_character_task(i + 1, game_setup) for i in range(game_setup["num_players"])]
+        campaign_task = dnd_game.create_campaign_task(game_setup, "벤치마크 캐릭터")
+        start = time.perf_counter()
+        Crew(agents=[dnd_game.character_creator], tasks=character_tasks,
+             process=Process.sequential, verbose=False).kickoff()
+        Crew(agents=[dnd_game.dungeon_master, dnd_game.rules_advisor], tasks=[campaign_task],
+             process=Process.sequential, verbose=False).kickoff()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+RUNNERS = {
+    "game": run_game,
+    "unified": run_unified,
+    "improved": run_improved,
+    "pipeline": run_pipeline,
+    "study": run_study,
+    "codegen": run_codegen,
+    "session": run_session,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='스텁 LLM/검색 백엔드를 사용한 오프라인 벤치마크')
+    parser.add_argument('--scenario', '-s', action='append', choices=SCENARIOS, help='실행할 시나리오 (반복 지정 가능)')
+    parser.add_argument('--latency', type=float, default=0.05, help='LLM 첫 토큰 지연 (초)')
+    parser.add_argument('--tps', type=float, default=200.0, help='LLM 생성 속도 (tokens/sec)')
+    parser.add_argument('--answer-words', type=int, default=120, help='스텁 최종 답변 단어 수')
+    parser.add_argument('--search-latency', type=float, default=0.05, help='가짜 검색 지연 (초)')
+    parser.add_argument('--page-latency', type=float, default=0.01, help='코퍼스 페이지 응답 지연 (초)')
+    parser.add_argument('--turns', type=int, default=10, help='game 시나리오 턴 수')
+    parser.add_argument('--runs', '-n', type=int, default=1, help='리서치/생성 시나리오 반복 횟수')
+    parser.add_argument('--queries', type=int, default=2, help='리서치 검색 쿼리 수')
+    parser.add_argument('--topic', default='벤치마크 주제', help='리서치 주제')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='기준값 대비 허용 증가율 (p50 기준)')
+    parser.add_argument('--save-baseline', action='store_true', help='측정 결과를 기준값으로 저장')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    parser.add_argument('--verbose', action='store_true', help='CrewAI 출력 표시')
+    args = parser.parse_args()
+    scenarios = args.scenario or list(SCENARIOS)
+
+    server = StubLLMServer(latency=args.latency, tokens_per_second=args.tps,
+                           answer_words=args.answer_words, page_latency=args.page_latency).start()
+    configure_environment(server)
+    FakeDDGS.configure(server.base_url, latency=args.search_latency)
+
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    results = {}
+    failed = False
+
+    # 보고서/로그/저장 파일이 저장소에 생기지 않도록 임시 디렉터리에서 실행
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        from logging_setup import setup_queue_logging
+        setup_queue_logging("bench_offline", log_dir=".", console=args.verbose)
+        try:
+            for name in scenarios:
+                server.reset_stats()
+                FakeDDGS.calls = 0
+                print(f"\n▶ {name} 실행 중...", flush=True)
+                try:
+                    with quiet(not args.verbose):
+                        samples = RUNNERS[name](args)
+                except Exception as e:
+                    print(f"   ❌ 실패: {type(e).__name__}: {e}")
+                    failed = True
+                    continue
+
+                stats = summarize(samples)
+                total = sum(samples)
+                stats.update({
+                    "llm_requests": server.requests,
+                    "prompt_tokens": server.prompt_tokens,
+                    "completion_tokens": server.completion_tokens,
+                    "searches": FakeDDGS.calls,
+                    "throughput_per_min": len(samples) / total * 60 if total > 0 else 0.0,
+                })
+                results[name] = stats
+
+                print(f"   p50 {stats['p50']:.2f}s  p95 {stats['p95']:.2f}s  p99 {stats['p99']:.2f}s  "
+                      f"({stats['count']}회, 분당 {stats['throughput_per_min']:.1f}회)")
+                print(f"   LLM 요청 {server.requests}회, 토큰 {server.prompt_tokens}/{server.completion_tokens}, "
+                      f"검색 {FakeDDGS.calls}회")
+
+                if name in baseline:
+                    limit = baseline[name]["p50"] * (1 + args.tolerance)
+                    status = "✅" if stats["p50"] <= limit else "❌"
+                    print(f"   {status} 기준값 p50 {baseline[name]['p50']:.2f}s (허용 {limit:.2f}s)")
+                    failed = failed or stats["p50"] > limit
+        finally:
+            os.chdir(original_cwd)
+            server.stop()
+
+    settings = {"latency": args.latency, "tps": args.tps, "answer_words": args.answer_words,
+                "search_latency": args.search_latency, "queries": args.queries}
+    if args.output:
+        Path(args.output).write_text(json.dumps({"settings": settings, "results": results},
+                                                ensure_ascii=False, indent=2))
+    if args.save_baseline:
+        BASELINE_FILE.write_text(json.dumps(results, ensure_ascii=False, indent=2))
+        print(f"\n💾 기준값 저장: {BASELINE_FILE}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+InputValidator.sanitize_input 마이크로벤치마크
+
+사용법: python benchmarks/bench_sanitize.py [--number 20000]
+기존 방식(패턴별 re.sub 4회)과 현재 정제기의 호출당 비용을
+MAX_INPUT_LENGTH 까지의 현실적인 한국어 입력으로 비교합니다.
+시작 전에 <script>, javascript:, eval( 조각을 겹치고 중첩한 무작위 입력으로
+두 구현의 결과가 같은지 확인합니다 (--fuzz 개수).
+"""
+import re
+import sys
+import random
+import timeit
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import config
+from models import InputValidator
+
+# 실제 플레이 로그에서 가져온 형태의 입력들
+PLAIN_INPUTS = [
+    "조사하기",
+    "여관 주인에게 동굴에 대해 더 자세히 물어본다",
+    "횃불을 들고 동굴 안쪽으로 천천히 걸어 들어가면서 바닥에 함정이 있는지 살핀다",
+]
+
+COMMAND_INPUTS = [
+    "말하기: 안녕하세요, 혹시 최근에 동굴 근처에서 수상한 사람을 보셨나요? 보셨다면 인상착의를 알려주세요.",
+    "아이템 사용: 체력 물약 두 개를 마시고 동굴 입구로 조심스럽게 다가간다",
+]
+
+MALICIOUS_INPUTS = [
+    "아이템 사용: 체력 물약 <b>두 개</b>를 마시고 javascript:alert(1) 동굴 입구로 다가간다",
+    "마법 사용: 화염구 <script>eval(document.cookie)</script> 를 고블린 무리 한가운데로 던진다",
+]
+
+
+def build_inputs(max_length: int):
+    """종류별, 길이별 입력 생성 (MAX_INPUT_LENGTH 까지)"""
+    lengths = sorted({20, 100, 250, max_length})
+    inputs = []
+    for kind, samples in [("일반", PLAIN_INPUTS), ("명령", COMMAND_INPUTS), ("태그", MALICIOUS_INPUTS)]:
+        for length in lengths:
+            text = " ".join(samples)
+            while len(text) < length:
+                text += " " + text
+            inputs.append((kind, length, text[:length]))
+    return inputs
+
+
+# 적대적 입력 조각 - 한 패턴을 지우면 다른 패턴이 새로 생기도록 겹치고 중첩
+ADVERSARIAL_FRAGMENTS = [
+    "<", ">", "</", "script", "<script>", "</script>", "<scr", "ipt>", "<sc<script>ript>",
+    "javascript:", "java", "script:", "javas<b>cript:", ":", "eval", "eval(", "eval (",
+    "ev<i>al(", "e", "val", "(", ")", "evaljavascript:(", "<<", ">>", " ", "\n", "x", "조사",
+]
+
+
+def check_adversarial(count: int, seed: int = 42):
+    """적대적 무작위 입력에서 기존 구현과 결과가 같은지 확인"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        text = "".join(rng.choice(ADVERSARIAL_FRAGMENTS) for _ in range(rng.randint(1, 12)))
+        if rng.random() < 0.5:
+            text = text.upper() if rng.random() < 0.5 else text.title()
+        assert legacy_sanitize(text) == InputValidator.sanitize_input(text), repr(text)
+    print(f"✅ 적대적 입력 {count:,}건 결과 일치")
+
+
+def legacy_sanitize(user_input: str) -> str:
+    """기존 구현 (비교용)"""
+    if not user_input or not user_input.strip():
+        return ""
+    if len(user_input) > config.MAX_INPUT_LENGTH:
+        user_input = user_input[:config.MAX_INPUT_LENGTH]
+    for pattern in InputValidator.DANGEROUS_PATTERNS:
+        user_input = re.sub(pattern, '', user_input, flags=re.IGNORECASE)
+    return user_input.strip()
+
+
+def bench(func, arg, number: int) -> float:
+    """호출당 평균 시간 (마이크로초)"""
+    best = min(timeit.repeat(lambda: func(arg), number=number, repeat=5))
+    return best / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='입력 정제기 마이크로벤치마크')
+    parser.add_argument('--number', '-n', type=int, default=20000, help='반복 횟수')
+    parser.add_argument('--fuzz', type=int, default=200000, help='적대적 입력 동일성 검사 개수')
+    args = parser.parse_args()
+
+    check_adversarial(args.fuzz)
+
+    print(f"📏 MAX_INPUT_LENGTH: {config.MAX_INPUT_LENGTH}자")
+    print(f"{'종류':>4} | {'길이':>5} | {'기존(µs)':>9} | {'현재(µs)':>12} | {'개선율':>6}")
+    print("-" * 54)
+
+    inputs = build_inputs(config.MAX_INPUT_LENGTH)
+    for kind, length, text in inputs:
+        # 결과 동일성 확인
+        assert legacy_sanitize(text) == InputValidator.sanitize_input(text), (kind, length)
+
+        legacy = bench(legacy_sanitize, text, args.number)
+        single = bench(InputValidator.sanitize_input, text, args.number)
+        print(f"{kind:>4} | {length:>5} | {legacy:>9.2f} | {single:>12.2f} | {legacy / single:>5.2f}x")
+
+    # 배치 API
+    batch = [text for _, _, text in inputs] * 100
+    number = max(1, args.number // 1000)
+    loop_time = min(timeit.repeat(lambda: [legacy_sanitize(t) for t in batch], number=number, repeat=3))
+    batch_time = min(timeit.repeat(lambda: InputValidator.sanitize_batch(batch), number=number, repeat=3))
+    print(f"\n📦 배치 {len(batch)}건: 기존 {loop_time / number * 1e3:.2f}ms, "
+          f"sanitize_batch {batch_time / number * 1e3:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
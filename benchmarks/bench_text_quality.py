@@ -0,0 +1,116 @@
+"""
+본문 품질 평가(text_quality) 마이크로벤치마크
+
+사용법: python benchmarks/bench_text_quality.py [--number 20] [--sizes 3000,50000,250000,1000000]
+기존 is_good_text(지표별 `in` 검색 + 전체 split())와 새 판정(조기 종료, 단어는 MIN_WORDS개까지만),
+상세 신호 계산(analyze_text)의 문서당 비용을 크기별 한국어/영어 혼합 페이지로 비교합니다.
+시작 전에 무작위 문서 묶음으로 판정이 기존 구현과 같은지 확인합니다.
+"""
+import sys
+import random
+import timeit
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from text_quality import analyze_text, is_good_text  # noqa: E402
+
+SENTENCES = [
+    "인공지능 모델 경량화 기술은 최근 2년 사이 빠르게 발전하고 있습니다.",
+    "전문가들은 향후 시장 규모가 두 배 이상 성장할 것으로 전망합니다.",
+    "Recent studies show steady adoption across industries with measurable gains.",
+    "주요 기업들은 데이터 센터 전력 효율을 높이기 위해 투자를 확대하고 있다.",
+    "The report highlights case studies from healthcare, finance and manufacturing.",
+]
+BOILERPLATE = ["Copyright © 2025 All rights reserved.", "로그인 | 회원가입 | 구독하기", "개인정보처리방침 이용약관"]
+REJECT_SNIPPETS = ["window.dataLayer = []", "const app = init()", "Error 404 - Page not found", "jQuery(document)",
+                   "Unhandled Exception in module", "HTTP 403 Forbidden"]
+
+
+def legacy_is_good_text(text):
+    """기존 구현 (비교용)"""
+    if not text or len(text.strip()) < 50:
+        return False
+    js_indicators = [
+        'function(', '.push([', 'self.__next_f', 'window.',
+        'document.', 'var ', 'const ', 'let ', 'getElementById',
+        'addEventListener', 'querySelector', '$(', 'jQuery'
+    ]
+    if any(indicator in text for indicator in js_indicators):
+        return False
+    error_indicators = [
+        'Page not found', '404', '403', 'Access denied',
+        'Forbidden', 'Error', 'exception', 'stacktrace'
+    ]
+    lower_text = text.lower()
+    if any(error in lower_text for error in error_indicators):
+        return False
+    words = text.split()
+    if len(words) < 15:
+        return False
+    return True
+
+
+def build_page(size: int, rng: random.Random, reject: str = None) -> str:
+    """크기 size 안팎의 본문 (줄마다 문장 여러 개, 가끔 상용구 줄)"""
+    lines = []
+    length = 0
+    while length < size:
+        if rng.random() < 0.05:
+            line = rng.choice(BOILERPLATE)
+        else:
+            line = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(1, 4)))
+        lines.append(line)
+        length += len(line) + 1
+    if reject:
+        # 뒤쪽에 거부 지표를 넣어 기존 구현의 조기 종료 이점을 없앰
+        lines.insert(int(len(lines) * 0.9), reject)
+    return "\n".join(lines)
+
+
+def check_equivalence(rng: random.Random, count: int = 500):
+    """무작위 문서 묶음에서 판정이 기존 구현과 같은지 확인"""
+    for i in range(count):
+        size = rng.choice([20, 60, 200, 2000, 20000])
+        reject = rng.choice(REJECT_SNIPPETS) if rng.random() < 0.4 else None
+        page = build_page(size, rng, reject)
+        if rng.random() < 0.2:
+            page = page[:rng.randint(0, 120)]
+        assert legacy_is_good_text(page) == is_good_text(page), (i, size, reject, page[:200])
+    print(f"✅ 판정 일치: 무작위 문서 {count}개")
+
+
+def bench(func, arg, number: int) -> float:
+    """호출당 평균 시간 (밀리초)"""
+    best = min(timeit.repeat(lambda: func(arg), number=number, repeat=5))
+    return best / number * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description='본문 품질 평가 마이크로벤치마크')
+    parser.add_argument('--number', '-n', type=int, default=20, help='반복 횟수')
+    parser.add_argument('--sizes', default='3000,50000,250000,1000000', help='문서 크기 목록 (글자 수)')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    check_equivalence(rng)
+
+    print(f"{'종류':>4} | {'크기':>9} | {'기존(ms)':>9} | {'새 판정(ms)':>12} | {'상세 신호(ms)':>12} | {'개선율':>6}")
+    print("-" * 68)
+    for size in (int(value) for value in args.sizes.split(',')):
+        for kind, reject in (("정상", None), ("거부", "Unhandled Exception in module")):
+            page = build_page(size, rng, reject)
+            legacy = bench(legacy_is_good_text, page, args.number)
+            verdict = bench(is_good_text, page, args.number)
+            detailed = bench(analyze_text, page, args.number)
+            print(f"{kind:>4} | {len(page):>9,} | {legacy:>9.3f} | {verdict:>12.3f} | {detailed:>12.3f} | "
+                  f"{legacy / verdict:>5.1f}x")
+
+    sample = analyze_text(build_page(50000, rng))
+    print(f"\n📊 신호 예시 (50,000자): 단어 {sample.word_count}개, 상용구 비율 {sample.boilerplate_ratio:.1%}, "
+          f"한글 {sample.hangul_ratio:.1%}, 라틴 {sample.latin_ratio:.1%}")
+
+
+if __name__ == "__main__":
+    main()
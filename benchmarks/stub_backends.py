@@ -0,0 +1,299 @@
+"""
+오프라인 벤치마크용 스텁 백엔드
+
+- StubLLMServer: OpenAI 호환 /v1/chat/completions 서버 (첫 토큰 지연 + 초당 토큰 수 모델링)
+  · 플래너 프롬프트에는 SEARCH_QUERY_n / QUERY_n 형식 쿼리로 응답
+  · 도구가 있는 에이전트에는 계획된 쿼리마다 도구 호출 (네이티브 function calling 또는 ReAct 형식,
+    배열 인자 도구는 쿼리 전체를 한 번에)
+  · 그 외에는 지정한 길이의 최종 답변 생성
+- /pages/<n>: 가짜 웹 페이지 코퍼스 (검색 결과 링크 대상)
+- FakeDDGS: ddgs.DDGS().text()와 같은 인터페이스로 코퍼스 페이지를 돌려주는 검색 백엔드
+"""
+import re
+import json
+import time
+import uuid
+import zlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+# 가짜 웹 페이지 코퍼스 (is_good_text를 통과하는 본문)
+CORPUS_TOPICS = [
+    "인공지능 모델 경량화", "재생 에너지 저장 기술", "디지털 헬스케어 플랫폼",
+    "블록체인 기반 결제", "우주 발사체 재사용", "스마트 시티 교통",
+    "푸드테크 대체 단백질", "교육 기술 맞춤형 학습",
+]
+CORPUS_SIZE = 40
+
+PLANNER_PATTERN = re.compile(r"(SEARCH_)?QUERY_1:")
+QUERY_LINE = re.compile(r'(?:SEARCH_)?QUERY_\d+:\s*"([^"\n]+)"')
+REACT_TOOL_NAME = re.compile(r"Tool Name:\s*(.+)")
+REACT_FIRST_PROPERTY = re.compile(r'"properties":\s*\{\s*"(\w+)"')
+
+
+def corpus_page(page_id: int) -> str:
+    """결정적인 코퍼스 HTML 페이지"""
+    topic = CORPUS_TOPICS[page_id % len(CORPUS_TOPICS)]
+    paragraphs = []
+    for i in range(6):
+        paragraphs.append(
+            f"<p>{topic}에 관한 {page_id}번 문서의 {i + 1}번째 단락입니다. "
+            f"최근 연구와 산업 사례에 따르면 {topic} 분야는 매년 {10 + (page_id + i) % 30}% 성장하고 있으며 "
+            f"전문가들은 향후 {2026 + i % 4}년까지 주요 기업들의 투자가 확대될 것으로 전망합니다. "
+            f"Recent studies show steady adoption across industries with measurable gains in efficiency.</p>"
+        )
+    return (
+        f"<html><head><title>{topic} 동향 리포트 {page_id}</title></head>"
+        f"<body><article><h1>{topic} 동향 리포트 {page_id}</h1>{''.join(paragraphs)}</article></body></html>"
+    )
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server_version = "StubLLM/1.0"
+
+    def log_message(self, *args):
+        pass
+
+    # ----- GET: 모델 목록, 코퍼스 페이지 -----
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json({"object": "list", "data": [{"id": "stub", "object": "model"}]})
+            return
+        match = re.match(r"/pages/(\d+)", self.path)
+        if match:
+            body = corpus_page(int(match.group(1))).encode("utf-8")
+            time.sleep(self.server.stub.page_latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_error(404)
+
+    # ----- POST: chat/completions -----
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        stub = self.server.stub
+        message = stub.respond(request)
+
+        prompt_tokens = sum(_estimate_tokens(str(m.get("content") or "")) for m in request.get("messages", []))
+        completion_text = message.get("content") or json.dumps(message.get("tool_calls", []))
+        completion_tokens = _estimate_tokens(completion_text)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        stub.record(prompt_tokens, completion_tokens)
+        finish_reason = "tool_calls" if message.get("tool_calls") else "stop"
+
+        # 첫 토큰 지연 (대기열 + 프롬프트 처리)
+        time.sleep(stub.latency)
+        generation_time = completion_tokens / stub.tokens_per_second if stub.tokens_per_second > 0 else 0.0
+
+        if request.get("stream"):
+            self._stream(request, message, usage, finish_reason, generation_time)
+            return
+
+        time.sleep(generation_time)
+        self._send_json({
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": usage,
+        })
+
+    def _stream(self, request, message, usage, finish_reason, generation_time):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        base = {"id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion.chunk",
+                "created": int(time.time()), "model": request.get("model", "stub")}
+
+        def send(delta, finish=None, **extra):
+            chunk = dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": finish}], **extra)
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        if message.get("tool_calls"):
+            time.sleep(generation_time)
+            calls = [dict(call, index=i) for i, call in enumerate(message["tool_calls"])]
+            send({"role": "assistant", "tool_calls": calls})
+        else:
+            pieces = re.findall(r"\S+\s*", message["content"]) or [message["content"]]
+            delay = generation_time / len(pieces)
+            send({"role": "assistant", "content": ""})
+            for piece in pieces:
+                time.sleep(delay)
+                send({"content": piece})
+        send({}, finish_reason, usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _send_json(self, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubLLMServer:
+    """로컬 OpenAI 호환 스텁 서버
+
+    latency: 요청마다 첫 토큰까지의 지연 (초)
+    tokens_per_second: 생성 속도 (완성 토큰 수 / 이 값 만큼 추가 지연)
+    answer_words: 최종 답변 단어 수
+    """
+
+    def __init__(self, latency: float = 0.05, tokens_per_second: float = 200.0,
+                 answer_words: int = 120, page_latency: float = 0.01, port: int = 0):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.answer_words = answer_words
+        self.page_latency = page_latency
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), _StubHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def record(self, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = self.prompt_tokens = self.completion_tokens = 0
+
+    # ----- 응답 시나리오 -----
+    def respond(self, request: dict) -> dict:
+        messages = request.get("messages", [])
+        text = "\n".join(str(m.get("content") or "") for m in messages)
+        last = str(messages[-1].get("content") or "") if messages else ""
+
+        # 도구 호출 단계: 계획된 쿼리를 하나씩 검색
+        tools = request.get("tools") or []
+        if tools:
+            done = sum(1 for m in messages if m.get("role") == "tool")
+            queries = self._planned_queries(text)
+            function = tools[0].get("function", {})
+            properties = (function.get("parameters") or {}).get("properties", {}) or {"query": {}}
+            name, schema = next(iter(properties.items()))
+            # 배열 인자 도구(배치 검색)는 계획된 쿼리 전체를 한 번에 전달
+            batch = schema.get("type") == "array"
+            if done < (1 if batch and queries else len(queries)):
+                argument = queries if batch else queries[done]
+                return {"role": "assistant", "content": None, "tool_calls": [{
+                    "id": f"call_{uuid.uuid4().hex[:8]}", "type": "function",
+                    "function": {"name": function.get("name", "search"),
+                                 "arguments": json.dumps({name: argument}, ensure_ascii=False)},
+                }]}
+        else:
+            tool_name = REACT_TOOL_NAME.search(text)
+            if tool_name and "Action Input" in text:
+                # 형식 안내문의 "Observation: the result of the action"은 제외
+                done = text.count("Observation:") - text.count("Observation: the result of the action")
+                queries = self._planned_queries(text)
+                # 첫 번째 도구의 인자 스키마 (배열 인자면 쿼리 전체를 한 번에 전달)
+                schema = text[tool_name.end():].split("Tool Name:", 1)[0]
+                name = m.group(1) if (m := REACT_FIRST_PROPERTY.search(schema)) else "query"
+                batch = '"type": "array"' in schema
+                if done < (1 if batch and queries else len(queries)):
+                    argument = queries if batch else queries[done]
+                    content = (f"Thought: 다음 쿼리를 검색합니다.\nAction: {tool_name.group(1).strip()}\n"
+                               f"Action Input: {json.dumps({name: argument}, ensure_ascii=False)}")
+                    return {"role": "assistant", "content": content}
+
+        # 플래너: 쿼리 목록
+        if PLANNER_PATTERN.search(last) and "이전 단계" not in last and "Observation" not in last:
+            count = int(m.group(1)) if (m := re.search(r"(\d+)개의 (?:구체적|영어|검색)", last)) else 5
+            prefix = "SEARCH_QUERY" if "SEARCH_QUERY_1" in last else "QUERY"
+            lines = [f'{prefix}_{i}: "benchmark topic aspect {i} latest trends 2025"' for i in range(1, count + 1)]
+            return {"role": "assistant", "content": "Thought: 검색 전략 수립 완료\nFinal Answer:\n" + "\n".join(lines)}
+
+        words = " ".join(f"내용{i % 17}" for i in range(self.answer_words))
+        content = f"Thought: I now know the final answer\nFinal Answer: ## 벤치마크 응답\n\n{words}"
+        return {"role": "assistant", "content": content}
+
+    @staticmethod
+    def _planned_queries(text: str) -> List[str]:
+        seen = []
+        for query in QUERY_LINE.findall(text):
+            if query not in seen and not query.startswith(("첫 번째", "두 번째", "세 번째", "네 번째", "다섯 번째", "query", "검색어")):
+                seen.append(query)
+        return seen
+
+
+class FakeDDGS:
+    """ddgs.DDGS 대체 - StubLLMServer의 코퍼스 페이지를 검색 결과로 반환"""
+
+    base_url = "http://127.0.0.1:0"
+    latency = 0.05
+    calls = 0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @classmethod
+    def configure(cls, base_url: str, latency: float = 0.05):
+        cls.base_url = base_url
+        cls.latency = latency
+        cls.calls = 0
+
+    def text(self, query: str = None, region: str = None, safesearch: str = None,
+             max_results: int = 5, **kwargs) -> List[Dict[str, str]]:
+        query = query if query is not None else kwargs.get("keywords", "")
+        type(self).calls += 1
+        time.sleep(self.latency)
+        seed = zlib.crc32(query.encode("utf-8"))
+        results = []
+        for i in range(max_results or 5):
+            page_id = (seed + i * 7) % CORPUS_SIZE
+            topic = CORPUS_TOPICS[page_id % len(CORPUS_TOPICS)]
+            results.append({
+                "title": f"{topic} 동향 리포트 {page_id}",
+                "href": f"{self.base_url}/pages/{page_id}",
+                "body": f"{topic}에 관한 최신 분석과 사례 ({query})",
+            })
+        return results
@@ -1,10 +1,10 @@
 import os
 import logging
-import litellm
-from pathlib import Path
-from datetime import datetime
+import threading
 from dotenv import load_dotenv
 
+from logging_setup import setup_queue_logging
+
 # .env 파일 로드
 load_dotenv()
 
@@ -13,20 +13,8 @@ os.environ.setdefault("OTEL_SDK_DISABLED", "true")
 
 # ===== 로깅 설정 =====
 def setup_logging():
-    """로깅 시스템 설정"""
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_dir / f'dnd_game_{datetime.now().strftime("%Y%m%d")}.log', encoding='utf-8'),
-            logging.StreamHandler()
-        ]
-    )
-
-setup_logging()
+    """로깅 시스템 설정 (큐 기반 - 파일/콘솔 출력은 별도 스레드에서 처리)"""
+    setup_queue_logging("dnd_game", log_dir="logs")
 
 # ===== 설정 관리 =====
 class GameConfig:
@@ -40,12 +28,17 @@ class GameConfig:
         self.TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
         self.TIMEOUT = int(os.getenv("TIMEOUT", "30"))
         self.MAX_INPUT_LENGTH = int(os.getenv("MAX_INPUT_LENGTH", "500"))
+        # 빠른 시작: 연결 테스트를 첫 턴까지 미루고 무거운 모듈은 첫 LLM 호출 때 임포트
+        self.FAST_START = os.getenv("FAST_START", "true").lower() in ("1", "true", "yes")
+        # 턴별 지연 시간/토큰 계측 기록 파일 (빈 값이면 기록하지 않음)
+        self.METRICS_FILE = os.getenv("METRICS_FILE", "logs/metrics.jsonl")
         
         # 설정 유효성 검사
         self.validate()
         
-        # LiteLLM 글로벌 설정
-        self._setup_litellm()
+        # LiteLLM 글로벌 설정은 get_litellm() 최초 호출 시 수행
+        self._litellm = None
+        self._litellm_lock = threading.Lock()
     
     def _normalize_url(self, url: str) -> str:
         """URL 정규화"""
@@ -64,13 +57,24 @@ class GameConfig:
         if not (0.0 <= self.TEMPERATURE <= 2.0):
             raise ValueError("TEMPERATURE는 0.0과 2.0 사이여야 합니다.")
     
+    def get_litellm(self):
+        """LiteLLM 모듈 반환 (최초 호출 시 지연 임포트 및 글로벌 설정)"""
+        if self._litellm is None:
+            with self._litellm_lock:
+                if self._litellm is None:
+                    self._litellm = self._setup_litellm()
+        return self._litellm
+    
     def _setup_litellm(self):
         """LiteLLM 설정"""
+        import litellm
+        
         litellm.api_base = self.API_BASE_URL
         litellm.api_key = self.API_KEY
         litellm.drop_params = True
         logger = logging.getLogger(__name__)
-        logger.info(f"LiteLLM 설정 완료 - Model: {self.MODEL_NAME}, URL: {self.API_BASE_URL}")
+        logger.info("LiteLLM 설정 완료 - Model: %s, URL: %s", self.MODEL_NAME, self.API_BASE_URL)
+        return litellm
 
 # 글로벌 설정 인스턴스
 config = GameConfig()
\ No newline at end of file
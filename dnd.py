@@ -1,40 +1,33 @@
 import os
-import litellm
-from crewai import Agent, Task, Crew, Process
-from crewai.tools import BaseTool
-from pydantic import BaseModel, Field
 import random
 import json
 import logging
 import threading
-from typing import Dict, List, Any, Optional
+import time
+from concurrent.futures import Future, wait as wait_futures
+from functools import lru_cache
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
 from datetime import datetime
-import requests
 from dotenv import load_dotenv
 import re
 from contextlib import contextmanager
 
+from logging_setup import setup_queue_logging, log_context
+import metrics
+from metrics import recorder, traced_tool
+
+# litellm, crewai, pydantic, requests는 시작 속도를 위해 첫 LLM 호출 시점에 지연 임포트
+
 # .env 파일 로드
 load_dotenv()
 
 # ===== 로깅 설정 =====
 def setup_logging():
-    """로깅 시스템 설정"""
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_dir / f'dnd_game_{datetime.now().strftime("%Y%m%d")}.log', encoding='utf-8'),
-            logging.StreamHandler()
-        ]
-    )
+    """로깅 시스템 설정 (큐 기반 - 파일/콘솔 출력은 별도 스레드에서 처리)"""
+    setup_queue_logging("dnd_game", log_dir="logs")
 
-setup_logging()
 logger = logging.getLogger(__name__)
 
 # ===== 설정 관리 =====
@@ -49,12 +42,17 @@ class GameConfig:
         self.TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
         self.TIMEOUT = int(os.getenv("TIMEOUT", "30"))
         self.MAX_INPUT_LENGTH = int(os.getenv("MAX_INPUT_LENGTH", "500"))
+        # 빠른 시작: 연결 테스트를 첫 턴까지 미루고 무거운 모듈은 첫 LLM 호출 때 임포트
+        self.FAST_START = os.getenv("FAST_START", "true").lower() in ("1", "true", "yes")
+        # 턴별 지연 시간/토큰 계측 기록 파일 (빈 값이면 기록하지 않음)
+        self.METRICS_FILE = os.getenv("METRICS_FILE", "logs/metrics.jsonl")
         
         # 설정 유효성 검사
         self.validate()
         
-        # LiteLLM 글로벌 설정
-        self._setup_litellm()
+        # LiteLLM 글로벌 설정은 get_litellm() 최초 호출 시 수행
+        self._litellm = None
+        self._litellm_lock = threading.Lock()
     
     def _normalize_url(self, url: str) -> str:
         """URL 정규화"""
@@ -73,12 +71,23 @@ class GameConfig:
         if not (0.0 <= self.TEMPERATURE <= 2.0):
             raise ValueError("TEMPERATURE는 0.0과 2.0 사이여야 합니다.")
     
+    def get_litellm(self):
+        """LiteLLM 모듈 반환 (최초 호출 시 지연 임포트 및 글로벌 설정)"""
+        if self._litellm is None:
+            with self._litellm_lock:
+                if self._litellm is None:
+                    self._litellm = self._setup_litellm()
+        return self._litellm
+    
     def _setup_litellm(self):
         """LiteLLM 설정"""
+        import litellm
+        
         litellm.api_base = self.API_BASE_URL
         litellm.api_key = self.API_KEY
         litellm.drop_params = True
-        logger.info(f"LiteLLM 설정 완료 - Model: {self.MODEL_NAME}, URL: {self.API_BASE_URL}")
+        logger.info("LiteLLM 설정 완료 - Model: %s, URL: %s", self.MODEL_NAME, self.API_BASE_URL)
+        return litellm
 
 # 글로벌 설정 인스턴스
 config = GameConfig()
@@ -94,6 +103,19 @@ class InputValidator:
         r'<.*?>',  # HTML 태그 제거
     ]
     
+    # 패턴별로 임포트 시 한 번만 컴파일 - (패턴, 매칭에 꼭 필요한 문자)
+    # 패턴을 하나로 합치면 앞 패턴을 지운 뒤 새로 생기는 매치(예: 'evaljavascript:(')를 놓치므로
+    # 기존과 같이 패턴 순서대로 한 번씩 적용한다.
+    _DANGEROUS_RES = tuple(
+        (re.compile(pattern, re.IGNORECASE), trigger)
+        for pattern, trigger in zip(DANGEROUS_PATTERNS, ('<', ':', '(', '<'))
+    )
+    
+    VALID_COMMANDS = frozenset({
+        'help', 'quit', 'save', 'load', 'status', 'inventory',
+        '조사', '수락', '거절', '공격', '도망', '상태', '인벤토리'
+    })
+    
     @classmethod
     def sanitize_input(cls, user_input: str) -> str:
         """사용자 입력 정제"""
@@ -101,26 +123,45 @@ class InputValidator:
             return ""
         
         # 길이 제한
-        if len(user_input) > config.MAX_INPUT_LENGTH:
-            user_input = user_input[:config.MAX_INPUT_LENGTH]
-            logger.warning(f"입력이 최대 길이로 제한됨: {config.MAX_INPUT_LENGTH}자")
+        max_length = config.MAX_INPUT_LENGTH
+        if len(user_input) > max_length:
+            user_input = user_input[:max_length]
+            logger.warning("입력이 최대 길이로 제한됨: %s자", max_length)
         
         # 위험한 패턴 제거
-        for pattern in cls.DANGEROUS_PATTERNS:
-            user_input = re.sub(pattern, '', user_input, flags=re.IGNORECASE)
+        return cls._strip_dangerous(user_input).strip()
+    
+    @classmethod
+    def _strip_dangerous(cls, text: str) -> str:
+        """패턴 순서대로 제거 (패턴별 re.sub와 동일한 결과)
         
-        return user_input.strip()
+        패턴에 꼭 필요한 문자('<', ':', '(')가 없으면 정규식을 실행하지 않으므로
+        일반 한국어 입력은 str 검색 몇 번으로 끝난다.
+        """
+        for pattern, trigger in cls._DANGEROUS_RES:
+            if trigger in text:
+                text = pattern.sub('', text)
+        return text
+    
+    @classmethod
+    def sanitize_batch(cls, inputs: Iterable[str]) -> List[str]:
+        """여러 입력을 한 번에 정제"""
+        sanitize = cls.sanitize_input
+        return [sanitize(user_input) for user_input in inputs]
     
     @classmethod
     def validate_command(cls, command: str) -> bool:
         """명령어 유효성 검사"""
-        valid_commands = {
-            'help', 'quit', 'save', 'load', 'status', 'inventory',
-            '조사', '수락', '거절', '공격', '도망', '상태', '인벤토리'
-        }
-        
         # 기본 명령어이거나 자유 입력 허용
-        return command.lower() in valid_commands or len(command.split()) <= 20
+        return command.lower() in cls.VALID_COMMANDS or len(command.split()) <= 20
+    
+    @classmethod
+    def validate_batch(cls, inputs: Iterable[str]) -> List[Tuple[str, bool]]:
+        """여러 입력을 정제하고 (정제된 입력, 유효 여부) 목록 반환"""
+        results = []
+        for sanitized in cls.sanitize_batch(inputs):
+            results.append((sanitized, bool(sanitized) and cls.validate_command(sanitized)))
+        return results
 
 # ===== 데이터 모델 =====
 @dataclass
@@ -202,7 +243,7 @@ class GameStateManager:
             self.state.game_context = new_context
             self.state.session_log.append(f"[{datetime.now().strftime('%H:%M:%S')}] {new_context}")
             self.state.last_updated = datetime.now().isoformat()
-            logger.info(f"게임 컨텍스트 업데이트: {new_context[:100]}...")
+            logger.info("게임 컨텍스트 업데이트: %s...", new_context[:100])
     
     def get_context(self) -> str:
         """현재 게임 컨텍스트 조회"""
@@ -212,7 +253,7 @@ class GameStateManager:
         """캐릭터 추가"""
         with self._lock:
             self.state.active_characters.append(character)
-            logger.info(f"캐릭터 추가됨: {character.name}")
+            logger.info("캐릭터 추가됨: %s", character.name)
     
     def get_character(self, name: str) -> Optional[Character]:
         """캐릭터 조회"""
@@ -238,10 +279,10 @@ class GameStateManager:
             with open(save_path, 'w', encoding='utf-8') as f:
                 json.dump(save_data, f, ensure_ascii=False, indent=2)
             
-            logger.info(f"게임 저장 완료: {save_path}")
+            logger.info("게임 저장 완료: %s", save_path)
             return True
         except Exception as e:
-            logger.error(f"게임 저장 실패: {e}")
+            logger.error("게임 저장 실패: %s", e)
             return False
     
     def load_game(self, filename: str) -> bool:
@@ -249,7 +290,7 @@ class GameStateManager:
         try:
             save_path = self.saves_dir / filename
             if not save_path.exists():
-                logger.warning(f"저장 파일을 찾을 수 없음: {save_path}")
+                logger.warning("저장 파일을 찾을 수 없음: %s", save_path)
                 return False
             
             with open(save_path, 'r', encoding='utf-8') as f:
@@ -267,10 +308,10 @@ class GameStateManager:
                     Character(**char_data) for char_data in characters_data
                 ]
             
-            logger.info(f"게임 불러오기 완료: {save_path}")
+            logger.info("게임 불러오기 완료: %s", save_path)
             return True
         except Exception as e:
-            logger.error(f"게임 불러오기 실패: {e}")
+            logger.error("게임 불러오기 실패: %s", e)
             return False
     
     def get_save_files(self) -> List[str]:
@@ -278,146 +319,166 @@ class GameStateManager:
         try:
             return [f.name for f in self.saves_dir.glob("*.json")]
         except Exception as e:
-            logger.error(f"저장 파일 목록 조회 실패: {e}")
+            logger.error("저장 파일 목록 조회 실패: %s", e)
             return []
 
 # 글로벌 게임 상태 매니저
 game_state_manager = GameStateManager()
 
 # ===== 개선된 도구들 =====
-class DiceRollInput(BaseModel):
-    sides: int = Field(default=20, description="주사위 면 수", ge=2, le=100)
-    count: int = Field(default=1, description="주사위 개수", ge=1, le=10)
-    modifier: int = Field(default=0, description="수정치", ge=-20, le=20)
-
-class DiceRollTool(BaseTool):
-    name: str = "roll_dice"
-    description: str = "주사위를 굴립니다 (2d6+3 형태로 입력)"
-    args_schema: type[BaseModel] = DiceRollInput
+@lru_cache(maxsize=None)
+def create_tools():
+    """CrewAI 도구 생성 (crewai/pydantic 지연 임포트, 최초 1회만 생성)"""
+    from pydantic import BaseModel, Field
+    from crewai.tools import BaseTool
     
-    def _run(self, sides: int = 20, count: int = 1, modifier: int = 0) -> str:
-        try:
-            rolls = [random.randint(1, sides) for _ in range(count)]
-            total = sum(rolls) + modifier
-            
-            result = {
-                "rolls": rolls,
-                "modifier": modifier,
-                "total": total,
-                "description": f"{count}d{sides}+{modifier} = {rolls} + {modifier} = {total}",
-                "critical": any(roll == sides for roll in rolls),
-                "fumble": any(roll == 1 for roll in rolls) and sides == 20
-            }
-            
-            logger.info(f"주사위 굴림: {result['description']}")
-            return json.dumps(result, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"주사위 굴리기 실패: {e}")
-            return json.dumps({"error": str(e)}, ensure_ascii=False)
+    class DiceRollInput(BaseModel):
+        sides: int = Field(default=20, description="주사위 면 수", ge=2, le=100)
+        count: int = Field(default=1, description="주사위 개수", ge=1, le=10)
+        modifier: int = Field(default=0, description="수정치", ge=-20, le=20)
 
-class AbilityCheckInput(BaseModel):
-    ability_score: int = Field(description="능력치 수치", ge=1, le=30)
-    difficulty: int = Field(default=10, description="난이도", ge=5, le=30)
-    advantage: bool = Field(default=False, description="유리함 여부")
-    disadvantage: bool = Field(default=False, description="불리함 여부")
+    class DiceRollTool(BaseTool):
+        name: str = "roll_dice"
+        description: str = "주사위를 굴립니다 (2d6+3 형태로 입력)"
+        args_schema: type[BaseModel] = DiceRollInput
+        
+        @traced_tool
+        def _run(self, sides: int = 20, count: int = 1, modifier: int = 0) -> str:
+            try:
+                rolls = [random.randint(1, sides) for _ in range(count)]
+                total = sum(rolls) + modifier
+                
+                result = {
+                    "rolls": rolls,
+                    "modifier": modifier,
+                    "total": total,
+                    "description": f"{count}d{sides}+{modifier} = {rolls} + {modifier} = {total}",
+                    "critical": any(roll == sides for roll in rolls),
+                    "fumble": any(roll == 1 for roll in rolls) and sides == 20
+                }
+                
+                logger.info("주사위 굴림: %s", result['description'])
+                return json.dumps(result, ensure_ascii=False)
+            except Exception as e:
+                logger.error("주사위 굴리기 실패: %s", e)
+                return json.dumps({"error": str(e)}, ensure_ascii=False)
 
-class AbilityCheckTool(BaseTool):
-    name: str = "ability_check"
-    description: str = "능력치 판정을 수행합니다"
-    args_schema: type[BaseModel] = AbilityCheckInput
-    
-    def _run(self, ability_score: int, difficulty: int = 10, advantage: bool = False, disadvantage: bool = False) -> str:
-        try:
-            # 유리함/불리함 처리
-            if advantage and disadvantage:
-                advantage = disadvantage = False  # 상쇄
-            
-            if advantage:
-                roll1, roll2 = random.randint(1, 20), random.randint(1, 20)
-                roll = max(roll1, roll2)
-                roll_desc = f"2d20 유리함({roll1}, {roll2}) -> {roll}"
-            elif disadvantage:
-                roll1, roll2 = random.randint(1, 20), random.randint(1, 20)
-                roll = min(roll1, roll2)
-                roll_desc = f"2d20 불리함({roll1}, {roll2}) -> {roll}"
-            else:
-                roll = random.randint(1, 20)
-                roll_desc = f"d20({roll})"
-            
-            modifier = (ability_score - 10) // 2
-            total = roll + modifier
-            success = total >= difficulty
-            
-            result = {
-                "roll": roll,
-                "modifier": modifier,
-                "total": total,
-                "difficulty": difficulty,
-                "success": success,
-                "critical_success": roll == 20,
-                "critical_failure": roll == 1,
-                "description": f"{roll_desc} + 수정치({modifier}) = {total} vs DC{difficulty} - {'성공' if success else '실패'}"
-            }
-            
-            logger.info(f"능력치 판정: {result['description']}")
-            return json.dumps(result, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"능력치 판정 실패: {e}")
-            return json.dumps({"error": str(e)}, ensure_ascii=False)
+    class AbilityCheckInput(BaseModel):
+        ability_score: int = Field(description="능력치 수치", ge=1, le=30)
+        difficulty: int = Field(default=10, description="난이도", ge=5, le=30)
+        advantage: bool = Field(default=False, description="유리함 여부")
+        disadvantage: bool = Field(default=False, description="불리함 여부")
 
-class GameContextTool(BaseTool):
-    name: str = "get_game_context"
-    description: str = "현재 게임 상황과 컨텍스트를 가져옵니다"
-    
-    def _run(self) -> str:
-        try:
-            context = game_state_manager.get_context()
-            characters = [asdict(char) for char in game_state_manager.state.active_characters]
-            
-            result = {
-                "current_context": context,
-                "characters": characters,
-                "scene": game_state_manager.state.current_scene,
-                "last_updated": game_state_manager.state.last_updated
-            }
-            return json.dumps(result, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"게임 컨텍스트 조회 실패: {e}")
-            return json.dumps({"error": str(e)}, ensure_ascii=False)
+    class AbilityCheckTool(BaseTool):
+        name: str = "ability_check"
+        description: str = "능력치 판정을 수행합니다"
+        args_schema: type[BaseModel] = AbilityCheckInput
+        
+        @traced_tool
+        def _run(self, ability_score: int, difficulty: int = 10, advantage: bool = False, disadvantage: bool = False) -> str:
+            try:
+                # 유리함/불리함 처리
+                if advantage and disadvantage:
+                    advantage = disadvantage = False  # 상쇄
+                
+                if advantage:
+                    roll1, roll2 = random.randint(1, 20), random.randint(1, 20)
+                    roll = max(roll1, roll2)
+                    roll_desc = f"2d20 유리함({roll1}, {roll2}) -> {roll}"
+                elif disadvantage:
+                    roll1, roll2 = random.randint(1, 20), random.randint(1, 20)
+                    roll = min(roll1, roll2)
+                    roll_desc = f"2d20 불리함({roll1}, {roll2}) -> {roll}"
+                else:
+                    roll = random.randint(1, 20)
+                    roll_desc = f"d20({roll})"
+                
+                modifier = (ability_score - 10) // 2
+                total = roll + modifier
+                success = total >= difficulty
+                
+                result = {
+                    "roll": roll,
+                    "modifier": modifier,
+                    "total": total,
+                    "difficulty": difficulty,
+                    "success": success,
+                    "critical_success": roll == 20,
+                    "critical_failure": roll == 1,
+                    "description": f"{roll_desc} + 수정치({modifier}) = {total} vs DC{difficulty} - {'성공' if success else '실패'}"
+                }
+                
+                logger.info("능력치 판정: %s", result['description'])
+                return json.dumps(result, ensure_ascii=False)
+            except Exception as e:
+                logger.error("능력치 판정 실패: %s", e)
+                return json.dumps({"error": str(e)}, ensure_ascii=False)
 
-class UpdateContextInput(BaseModel):
-    new_context: str = Field(description="새로운 게임 컨텍스트")
+    class GameContextTool(BaseTool):
+        name: str = "get_game_context"
+        description: str = "현재 게임 상황과 컨텍스트를 가져옵니다"
+        
+        @traced_tool
+        def _run(self) -> str:
+            try:
+                context = game_state_manager.get_context()
+                characters = [asdict(char) for char in game_state_manager.state.active_characters]
+                
+                result = {
+                    "current_context": context,
+                    "characters": characters,
+                    "scene": game_state_manager.state.current_scene,
+                    "last_updated": game_state_manager.state.last_updated
+                }
+                return json.dumps(result, ensure_ascii=False)
+            except Exception as e:
+                logger.error("게임 컨텍스트 조회 실패: %s", e)
+                return json.dumps({"error": str(e)}, ensure_ascii=False)
 
-class UpdateContextTool(BaseTool):
-    name: str = "update_game_context"
-    description: str = "게임 상황과 컨텍스트를 업데이트합니다"
-    args_schema: type[BaseModel] = UpdateContextInput
-    
-    def _run(self, new_context: str) -> str:
-        try:
-            game_state_manager.update_context(new_context)
-            return f"✅ 게임 컨텍스트가 업데이트되었습니다: {new_context[:100]}..."
-        except Exception as e:
-            logger.error(f"게임 컨텍스트 업데이트 실패: {e}")
-            return f"❌ 컨텍스트 업데이트 실패: {str(e)}"
+    class UpdateContextInput(BaseModel):
+        new_context: str = Field(description="새로운 게임 컨텍스트")
 
-# Tool 인스턴스 생성
-dice_tool = DiceRollTool()
-ability_tool = AbilityCheckTool()
-context_tool = GameContextTool()
-update_context_tool = UpdateContextTool()
+    class UpdateContextTool(BaseTool):
+        name: str = "update_game_context"
+        description: str = "게임 상황과 컨텍스트를 업데이트합니다"
+        args_schema: type[BaseModel] = UpdateContextInput
+        
+        @traced_tool
+        def _run(self, new_context: str) -> str:
+            try:
+                game_state_manager.update_context(new_context)
+                return f"✅ 게임 컨텍스트가 업데이트되었습니다: {new_context[:100]}..."
+            except Exception as e:
+                logger.error("게임 컨텍스트 업데이트 실패: %s", e)
+                return f"❌ 컨텍스트 업데이트 실패: {str(e)}"
+
+    # Tool 인스턴스 생성
+    return DiceRollTool(), AbilityCheckTool(), GameContextTool(), UpdateContextTool()
 
 # ===== Agent 정의 =====
+# 에이전트 생성과 프롬프트 캐시 예열이 같은 프롬프트를 쓰도록 공유
+GAME_MASTER_PROFILE = {
+    "role": "게임 마스터",
+    "goal": "플레이어 입력에 따라 즉시 반응하고 재미있는 게임을 진행",
+    "backstory": """당신은 숙련된 D&D 게임 마스터입니다. 
+            플레이어의 행동에 즉시 반응하고 흥미진진한 상황을 만들어냅니다.
+            필요시 주사위를 굴리고 상황을 업데이트합니다.""",
+}
+
+def build_system_prompt(profile: dict) -> str:
+    """CrewAI 시스템 프롬프트의 앞부분(role_playing)과 동일한 문자열 생성"""
+    return f"You are {profile['role']}. {profile['backstory']}\nYour personal goal is: {profile['goal']}"
+
 def create_agents():
     """에이전트 생성"""
+    from crewai import Agent
+    
+    dice_tool, ability_tool, context_tool, update_context_tool = create_tools()
+    
     try:
         # Game Master Agent
         game_master = Agent(
-            role="게임 마스터",
-            goal="플레이어 입력에 따라 즉시 반응하고 재미있는 게임을 진행",
-            backstory="""당신은 숙련된 D&D 게임 마스터입니다. 
-            플레이어의 행동에 즉시 반응하고 흥미진진한 상황을 만들어냅니다.
-            필요시 주사위를 굴리고 상황을 업데이트합니다.""",
+            **GAME_MASTER_PROFILE,
             tools=[dice_tool, context_tool, update_context_tool],
             verbose=True,
             llm=f"openai/{config.MODEL_NAME}",
@@ -441,9 +502,112 @@ def create_agents():
         logger.info("에이전트 생성 완료")
         return game_master, rules_advisor
     except Exception as e:
-        logger.error(f"에이전트 생성 실패: {e}")
+        logger.error("에이전트 생성 실패: %s", e)
         raise
 
+# ===== 연결 워밍업 =====
+class ConnectionWarmup:
+    """백그라운드 LLM 연결 확인 및 프롬프트 캐시 예열
+    
+    연결 테스트, GM 시스템 프롬프트 KV 캐시 예열, Crew 생성을 동시에 시작하고
+    첫 턴에서 아직 끝나지 않은 작업만 기다린다.
+    """
+    
+    def __init__(self, engine: "ImprovedDnDGameEngine"):
+        self.engine = engine
+        self.latencies = {}
+        self.errors = {}
+        self._futures = {}
+    
+    def start(self):
+        """워밍업 작업 시작 (즉시 반환)"""
+        jobs = {
+            "connection": self.engine.test_connection,
+            "prompt_cache": self._prime_prompt_cache,
+            "crew": self.engine._get_crew,
+        }
+        for name, job in jobs.items():
+            future = Future()
+            self._futures[name] = future
+            # 데몬 스레드: 워밍업 중 게임을 종료해도 응답을 기다리지 않음
+            threading.Thread(
+                target=self._run, args=(name, job, future),
+                name=f"warmup-{name}", daemon=True
+            ).start()
+        logger.info("LLM 워밍업 시작 (백그라운드)")
+    
+    def _run(self, name: str, job, future: Future):
+        """작업 실행 및 소요 시간 기록"""
+        start = time.perf_counter()
+        try:
+            future.set_result(job())
+        except Exception as e:
+            self.errors[name] = e
+            future.set_exception(e)
+        finally:
+            self.latencies[name] = time.perf_counter() - start
+            logger.info("워밍업 '%s' 종료: %.2f초", name, self.latencies[name])
+    
+    def _prime_prompt_cache(self):
+        """GM 시스템 프롬프트를 한 번 보내 서버의 프롬프트(KV) 캐시 예열"""
+        litellm = config.get_litellm()
+        litellm.completion(
+            model=f"openai/{config.MODEL_NAME}",
+            messages=[
+                {"role": "system", "content": build_system_prompt(GAME_MASTER_PROFILE)},
+                {"role": "user", "content": "준비"}
+            ],
+            api_base=config.API_BASE_URL,
+            api_key=config.API_KEY,
+            temperature=0.0,
+            max_tokens=1,
+            timeout=config.TIMEOUT
+        )
+    
+    @property
+    def is_ready(self) -> bool:
+        """모든 워밍업 작업 완료 여부"""
+        return bool(self._futures) and all(f.done() for f in self._futures.values())
+    
+    def wait(self, timeout: float = None) -> bool:
+        """남은 워밍업 작업 대기 후 연결 테스트 결과 반환"""
+        pending = [f for f in self._futures.values() if not f.done()]
+        if pending:
+            start = time.perf_counter()
+            wait_futures(pending, timeout=timeout)
+            logger.info("첫 턴이 워밍업 완료를 %.2f초 기다림", time.perf_counter() - start)
+        
+        # 캐시 예열/Crew 생성 실패는 치명적이지 않음 (턴 처리 중 재시도)
+        for name in ("prompt_cache", "crew"):
+            if name in self.errors:
+                logger.warning("워밍업 '%s' 실패 (무시): %s", name, self.errors[name])
+        
+        return self._futures["connection"].result(timeout=0)
+    
+    def describe(self) -> str:
+        """준비 상태 및 지연 시간 요약"""
+        if not self._futures:
+            return "⚪ 워밍업 미실행"
+        
+        labels = {"connection": "연결", "prompt_cache": "프롬프트 캐시", "crew": "에이전트"}
+        parts = []
+        for name, label in labels.items():
+            if name in self.errors:
+                parts.append(f"{label} 실패")
+            elif name in self.latencies:
+                parts.append(f"{label} {self.latencies[name]:.1f}초")
+            else:
+                parts.append(f"{label} 진행 중")
+        
+        connection = self._futures["connection"]
+        if connection.done() and not connection.exception() and not connection.result():
+            state = "🔴 연결 실패 (오프라인 모드)"
+        elif self.is_ready:
+            state = "🟢 준비 완료"
+        else:
+            state = "🟡 준비 중"
+        return f"{state} ({', '.join(parts)})"
+
 # ===== 개선된 게임 엔진 =====
 class ImprovedDnDGameEngine:
     """개선된 D&D 게임 엔진"""
@@ -451,12 +615,18 @@ class ImprovedDnDGameEngine:
     def __init__(self):
         self.is_running = False
         self.offline_mode = False
+        self._connection_checked = False
+        self._warmup = None
         self._crew = None
         self._agents = None
         self.logger = logging.getLogger(self.__class__.__name__)
+        recorder.set_metrics_file(config.METRICS_FILE)
         
     def test_connection(self) -> bool:
         """LLM 연결 테스트"""
+        import requests
+        litellm = config.get_litellm()
+        
         try:
             self.logger.info("LLM 연결 테스트 중...")
             response = litellm.completion(
@@ -471,18 +641,18 @@ class ImprovedDnDGameEngine:
             self.logger.info("✅ LLM 연결 성공!")
             return True
         except requests.exceptions.ConnectionError as e:
-            self.logger.error(f"❌ 연결 오류: {e}")
+            self.logger.error("❌ 연결 오류: %s", e)
             self.offline_mode = True
             return False
         except requests.exceptions.Timeout as e:
-            self.logger.error(f"❌ 시간 초과: {e}")
+            self.logger.error("❌ 시간 초과: %s", e)
             self.offline_mode = True
             return False
         except litellm.AuthenticationError as e:
-            self.logger.error(f"❌ 인증 오류: {e}")
+            self.logger.error("❌ 인증 오류: %s", e)
             return False
         except Exception as e:
-            self.logger.error(f"❌ 예상치 못한 오류: {e}")
+            self.logger.error("❌ 예상치 못한 오류: %s", e)
             self.offline_mode = True
             return False
     
@@ -490,6 +660,9 @@ class ImprovedDnDGameEngine:
         """Crew 인스턴스 가져오기 (재사용)"""
         if self._crew is None or self._agents is None:
             try:
+                config.get_litellm()
+                from crewai import Crew, Process
+                
                 self._agents = create_agents()
                 self._crew = Crew(
                     agents=self._agents,
@@ -497,37 +670,46 @@ class ImprovedDnDGameEngine:
                     process=Process.sequential,
                     verbose=False
                 )
+                metrics.install_crewai_hooks()
                 self.logger.info("Crew 인스턴스 생성 완료")
             except Exception as e:
-                self.logger.error(f"Crew 생성 실패: {e}")
+                self.logger.error("Crew 생성 실패: %s", e)
                 raise
         return self._crew
     
     @contextmanager
     def _error_handler(self, operation: str):
         """에러 처리 컨텍스트 매니저"""
+        import requests
+        litellm = config.get_litellm()
+        
         try:
             yield
         except requests.exceptions.ConnectionError as e:
-            self.logger.warning(f"{operation} - 연결 오류: {e}")
+            self.logger.warning("%s - 연결 오류: %s", operation, e)
             self.offline_mode = True
         except requests.exceptions.Timeout as e:
-            self.logger.warning(f"{operation} - 시간 초과: {e}")
+            self.logger.warning("%s - 시간 초과: %s", operation, e)
             self.offline_mode = True
         except litellm.AuthenticationError as e:
-            self.logger.error(f"{operation} - 인증 오류: {e}")
+            self.logger.error("%s - 인증 오류: %s", operation, e)
             raise
         except Exception as e:
-            self.logger.error(f"{operation} - 예상치 못한 오류: {e}")
+            self.logger.error("%s - 예상치 못한 오류: %s", operation, e)
             raise
     
     def start_game(self) -> str:
         """게임 시작"""
         self.logger.info("=== D&D Crew AI 게임 시작 ===")
         
-        # 연결 테스트
-        if not self.test_connection():
-            self.logger.warning("오프라인 모드로 시작")
+        # 연결 테스트 - 빠른 시작 모드에서는 백그라운드 워밍업 후 첫 턴에서 확인
+        if config.FAST_START:
+            self._warmup = ConnectionWarmup(self)
+            self._warmup.start()
+        else:
+            self._connection_checked = True
+            if not self.test_connection():
+                self.logger.warning("오프라인 모드로 시작")
         
         self.is_running = True
         
@@ -565,21 +747,42 @@ class ImprovedDnDGameEngine:
         if not self.is_running:
             return "❌ 게임이 시작되지 않았습니다. start_game()을 먼저 호출하세요."
         
+        with recorder.turn():
+            return self._process_turn(player_input)
+    
+    def _process_turn(self, player_input: str) -> str:
+        """한 턴 처리 - 단계별 소요 시간은 metrics.recorder에 기록"""
         # 입력 검증
-        sanitized_input = InputValidator.sanitize_input(player_input)
+        with recorder.span("validate"):
+            sanitized_input = InputValidator.sanitize_input(player_input)
+            valid = bool(sanitized_input) and InputValidator.validate_command(sanitized_input)
         if not sanitized_input:
             return "❌ 유효하지 않은 입력입니다."
         
-        if not InputValidator.validate_command(sanitized_input):
+        if not valid:
             return "❌ 입력이 너무 깁니다. 간단하게 입력해주세요."
         
-        self.logger.info(f"플레이어 입력: {sanitized_input}")
+        self.logger.info("플레이어 입력: %s", sanitized_input)
+        
+        # 빠른 시작 모드: 워밍업이 끝나지 않았으면 대기
+        if not self._connection_checked:
+            with recorder.span("warmup_wait"):
+                if self._warmup is not None:
+                    connected = self._warmup.wait()
+                else:
+                    connected = self.test_connection()
+            self._connection_checked = True
+            if not connected:
+                self.logger.warning("오프라인 모드로 전환")
         
         if self.offline_mode:
             return self._offline_response(sanitized_input)
         
         with self._error_handler("플레이어 입력 처리"):
+            from crewai import Task
+            
             try:
+                setup_start = time.perf_counter()
                 # 동적 Task 생성
                 response_task = Task(
                     description=f"""
@@ -603,18 +806,23 @@ class ImprovedDnDGameEngine:
                 # 새로운 Task로 Crew 업데이트
                 crew = self._get_crew()
                 crew.tasks = [response_task]
+                recorder.add_span("crew_setup", time.perf_counter() - setup_start)
                 
-                result = crew.kickoff()
+                # LLM 호출과 도구 실행 (세부 시간은 llm/tool.* span으로 기록)
+                with recorder.span("kickoff"):
+                    result = crew.kickoff()
+                metrics.flush_crewai_events()
+                metrics.record_crew_usage(crew, result)
                 self.logger.info("GM 응답 생성 완료")
                 return str(result)
                 
             except Exception as e:
-                self.logger.error(f"입력 처리 중 오류: {e}")
+                self.logger.error("입력 처리 중 오류: %s", e)
                 return self._offline_response(sanitized_input)
     
     def _offline_response(self, player_input: str) -> str:
         """오프라인 모드 응답"""
-        self.logger.info(f"오프라인 모드로 응답: {player_input}")
+        self.logger.info("오프라인 모드로 응답: %s", player_input)
         
         responses = {
             "조사": "🔍 동굴을 조사하기로 했습니다. 어둠 속에서 이상한 소리가 들립니다...",
@@ -643,6 +851,7 @@ class ImprovedDnDGameEngine:
 - 'save [파일명]' - 게임 저장
 - 'load [파일명]' - 게임 불러오기
 - 'saves' - 저장 파일 목록
+- 'stats' - 턴 지연 시간/토큰 통계 (p50/p95/p99)
 
 **게임 내 행동:**
 - '조사하기' - 주변을 조사
@@ -672,7 +881,7 @@ class ImprovedDnDGameEngine:
             else:
                 return "❌ 게임 저장에 실패했습니다."
         except Exception as e:
-            self.logger.error(f"게임 저장 오류: {e}")
+            self.logger.error("게임 저장 오류: %s", e)
             return f"❌ 게임 저장 중 오류가 발생했습니다: {str(e)}"
     
     def load_game(self, filename: str) -> str:
@@ -683,7 +892,7 @@ class ImprovedDnDGameEngine:
             else:
                 return f"❌ 저장 파일을 찾을 수 없습니다: {filename}"
         except Exception as e:
-            self.logger.error(f"게임 불러오기 오류: {e}")
+            self.logger.error("게임 불러오기 오류: %s", e)
             return f"❌ 게임 불러오기 중 오류가 발생했습니다: {str(e)}"
     
     def list_saves(self) -> str:
@@ -696,9 +905,21 @@ class ImprovedDnDGameEngine:
             save_list = "\n".join([f"  - {save}" for save in sorted(saves, reverse=True)])
             return f"📂 **저장된 게임 목록:**\n{save_list}\n\n사용법: load [파일명]"
         except Exception as e:
-            self.logger.error(f"저장 파일 목록 조회 오류: {e}")
+            self.logger.error("저장 파일 목록 조회 오류: %s", e)
             return f"❌ 저장 파일 목록을 불러올 수 없습니다: {str(e)}"
     
+    def get_warmup_status(self) -> str:
+        """LLM 준비 상태"""
+        if self._warmup is not None:
+            return self._warmup.describe()
+        if self.offline_mode:
+            return "🔴 오프라인 모드"
+        return "🟢 연결 확인됨" if self._connection_checked else "⚪ 첫 행동 시 연결 확인"
+    
+    def get_stats(self) -> str:
+        """턴 지연 시간/토큰 통계 (p50/p95/p99)"""
+        return recorder.format_stats()
+    
     def get_status(self) -> str:
         """게임 상태 정보"""
         try:
@@ -721,9 +942,10 @@ class ImprovedDnDGameEngine:
 - 🎒 인벤토리: {', '.join(char.inventory)}
                 """.strip())
             
+            status_info.append(f"🔗 LLM 서버: {self.get_warmup_status()}")
             return "\n\n".join(status_info)
         except Exception as e:
-            self.logger.error(f"상태 조회 오류: {e}")
+            self.logger.error("상태 조회 오류: %s", e)
             return f"❌ 상태를 조회할 수 없습니다: {str(e)}"
 
 # ===== 개선된 메인 실행 함수 =====
@@ -739,6 +961,10 @@ def run_game():
         start_message = game.start_game()
         print(start_message)
         
+        if config.FAST_START:
+            print(f"\n🔥 LLM 서버 워밍업 중: {game.get_warmup_status()}")
+            print("   ('status'로 준비 상태 확인, 첫 행동 전에 끝나지 않으면 자동으로 기다립니다)")
+        
         print("\n" + "="*60)
         print("🎮 게임이 시작되었습니다!")
         print("'help'를 입력하면 명령어를 볼 수 있습니다.")
@@ -762,6 +988,8 @@ def run_game():
                     print(game.get_help())
                 elif user_input.lower() == 'status':
                     print(game.get_status())
+                elif user_input.lower() == 'stats':
+                    print(game.get_stats())
                 elif user_input.lower() == 'saves':
                     print(game.list_saves())
                 elif user_input.lower().startswith('save'):
@@ -781,7 +1009,8 @@ def run_game():
                 else:
                     # 일반 게임 입력 처리
                     print("🎭 GM이 생각하는 중...")
-                    response = game.process_input(user_input)
+                    with log_context():
+                        response = game.process_input(user_input)
                     print(f"\n{response}")
                     
             except KeyboardInterrupt:
@@ -791,14 +1020,14 @@ def run_game():
                 print("\n\n🎮 입력 스트림이 종료되었습니다.")
                 break
             except Exception as e:
-                logger.error(f"게임 루프 중 오류: {e}")
+                logger.error("게임 루프 중 오류: %s", e)
                 print(f"❌ 처리 중 오류가 발생했습니다: {str(e)}")
                 print("게임을 계속 진행합니다...")
                 
     except KeyboardInterrupt:
         print("\n🎮 게임 초기화가 중단되었습니다.")
     except Exception as e:
-        logger.error(f"게임 실행 중 치명적 오류: {e}")
+        logger.error("게임 실행 중 치명적 오류: %s", e)
         print(f"❌ 게임 실행 중 치명적 오류가 발생했습니다: {str(e)}")
         print("\n🔧 문제 해결 방법:")
         print("1. .env 파일의 환경 변수 확인")
@@ -880,11 +1109,15 @@ def show_welcome():
     input()
 
 if __name__ == "__main__":
+    setup_logging()
     try:
         show_welcome()
         run_game()
     except Exception as e:
-        logger.error(f"프로그램 실행 실패: {e}")
+        logger.error("프로그램 실행 실패: %s", e)
         print(f"❌ 프로그램을 시작할 수 없습니다: {str(e)}")
     finally:
+        summary_path = recorder.save_summary()
+        if summary_path:
+            print(f"📊 턴 계측 요약 저장: {summary_path}")
         print("\n👋 D&D Crew AI를 이용해주셔서 감사합니다!")
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""
+도메인별 본문 추출 전략 통계
+
+URL마다 requests → Playwright → 간단 파싱 순서로 모두 시도하면, 항상 JS가 필요하거나 항상 403인 도메인에서
+느린 시도를 매번 낭비한다. 도메인별로 방법마다 시도/성공 횟수와 소요 시간을 저장해 두고
+- 성공률(라플라스 보정)이 높고 빠른 방법부터 시도하고
+- 충분히 시도했는데 한 번도 성공하지 못한 방법은 METHOD_RETRY_SECONDS 동안 건너뛰며
+- 페이지 추출이 연속으로 실패한 도메인은 지수 백오프로 일정 시간 아예 건너뛴다 (네거티브 캐시)
+
+DOMAIN_STATS_FILE (기본값 domain_stats.json)에 저장한다.
+"""
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DOMAIN_STATS_FILE = os.getenv("DOMAIN_STATS_FILE", "domain_stats.json")
+# 이만큼 시도해 한 번도 성공하지 못한 방법은 건너뜀
+MIN_ATTEMPTS_TO_SKIP = 3
+# 건너뛴 방법도 이 시간이 지나면 다시 시도 (사이트 변경 대비)
+METHOD_RETRY_SECONDS = 24 * 3600
+# 연속 실패가 이만큼 쌓인 도메인은 네거티브 캐시에 넣음
+FAILURES_TO_BLOCK = 3
+DOMAIN_BACKOFF_SECONDS = 1800
+MAX_BACKOFF_SECONDS = 7 * 24 * 3600
+
+
+def domain_of(url: str) -> str:
+    """통계 키로 쓰는 도메인 (소문자, www. 제거)"""
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class DomainStats:
+    """도메인별 추출 방법 통계와 네거티브 캐시"""
+
+    def __init__(self, path: str = None):
+        self.path = Path(path or DOMAIN_STATS_FILE)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.domains: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8")).get("domains", {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("도메인 통계 읽기 실패 (%s): %s", self.path, e)
+            return {}
+
+    def _domain(self, domain: str) -> Dict[str, Any]:
+        return self.domains.setdefault(domain, {
+            "methods": {}, "pages": 0, "page_failures": 0,
+            "consecutive_failures": 0, "backoff_seconds": 0, "blocked_until": 0,
+        })
+
+    # ----- 조회 -----
+    def blocked_for(self, domain: str) -> float:
+        """네거티브 캐시에 남은 시간 (초, 차단되지 않았으면 0)"""
+        with self._lock:
+            entry = self.domains.get(domain)
+            return max(0.0, entry["blocked_until"] - time.time()) if entry else 0.0
+
+    def plan(self, domain: str, methods: Sequence[str], first: str = None) -> List[str]:
+        """시도할 방법 순서 (건너뛸 방법 제외)
+
+        first를 주면 통계와 관계없이 그 방법을 맨 앞에 둔다 (예: 페이지 캐시 재검증이 가능한 경우).
+        """
+        with self._lock:
+            stats = self.domains.get(domain, {}).get("methods", {})
+            now = time.time()
+            any_success = any(m.get("successes") for m in stats.values())
+
+            def skip(method: str) -> bool:
+                m = stats.get(method)
+                return bool(m and any_success and not m["successes"] and m["attempts"] >= MIN_ATTEMPTS_TO_SKIP
+                            and now - m.get("last_attempt", 0) < METHOD_RETRY_SECONDS)
+
+            def rank(method: str):
+                m = stats.get(method) or {"attempts": 0, "successes": 0, "seconds": 0.0}
+                rate = (m["successes"] + 1) / (m["attempts"] + 2)
+                latency = m["seconds"] / m["attempts"] if m["attempts"] else 0.0
+                return (-rate, latency)
+
+            ordered = sorted((m for m in methods if not skip(m)), key=rank)  # 동률이면 기본 순서 유지
+        if first in methods:
+            ordered = [first] + [m for m in ordered if m != first]
+        return ordered
+
+    # ----- 기록 -----
+    def record(self, domain: str, method: str, ok: bool, seconds: float):
+        """방법 한 번 시도 결과"""
+        with self._lock:
+            m = self._domain(domain)["methods"].setdefault(method, {"attempts": 0, "successes": 0, "seconds": 0.0})
+            m["attempts"] += 1
+            m["successes"] += int(ok)
+            m["seconds"] = round(m["seconds"] + seconds, 3)
+            m["last_attempt"] = time.time()
+            if ok:
+                m["last_success"] = m["last_attempt"]
+            self._dirty = True
+
+    def record_page(self, domain: str, ok: bool):
+        """페이지 하나의 최종 결과 - 연속 실패 시 지수 백오프로 차단"""
+        with self._lock:
+            entry = self._domain(domain)
+            entry["pages"] += 1
+            if ok:
+                entry.update(consecutive_failures=0, backoff_seconds=0, blocked_until=0)
+            else:
+                entry["page_failures"] += 1
+                entry["consecutive_failures"] += 1
+                if entry["consecutive_failures"] >= FAILURES_TO_BLOCK:
+                    backoff = min(MAX_BACKOFF_SECONDS, (entry["backoff_seconds"] * 2) or DOMAIN_BACKOFF_SECONDS)
+                    entry["backoff_seconds"] = backoff
+                    entry["blocked_until"] = time.time() + backoff
+                    logger.info("⛔ 도메인 네거티브 캐시: %s (연속 실패 %s회, %s초 동안 건너뜀)",
+                                domain, entry["consecutive_failures"], backoff)
+            self._dirty = True
+
+    def save(self):
+        """변경이 있으면 파일에 저장 (임시 파일 후 교체)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps({"domains": self.domains}, ensure_ascii=False, indent=1)
+            self._dirty = False
+        try:
+            if self.path.parent != Path("."):
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(payload, encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning("도메인 통계 저장 실패: %s", e)
+
+    def summary(self, domain: str) -> Optional[Dict[str, Any]]:
+        """도메인 통계 사본 (없으면 None)"""
+        with self._lock:
+            entry = self.domains.get(domain)
+            return json.loads(json.dumps(entry)) if entry else None
+
+
+# 모듈 기본 통계 (처음 사용할 때 로드)
+_default: Optional[DomainStats] = None
+_default_lock = threading.Lock()
+
+
+def get_domain_stats() -> DomainStats:
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = DomainStats()
+        return _default
@@ -0,0 +1,195 @@
+"""
+메모리 매핑 임베딩 저장소 (콘텐츠 해시 키, NumPy 상위 k 코사인 검색)
+
+같은 텍스트(검색 결과, 세션 로그, 코퍼스 청크)의 임베딩을 실행마다 다시 계산하지 않도록
+정규화한 벡터를 .npy 행렬에 쌓아 두고 mmap으로 연다 (열 때 읽는 것은 키 목록뿐).
+
+  meta.json      모델, 차원, dtype
+  vectors.npy    (용량, 차원) 행렬 - 가득 차면 두 배 용량의 새 파일로 복사 후 교체
+  keys.txt       행 번호 순서의 콘텐츠 해시 (한 줄에 하나, 추가 전용)
+
+벡터를 먼저 쓰고 flush한 뒤 키를 추가하므로, 중단되어도 키가 쓰지 않은 행을 가리키지 않는다.
+검색은 행렬곱 한 번과 argpartition으로 상위 k개를 고른다 (float32 수천 행 기준 1ms 이하).
+float16은 디스크/메모리가 절반이지만 NumPy float16 행렬곱이 느려 블록 단위로 float32로 올려 계산한다.
+"""
+import os
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR", "embedding_store")
+EMBEDDING_DTYPE = os.getenv("EMBEDDING_DTYPE", "float32")
+INITIAL_CAPACITY = 1024
+# float16 검색 시 한 번에 float32로 올리는 행 수
+UPCAST_BLOCK_ROWS = 8192
+
+
+def text_hash(text: str) -> str:
+    """임베딩 키 (텍스트 내용 SHA-256)"""
+    return hashlib.sha256(text.encode("utf-8", "replace")).hexdigest()
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 (float32)"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def top_k_cosine(matrix: np.ndarray, query: np.ndarray, k: int,
+                 rows: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+    """정규화된 행렬에서 query와 코사인 유사도 상위 k개 [(행 번호, 유사도)] (내림차순)
+
+    rows를 주면 그 행들 안에서만 찾는다.
+    """
+    query = normalize(query)[0]
+    candidates = matrix if rows is None else matrix[rows]
+    if candidates.dtype == np.float32:
+        scores = candidates @ query
+    else:
+        scores = np.empty(len(candidates), dtype=np.float32)
+        for start in range(0, len(candidates), UPCAST_BLOCK_ROWS):
+            block = np.asarray(candidates[start:start + UPCAST_BLOCK_ROWS], dtype=np.float32)
+            scores[start:start + len(block)] = block @ query
+    if len(scores) == 0 or k <= 0:
+        return []
+    k = min(k, len(scores))
+    best = np.argpartition(-scores, k - 1)[:k]
+    best = best[np.argsort(-scores[best], kind="stable")]
+    ids = best if rows is None else np.asarray(rows)[best]
+    return [(int(i), float(scores[j])) for i, j in zip(ids, best)]
+
+
+class EmbeddingStore:
+    """콘텐츠 해시 → 정규화 임베딩 행 (추가 전용, 스레드 안전)"""
+
+    def __init__(self, path: str = None, model: str = "", dtype: str = None):
+        self.path = Path(path or EMBEDDING_STORE_DIR)
+        self.model = model
+        self._lock = threading.Lock()
+        meta = self._read_meta()
+        self.dtype = np.dtype(meta.get("dtype") or dtype or EMBEDDING_DTYPE)
+        self.dim = int(meta.get("dim") or 0)
+        if meta.get("model") and model and meta["model"] != model:
+            raise ValueError(f"임베딩 모델 불일치: 저장소 {meta['model']}, 요청 {model}")
+        self.model = meta.get("model") or model
+        self.keys: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self._vectors: Optional[np.memmap] = None
+        keys_path = self.path / "keys.txt"
+        if keys_path.exists():
+            self.keys = keys_path.read_text(encoding="ascii").split()
+            self.rows = {key: row for row, key in enumerate(self.keys)}
+            self._vectors = np.load(self.path / "vectors.npy", mmap_mode="r+")
+            if len(self.keys) > len(self._vectors):
+                # 키가 행보다 많을 수는 없지만, 파일이 깨졌으면 남은 행까지만 사용
+                logger.warning("임베딩 키 수(%s)가 행 수(%s)보다 많아 잘라냄", len(self.keys), len(self._vectors))
+                del self.keys[len(self._vectors):]
+                self.rows = {key: row for row, key in enumerate(self.keys)}
+
+    def _read_meta(self) -> dict:
+        try:
+            return json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.rows
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """사용 중인 행만 보는 읽기 전용 뷰 (복사 없음)"""
+        if self._vectors is None:
+            return np.zeros((0, self.dim), dtype=self.dtype)
+        view = self._vectors[:len(self.keys)]
+        view.flags.writeable = False
+        return view
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self.rows.get(key)
+        return None if row is None else np.asarray(self._vectors[row], dtype=np.float32)
+
+    def add(self, keys: Sequence[str], vectors: np.ndarray) -> List[int]:
+        """임베딩 추가 (이미 있는 키는 건너뜀) - 키별 행 번호 반환"""
+        vectors = normalize(vectors)
+        if len(keys) != len(vectors):
+            raise ValueError("키와 벡터 개수가 다릅니다")
+        with self._lock:
+            if not self.dim:
+                self.dim = vectors.shape[1]
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"임베딩 차원 불일치: 저장소 {self.dim}, 입력 {vectors.shape[1]}")
+            new = [(key, vector) for key, vector in zip(keys, vectors) if key not in self.rows]
+            new = list({key: vector for key, vector in new}.items())
+            if new:
+                start = len(self.keys)
+                self._reserve(start + len(new))
+                self._vectors[start:start + len(new)] = np.stack([vector for _, vector in new]).astype(self.dtype)
+                self._vectors.flush()
+                with open(self.path / "keys.txt", "a", encoding="ascii") as f:
+                    f.write("".join(f"{key}\n" for key, _ in new))
+                for offset, (key, _) in enumerate(new):
+                    self.keys.append(key)
+                    self.rows[key] = start + offset
+            return [self.rows[key] for key in keys]
+
+    def _reserve(self, rows: int):
+        """용량 확보 (부족하면 두 배씩 늘린 새 파일로 복사 후 교체)"""
+        capacity = 0 if self._vectors is None else len(self._vectors)
+        if rows <= capacity:
+            return
+        new_capacity = max(INITIAL_CAPACITY, capacity)
+        while new_capacity < rows:
+            new_capacity *= 2
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp = self.path / f"vectors.npy.{os.getpid()}.{threading.get_ident()}.tmp"
+        grown = np.lib.format.open_memmap(tmp, mode="w+", dtype=self.dtype, shape=(new_capacity, self.dim))
+        if capacity:
+            grown[:len(self.keys)] = self._vectors[:len(self.keys)]
+        grown.flush()
+        del grown
+        os.replace(tmp, self.path / "vectors.npy")
+        self._vectors = np.load(self.path / "vectors.npy", mmap_mode="r+")
+        meta = {"model": self.model, "dim": self.dim, "dtype": self.dtype.name}
+        (self.path / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+    def ensure(self, texts: Sequence[str], embed: Callable[[Sequence[str]], np.ndarray]) -> List[int]:
+        """텍스트들의 행 번호 (저장소에 없는 텍스트만 embed로 계산해 추가)"""
+        keys = [text_hash(text) for text in texts]
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in self.rows:
+                missing.setdefault(key, text)
+        if missing:
+            logger.info("🧮 임베딩 계산: %s개 (저장소 재사용 %s개)", len(missing), len(set(keys)) - len(missing))
+            self.add(list(missing), embed(list(missing.values())))
+        return [self.rows[key] for key in keys]
+
+    def search(self, query: np.ndarray, k: int = 5, rows: Optional[Sequence[int]] = None) -> List[Tuple[str, float]]:
+        """코사인 유사도 상위 k개 [(키, 유사도)]"""
+        hits = top_k_cosine(self.matrix, query, k, None if rows is None else np.asarray(rows, dtype=np.int64))
+        return [(self.keys[row], score) for row, score in hits]
+
+
+# 모델별 기본 저장소
+_stores: Dict[str, EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_store(model: str) -> EmbeddingStore:
+    """EMBEDDING_STORE_DIR/<모델 이름> 저장소 (모델이 다르면 벡터 공간이 달라 따로 둠)"""
+    with _stores_lock:
+        if model not in _stores:
+            safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in model) or "default"
+            _stores[model] = EmbeddingStore(os.path.join(EMBEDDING_STORE_DIR, safe), model=model)
+        return _stores[model]
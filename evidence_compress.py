@@ -0,0 +1,239 @@
+"""
+추출 요약 기반 근거 압축
+
+검색/추출한 페이지 본문을 작성 단계 전에 토큰 예산 안으로 줄인다 (LLM 호출 없이 문장 선택만).
+1. 문장 분리 후 주제/검색어 용어와의 겹침(IDF 가중)과 문서 내 위치로 점수 계산
+2. 점수 순으로 고르되 이미 고른 문장과 용어 집합이 EVIDENCE_REDUNDANCY 이상 겹치면 제외
+3. 섹션(출처)별 예산을 넘지 않게 선택하고 원래 순서대로 이어 붙임
+   (섹션 상한보다 긴 문장은 상한 크기로 나눠 후보로 삼고, 고를 문장이 없으면 섹션별로 잘라 예산을 지킴)
+
+토큰 수는 모델 토크나이저 없이 추정한다 (한글 음절 1토큰, 그 외 4글자당 1토큰).
+"""
+import re
+import math
+from collections import Counter
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 선택한 문장끼리 허용하는 최대 용어 겹침 (Jaccard)
+EVIDENCE_REDUNDANCY = 0.6
+# 너무 짧은 문장(메뉴/캡션 조각)은 후보에서 제외
+MIN_SENTENCE_CHARS = 20
+
+_SENTENCE_END = re.compile(r'(?<=[.!?。])\s+|\n+')
+_TERM = re.compile(r'[가-힣]{2,}|[A-Za-z][A-Za-z0-9+#-]+|\d[\d.,%]*')
+_HANGUL = re.compile(r'[가-힣]')
+# 한국어 조사/어미로 끝나는 용어는 어간(앞 두 글자 이상)으로도 비교
+_KOREAN_SUFFIX = re.compile(r'(은|는|이|가|을|를|의|에|에서|으로|로|와|과|도|만|까지|부터|에게|한|하는|했다|합니다|된|되는)$')
+_STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "are", "was", "from", "have", "has", "will",
+    "which", "their", "more", "also", "into", "about", "than", "been", "its", "can", "our",
+    "그리고", "하지만", "또한", "있는", "있다", "있습니다", "대한", "통해", "위한", "이번", "것으로",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 추정 (한글 음절 1토큰, 나머지 4글자당 1토큰)"""
+    if not text:
+        return 0
+    hangul = len(_HANGUL.findall(text))
+    return hangul + math.ceil((len(text) - hangul) / 4)
+
+
+def terms(text: str) -> List[str]:
+    """소문자 용어 목록 (불용어 제외, 한국어는 조사/어미를 뗀 어간)"""
+    result = []
+    for term in _TERM.findall(text.lower()):
+        if term in _STOPWORDS:
+            continue
+        stem = _KOREAN_SUFFIX.sub('', term)
+        result.append(stem if len(stem) >= 2 else term)
+    return result
+
+
+def split_sentences(text: str) -> List[str]:
+    """문장 분리 (문장 부호 뒤 공백, 줄바꿈 기준)"""
+    return [s.strip() for s in _SENTENCE_END.split(text or "") if len(s.strip()) >= MIN_SENTENCE_CHARS]
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """앞부분을 max_tokens 안으로 자름 (가능하면 단어 경계에서)"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    # 추정 토큰은 앞부분 길이에 대해 단조 증가 - 예산 안에 드는 가장 긴 앞부분을 이분 탐색
+    # (글자 4개당 최소 1토큰이므로 max_tokens * 4자를 넘는 앞부분은 볼 필요 없음)
+    low, high = 0, min(len(text), max_tokens * 4)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    cut = text[:low]
+    space = cut.rfind(" ")
+    return cut[:space] if space > len(cut) // 2 else cut
+
+
+def _split_to_tokens(text: str, max_tokens: int) -> List[str]:
+    """max_tokens보다 긴 문장을 max_tokens 이하 조각으로 (짧은 끝 조각은 버림)"""
+    pieces = []
+    rest = text if max_tokens > 0 else ""
+    while rest:
+        # 앞 max_tokens * 4 + 1자 안에서만 자름 (그보다 긴 앞부분은 반드시 예산을 넘음)
+        piece = truncate_to_tokens(rest[:max_tokens * 4 + 1], max_tokens) or rest[:1]
+        rest = rest[len(piece):].strip()
+        if len(piece.strip()) >= MIN_SENTENCE_CHARS:
+            pieces.append(piece.strip())
+    return pieces
+
+
+def truncate_sections(sections: Sequence[Tuple[str, str]], token_budget: int) -> List[Tuple[str, str]]:
+    """섹션마다 본문 앞부분을 (예산 / 섹션 수) 토큰 안으로 자름 - 고를 문장이 없을 때의 대안"""
+    cap = max(0, token_budget) // max(1, len(sections))
+    truncated = [(header, truncate_to_tokens(body, cap)) for header, body in sections]
+    return [(header, body) for header, body in truncated if body]
+
+
+@dataclass
+class CompressionStats:
+    """압축 전후 크기"""
+    original_chars: int = 0
+    compressed_chars: int = 0
+    original_tokens: int = 0
+    compressed_tokens: int = 0
+    sentences_total: int = 0
+    sentences_kept: int = 0
+    redundant_dropped: int = 0
+
+    @property
+    def ratio(self) -> float:
+        """압축 후 / 압축 전 토큰 비율"""
+        return round(self.compressed_tokens / self.original_tokens, 3) if self.original_tokens else 1.0
+
+    def add(self, other: "CompressionStats"):
+        for name in asdict(self):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def to_dict(self) -> dict:
+        return dict(asdict(self), ratio=self.ratio)
+
+
+@dataclass(eq=False)
+class _Sentence:
+    section: int
+    position: int
+    text: str
+    terms: frozenset
+    tokens: int
+    score: float = 0.0
+
+
+def compress_sections(sections: Sequence[Tuple[str, str]], topic: str,
+                      token_budget: int) -> Tuple[List[Tuple[str, str]], CompressionStats]:
+    """(제목, 본문) 섹션 목록을 전체 token_budget 안으로 추출 압축
+
+    예산은 섹션 수로 나눠 섹션별 상한을 두고, 어떤 섹션이 상한을 다 쓰지 않으면 남은 예산을 다른 섹션이 쓴다.
+    상한보다 긴 문장(문장 부호 없는 본문 등)은 상한 크기 조각으로 나눠 후보로 삼는다.
+    압축 결과 본문의 추정 토큰 합은 token_budget을 넘지 않는다.
+    Returns: (압축된 섹션 목록 - 남은 문장이 없는 섹션은 제외, 통계)
+    """
+    stats = CompressionStats()
+    section_cap = max(1, token_budget // max(1, len(sections)))
+    sentences: List[_Sentence] = []
+    for index, (_, body) in enumerate(sections):
+        stats.original_chars += len(body)
+        stats.original_tokens += estimate_tokens(body)
+        position = 0
+        for sentence in split_sentences(body):
+            # 문장 사이 공백 몫으로 1토큰을 더해 계산 - 이어 붙인 본문도 예산 안에 든다
+            pieces = [sentence]
+            if estimate_tokens(sentence) >= section_cap:
+                pieces = _split_to_tokens(sentence, section_cap - 1)
+            for piece in pieces:
+                sentences.append(_Sentence(index, position, piece, frozenset(terms(piece)),
+                                           estimate_tokens(piece) + 1))
+                position += 1
+    stats.sentences_total = len(sentences)
+    if not sentences or token_budget <= 0:
+        return [], stats
+
+    _score(sentences, topic)
+    used: Counter = Counter()
+    kept: List[_Sentence] = []
+    kept_ids = set()
+    total = 0
+    # 1차: 섹션별 상한 안에서, 2차: 남은 예산을 점수 순으로 (출처 다양성 유지 후 빈자리 채우기)
+    for capped in (True, False):
+        for sentence in sorted(sentences, key=lambda s: -s.score):
+            if id(sentence) in kept_ids or total + sentence.tokens > token_budget:
+                continue
+            if capped and used[sentence.section] + sentence.tokens > section_cap:
+                continue
+            if any(_overlap(sentence.terms, other.terms) >= EVIDENCE_REDUNDANCY for other in kept):
+                if capped:
+                    stats.redundant_dropped += 1
+                continue
+            kept.append(sentence)
+            kept_ids.add(id(sentence))
+            used[sentence.section] += sentence.tokens
+            total += sentence.tokens
+
+    grouped: Dict[int, List[_Sentence]] = {}
+    for sentence in sorted(kept, key=lambda s: (s.section, s.position)):
+        grouped.setdefault(sentence.section, []).append(sentence)
+    compressed = [(sections[index][0], " ".join(s.text for s in chosen)) for index, chosen in grouped.items()]
+
+    stats.sentences_kept = len(kept)
+    for _, body in compressed:
+        stats.compressed_chars += len(body)
+        stats.compressed_tokens += estimate_tokens(body)
+    return compressed, stats
+
+
+def compress_text(text: str, topic: str, token_budget: int) -> Tuple[str, CompressionStats]:
+    """본문 하나를 token_budget 안으로 압축 (이미 예산 안이면 그대로)"""
+    tokens = estimate_tokens(text)
+    if tokens <= token_budget:
+        return text, CompressionStats(len(text), len(text), tokens, tokens)
+    # 빈 줄로 나뉜 단락을 섹션으로 취급 (제목 줄 등 짧은 단락은 다음 단락에 붙임)
+    sections = []
+    for block in re.split(r'\n\s*\n', text):
+        if sections and len(sections[-1][1]) < MIN_SENTENCE_CHARS:
+            sections[-1] = ("", sections[-1][1] + "\n" + block)
+        else:
+            sections.append(("", block))
+    compressed, stats = compress_sections(sections, topic, token_budget)
+    if not compressed:
+        # 고를 문장이 없으면(짧은 줄만 있는 본문) 앞부분을 예산만큼 자름
+        cut = truncate_to_tokens(text, token_budget)
+        stats.compressed_chars, stats.compressed_tokens = len(cut), estimate_tokens(cut)
+        return cut, stats
+    return "\n\n".join(body for _, body in compressed), stats
+
+
+def _score(sentences: List[_Sentence], topic: str):
+    """주제 용어 겹침(IDF 가중) + 앞쪽 문장 가산점 + 수치 포함 가산점"""
+    topic_terms = set(terms(topic))
+    document_frequency = Counter(term for s in sentences for term in s.terms)
+    count = len(sentences)
+    for sentence in sentences:
+        overlap = sum(math.log(1 + count / document_frequency[term]) for term in sentence.terms & topic_terms)
+        position = 1.0 / (1 + sentence.position * 0.2)
+        numeric = 0.3 if any(ch.isdigit() for ch in sentence.text) else 0.0
+        # 긴 문장이 겹침만으로 유리하지 않도록 길이로 나눔
+        sentence.score = overlap / math.sqrt(max(1, len(sentence.terms))) + position + numeric
+
+
+def _overlap(a: Iterable[str], b: Iterable[str]) -> float:
+    a, b = set(a), set(b)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def budget_for_context(max_prompt_tokens: int, *fixed_parts: Optional[str], reserve: int = 0) -> int:
+    """프롬프트 상한에서 고정 부분(태스크 설명 등)과 여유분을 뺀 컨텍스트 예산"""
+    fixed = sum(estimate_tokens(part or "") for part in fixed_parts)
+    return max(0, max_prompt_tokens - fixed - reserve)
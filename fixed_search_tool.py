@@ -1,11 +1,16 @@
 """
 개선된 웹 검색 도구 - 중복 쿼리 방지 및 에러 처리 강화
+
+improved_research_crew.py와 unified_research_crew.py가 함께 사용한다 (검색 캐시/히스토리는 프로세스 공용).
 """
 import os
 import logging
 from datetime import datetime
 import hashlib
-from typing import Set, List, Dict, Any
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Set, List, Dict, Any, Optional, Tuple
 from crewai.tools import tool
 
 # DuckDuckGo Search
@@ -14,15 +19,82 @@ try:
 except ImportError:
     from duckduckgo_search import DDGS
 
-# 전역 변수로 검색 히스토리 관리
+from search_providers import SEARCH_TIMEOUT, SearchError, build_search_router
+from query_dedup import QueryIndex, QueryMatch, reuse_notice
+from research_profile import profile_span
+from report_refresh import EvidenceSet
+
+logger = logging.getLogger(__name__)
+
+# 배치 검색 동시 실행 수 (검색 백엔드 부하/차단 방지)
+SEARCH_CONCURRENCY = int(os.getenv("SEARCH_CONCURRENCY", "4"))
+
+# 다른 스레드가 검색 중인 쿼리의 결과를 기다리는 최대 시간 (초)
+IN_FLIGHT_WAIT = SEARCH_TIMEOUT * 2
+
+# 전역 변수로 검색 히스토리 관리 (배치 주제 모드에서는 여러 크루 스레드가 공유 - _cache_lock으로 보호)
 _search_history: Set[str] = set()
 _search_results_cache: Dict[str, str] = {}
+# 캐시된 쿼리의 원본 검색 결과 (검색어, 결과) - 캐시로 응답할 때도 근거를 기록하기 위함
+_search_results_raw: Dict[str, Tuple[str, List[Dict[str, Any]]]] = {}
+# 결과가 캐시된 쿼리의 근접 중복 조회용 색인 (어순/표기만 다른 검색어 재검색 방지)
+_query_index = QueryIndex()
+# 검색 중인 쿼리 → 완료 이벤트 (같은 쿼리를 동시에 두 번 검색하지 않고 먼저 시작한 검색 결과를 기다림)
+_in_flight: Dict[str, threading.Event] = {}
+_cache_lock = threading.Lock()
+# 현재 실행의 근거 기록 (보고서 갱신용, 갱신 모드에서는 이미 본 결과를 걸러냄)
+search_evidence: contextvars.ContextVar[Optional[EvidenceSet]] = contextvars.ContextVar("search_evidence",
+                                                                                        default=None)
+# 검색 공급자 체인 (DDGS → 로컬 인덱스, SEARCH_PROVIDERS로 변경)
+# DDGS 클라이언트는 스레드별로 재사용 (HTTP 연결 재사용 - 배치 모드의 워커 스레드마다 하나)
+_search_router = build_search_router(lambda: DDGS())
 
 def clear_search_history():
     """검색 히스토리 초기화"""
-    global _search_history, _search_results_cache
-    _search_history.clear()
-    _search_results_cache.clear()
+    with _cache_lock:
+        _search_history.clear()
+        _search_results_cache.clear()
+        _search_results_raw.clear()
+        _query_index.clear()
+
+def _claim(query_hashes: List[str]) -> List[str]:
+    """아직 검색하지 않은 쿼리를 검색 중으로 표시 - 이 호출이 검색할 해시 목록 반환"""
+    claimed = []
+    with _cache_lock:
+        for query_hash in query_hashes:
+            if query_hash not in _search_history:
+                _search_history.add(query_hash)
+                _in_flight[query_hash] = threading.Event()
+                claimed.append(query_hash)
+    return claimed
+
+def _release(query_hashes: List[str]):
+    """검색 완료 (실패 포함) - 기다리는 스레드를 깨움"""
+    with _cache_lock:
+        events = [_in_flight.pop(query_hash, None) for query_hash in query_hashes]
+    for event in events:
+        if event is not None:
+            event.set()
+
+def _cached_result(query_hash: str) -> Optional[str]:
+    """캐시된 결과 - 다른 스레드가 검색 중이면 끝날 때까지 기다린다"""
+    with _cache_lock:
+        event = _in_flight.get(query_hash)
+    if event is not None and not event.wait(IN_FLIGHT_WAIT):
+        logger.warning("다른 스레드의 검색 결과 대기 시간 초과 (%.0f초)", IN_FLIGHT_WAIT)
+    with _cache_lock:
+        cached = _search_results_cache.get(query_hash)
+        raw = _search_results_raw.get(query_hash)
+    # 캐시로 응답해도 현재 실행의 근거에는 기록 (다른 크루/앞선 검색이 가져온 결과 포함)
+    if raw is not None:
+        _record_evidence(*raw)
+    return cached
+
+def _record_evidence(query: str, results: List[Dict[str, Any]]):
+    """현재 실행의 근거에 검색 결과 기록 (갱신 모드에서 이미 본 결과는 근거 집합이 걸러냄)"""
+    evidence = search_evidence.get()
+    if evidence is not None:
+        evidence.add(query, results)
 
 def get_query_hash(query: str) -> str:
     """쿼리의 해시값 생성 (유사한 쿼리 감지용)"""
@@ -44,52 +116,177 @@ def improved_web_search_tool(query: str) -> str:
     # 쿼리 해시 생성
     query_hash = get_query_hash(query)
     
-    # 중복 검색 방지
-    if query_hash in _search_history:
-        # 캐시된 결과가 있으면 반환
-        if query_hash in _search_results_cache:
-            return f"🔄 (캐시됨) {_search_results_cache[query_hash]}"
-        else:
-            return f"⚠️ 이미 검색한 쿼리입니다: '{query}'. 다른 검색어를 시도해보세요."
+    # 근접 중복 검색어는 가장 가까운 기존 쿼리의 캐시 결과로 응답
+    if query_hash not in _search_history:
+        match = _query_index.nearest(query)
+        reused = _cached_result(match.key) if match else None
+        if reused:
+            logger.info("🔁 유사 검색어 결과 재사용: '%s' ≈ '%s' (%.2f, %s)",
+                        query, match.query, match.similarity, match.method)
+            return reuse_notice(query, match) + reused
+    
+    # 중복 검색 방지 - 이미 검색했거나 다른 스레드가 검색 중이면 그 결과를 반환
+    if not _claim([query_hash]):
+        cached = _cached_result(query_hash)
+        if cached:
+            return f"🔄 (캐시됨) {cached}"
+        return f"⚠️ 이미 검색한 쿼리입니다: '{query}'. 다른 검색어를 시도해보세요."
     
-    # 검색 히스토리에 추가
-    _search_history.add(query_hash)
+    logger.info("🔍 웹 검색 시작: '%s'", query)
     
+    # DuckDuckGo 검색 실행
     try:
-        logging.info(f"🔍 웹 검색 시작: '{query}'")
-        
-        # DuckDuckGo 검색 실행
-        ddgs = DDGS()
-        results = ddgs.text(
-            query=query, 
-            region='wt-wt', 
-            safesearch='moderate', 
-            max_results=5
-        )
-        
-        if not results:
-            error_msg = f"⚠️ '{query}'에 대한 검색 결과를 찾을 수 없습니다."
-            logging.warning(error_msg)
-            return error_msg
-        
-        # 결과 포매팅
-        formatted_results = format_search_results(query, results)
-        
-        # 캐시에 저장
-        _search_results_cache[query_hash] = formatted_results
-        
-        logging.info(f"✅ 검색 완료: {len(results)}개 결과")
-        return formatted_results
-        
-    except Exception as e:
-        error_msg = f"❌ 검색 오류 발생: {str(e)}"
-        logging.error(f"웹 검색 오류 - Query: '{query}', Error: {e}")
+        results, error = _run_search(query)
+        if not error and results:
+            formatted_results = _cache_results(query, query_hash, results)
+    finally:
+        _release([query_hash])
+    
+    if error is not None:
+        error_msg = f"❌ 검색 오류 발생: {error}"
         
         # DNS 오류 등 네트워크 문제인 경우 대체 메시지
-        if "dns error" in str(e).lower() or "name or service not known" in str(e).lower():
+        if "dns error" in error.lower() or "name or service not known" in error.lower():
             error_msg += "\n🌐 인터넷 연결을 확인하고 다시 시도해주세요."
         
         return error_msg
+    
+    if not results:
+        error_msg = f"⚠️ '{query}'에 대한 검색 결과를 찾을 수 없습니다."
+        logger.warning(error_msg)
+        return error_msg
+    
+    logger.info("✅ 검색 완료: %s개 결과", len(results))
+    return formatted_results
+
+def _run_search(query: str) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+    """검색 한 건 실행 (공급자 헤지/장애 조치) - (결과, 오류 메시지)"""
+    try:
+        with profile_span("search", query) as span:
+            results, span["provider"] = _search_router.search(query, max_results=5)
+            span["results"] = len(results)
+        # 근거 기록 - 캐시에는 다른 크루도 쓰도록 전체 결과를 그대로 저장
+        _record_evidence(query, results)
+        return results, None
+    except SearchError as e:
+        logger.error("웹 검색 오류 - Query: '%s', Error: %s", query, e)
+        return None, str(e)
+
+def _cache_results(query: str, query_hash: str, results: List[Dict[str, Any]]) -> str:
+    """쿼리 하나의 전체 결과를 포매팅해 캐시/근접 중복 색인에 등록 (유효한 결과가 없으면 등록하지 않음)"""
+    formatted = format_search_results(query, results)
+    if any(r.get('href') for r in results):
+        with _cache_lock:
+            _search_results_cache[query_hash] = formatted
+            _search_results_raw[query_hash] = (query, list(results))
+            _query_index.add(query, query_hash)
+    return formatted
+
+@tool("Batch Web Search Tool")
+def batch_web_search_tool(queries: List[str]) -> str:
+    """여러 검색어를 한 번에 검색하는 도구 - 계획된 검색어 목록 전체를 리스트로 전달하세요.
+    검색은 동시에 실행되며, 결과는 URL 기준으로 중복을 제거해 하나로 합쳐서 반환합니다."""
+    return run_batch_search(queries)
+
+def run_batch_search(queries: List[str]) -> str:
+    """여러 검색어를 동시에 검색하고 URL 중복을 제거한 결과를 합쳐서 반환
+    
+    에이전트 도구(batch_web_search_tool), 코드 기반 파이프라인, 보고서 갱신 모드에서 함께 사용한다.
+    캐시에는 쿼리별 전체 결과를 저장하고, URL 중복 제거는 이번에 돌려주는 병합 결과에만 적용한다.
+    """
+    
+    # 입력 검증 및 중복 쿼리 제거 (순서 유지)
+    if isinstance(queries, str):
+        queries = [queries]
+    pending: List[Tuple[str, str]] = []
+    seen_hashes = set()
+    for query in queries or []:
+        if not isinstance(query, str) or len(query.strip()) < 3:
+            continue
+        query = query.strip()
+        query_hash = get_query_hash(query)
+        if query_hash not in seen_hashes:
+            seen_hashes.add(query_hash)
+            pending.append((query, query_hash))
+    
+    if not pending:
+        return "❌ 유효한 검색 쿼리가 없습니다. 3글자 이상의 검색어 목록을 전달해주세요."
+    
+    # 이미 검색한 쿼리와 근접 중복 쿼리(이전 검색 또는 같은 배치의 앞선 쿼리)는 다시 요청하지 않음
+    aliases: Dict[str, QueryMatch] = {}
+    batch_index = QueryIndex(use_embeddings=False)
+    for query, query_hash in pending:
+        if query_hash in _search_history:
+            continue
+        match = _query_index.nearest(query) or batch_index.nearest(query)
+        if match:
+            aliases[query_hash] = match
+        else:
+            batch_index.add(query, query_hash)
+    # 다른 스레드가 이미 검색했거나 검색 중인 쿼리는 병합 단계에서 그 결과를 사용
+    claimed = _claim([h for _, h in pending if h not in aliases])
+    to_search = [(q, h) for q, h in pending if h in claimed]
+    
+    logger.info("🔍 배치 웹 검색 시작: %s개 쿼리 (신규 %s개, 유사 검색어 재사용 %s개, 동시 %s개)",
+                len(pending), len(to_search), len(aliases), SEARCH_CONCURRENCY)
+    
+    # 워커 스레드에서도 같은 로그 correlation id를 쓰도록 컨텍스트 복사
+    outcomes: Dict[str, Tuple[Optional[List[Dict[str, Any]]], Optional[str]]] = {}
+    try:
+        if to_search:
+            workers = max(1, min(SEARCH_CONCURRENCY, len(to_search)))
+            with profile_span("search_batch", f"{len(to_search)} queries", concurrency=workers):
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search") as executor:
+                    futures = {
+                        query_hash: executor.submit(contextvars.copy_context().run, _run_search, query)
+                        for query, query_hash in to_search
+                    }
+                    for query_hash, future in futures.items():
+                        outcomes[query_hash] = future.result()
+        # 쿼리별 전체 결과를 캐시하고 병합 전에 완료 표시 (서로의 결과를 기다리는 배치끼리 막히지 않게)
+        for query, query_hash in to_search:
+            results, error = outcomes.get(query_hash, (None, None))
+            if error is None and results:
+                _cache_results(query, query_hash, results)
+    finally:
+        _release(claimed)
+    
+    # 결과 병합 - 앞선 쿼리에서 나온 URL은 다시 싣지 않음
+    seen_urls: Set[str] = set()
+    sections = []
+    duplicates = 0
+    for query, query_hash in pending:
+        if query_hash in aliases:
+            match = aliases[query_hash]
+            if match.key in outcomes:
+                sections.append(reuse_notice(query, match) + f"(위 '{match.query}' 검색 결과 참조)\n")
+            else:
+                sections.append(reuse_notice(query, match) + (_cached_result(match.key) or ""))
+            continue
+        if query_hash not in outcomes:
+            cached = _cached_result(query_hash)
+            sections.append(f"🔄 (캐시됨) {cached}" if cached else f"⚠️ 이미 검색한 쿼리입니다: '{query}'")
+            continue
+        
+        results, error = outcomes[query_hash]
+        if error is not None:
+            sections.append(f"❌ '{query}' 검색 오류 발생: {error}")
+            continue
+        if not results:
+            sections.append(f"⚠️ '{query}'에 대한 검색 결과를 찾을 수 없습니다.")
+            continue
+        
+        fresh = [r for r in results if r.get('href') and r.get('href') not in seen_urls]
+        duplicates += len(results) - len(fresh)
+        seen_urls.update(r['href'] for r in fresh)
+        if not fresh:
+            sections.append(f"🔁 '{query}' 검색 결과는 모두 위 결과와 중복됩니다.\n")
+        else:
+            sections.append(format_search_results(query, fresh))
+    
+    logger.info("✅ 배치 검색 완료: %s개 쿼리, 고유 URL %s개 (중복 %s개 제거)",
+                len(pending), len(seen_urls), duplicates)
+    return "\n".join(sections)
 
 def format_search_results(query: str, results: List[Dict[str, Any]]) -> str:
     """검색 결과를 포매팅"""
@@ -0,0 +1,177 @@
+# CrewAI/pydantic에 의존하는 도구와 에이전트 정의
+# 시작 속도를 위해 game_logic에서 첫 LLM 호출 시점에 지연 임포트된다
+import json
+import random
+import logging
+from dataclasses import asdict
+
+from pydantic import BaseModel, Field
+from crewai import Agent
+from crewai.tools import BaseTool
+
+from config import config
+from models import game_state_manager
+from game_logic import GAME_MASTER_PROFILE
+from metrics import traced_tool
+
+logger = logging.getLogger(__name__)
+
+# ===== CrewAI 도구들 =====
+class DiceRollInput(BaseModel):
+    sides: int = Field(default=20, description="주사위 면 수", ge=2, le=100)
+    count: int = Field(default=1, description="주사위 개수", ge=1, le=10)
+    modifier: int = Field(default=0, description="수정치", ge=-20, le=20)
+
+class DiceRollTool(BaseTool):
+    name: str = "roll_dice"
+    description: str = "주사위를 굴립니다 (2d6+3 형태로 입력)"
+    args_schema: type[BaseModel] = DiceRollInput
+    
+    @traced_tool
+    def _run(self, sides: int = 20, count: int = 1, modifier: int = 0) -> str:
+        try:
+            rolls = [random.randint(1, sides) for _ in range(count)]
+            total = sum(rolls) + modifier
+            
+            result = {
+                "rolls": rolls,
+                "modifier": modifier,
+                "total": total,
+                "description": f"{count}d{sides}+{modifier} = {rolls} + {modifier} = {total}",
+                "critical": any(roll == sides for roll in rolls),
+                "fumble": any(roll == 1 for roll in rolls) and sides == 20
+            }
+            
+            logger.info("주사위 굴림: %s", result['description'])
+            return json.dumps(result, ensure_ascii=False)
+        except Exception as e:
+            logger.error("주사위 굴리기 실패: %s", e)
+            return json.dumps({"error": str(e)}, ensure_ascii=False)
+
+class AbilityCheckInput(BaseModel):
+    ability_score: int = Field(description="능력치 수치", ge=1, le=30)
+    difficulty: int = Field(default=10, description="난이도", ge=5, le=30)
+    advantage: bool = Field(default=False, description="유리함 여부")
+    disadvantage: bool = Field(default=False, description="불리함 여부")
+
+class AbilityCheckTool(BaseTool):
+    name: str = "ability_check"
+    description: str = "능력치 판정을 수행합니다"
+    args_schema: type[BaseModel] = AbilityCheckInput
+    
+    @traced_tool
+    def _run(self, ability_score: int, difficulty: int = 10, advantage: bool = False, disadvantage: bool = False) -> str:
+        try:
+            # 유리함/불리함 처리
+            if advantage and disadvantage:
+                advantage = disadvantage = False  # 상쇄
+            
+            if advantage:
+                roll1, roll2 = random.randint(1, 20), random.randint(1, 20)
+                roll = max(roll1, roll2)
+                roll_desc = f"2d20 유리함({roll1}, {roll2}) -> {roll}"
+            elif disadvantage:
+                roll1, roll2 = random.randint(1, 20), random.randint(1, 20)
+                roll = min(roll1, roll2)
+                roll_desc = f"2d20 불리함({roll1}, {roll2}) -> {roll}"
+            else:
+                roll = random.randint(1, 20)
+                roll_desc = f"d20({roll})"
+            
+            modifier = (ability_score - 10) // 2
+            total = roll + modifier
+            success = total >= difficulty
+            
+            result = {
+                "roll": roll,
+                "modifier": modifier,
+                "total": total,
+                "difficulty": difficulty,
+                "success": success,
+                "critical_success": roll == 20,
+                "critical_failure": roll == 1,
+                "description": f"{roll_desc} + 수정치({modifier}) = {total} vs DC{difficulty} - {'성공' if success else '실패'}"
+            }
+            
+            logger.info("능력치 판정: %s", result['description'])
+            return json.dumps(result, ensure_ascii=False)
+        except Exception as e:
+            logger.error("능력치 판정 실패: %s", e)
+            return json.dumps({"error": str(e)}, ensure_ascii=False)
+
+class GameContextTool(BaseTool):
+    name: str = "get_game_context"
+    description: str = "현재 게임 상황과 컨텍스트를 가져옵니다"
+    
+    @traced_tool
+    def _run(self) -> str:
+        try:
+            context = game_state_manager.get_context()
+            characters = [asdict(char) for char in game_state_manager.state.active_characters]
+            
+            result = {
+                "current_context": context,
+                "characters": characters,
+                "scene": game_state_manager.state.current_scene,
+                "last_updated": game_state_manager.state.last_updated
+            }
+            return json.dumps(result, ensure_ascii=False)
+        except Exception as e:
+            logger.error("게임 컨텍스트 조회 실패: %s", e)
+            return json.dumps({"error": str(e)}, ensure_ascii=False)
+
+class UpdateContextInput(BaseModel):
+    new_context: str = Field(description="새로운 게임 컨텍스트")
+
+class UpdateContextTool(BaseTool):
+    name: str = "update_game_context"
+    description: str = "게임 상황과 컨텍스트를 업데이트합니다"
+    args_schema: type[BaseModel] = UpdateContextInput
+    
+    @traced_tool
+    def _run(self, new_context: str) -> str:
+        try:
+            game_state_manager.update_context(new_context)
+            return f"✅ 게임 컨텍스트가 업데이트되었습니다: {new_context[:100]}..."
+        except Exception as e:
+            logger.error("게임 컨텍스트 업데이트 실패: %s", e)
+            return f"❌ 컨텍스트 업데이트 실패: {str(e)}"
+
+# Tool 인스턴스 생성
+dice_tool = DiceRollTool()
+ability_tool = AbilityCheckTool()
+context_tool = GameContextTool()
+update_context_tool = UpdateContextTool()
+
+# ===== Agent 정의 =====
+def create_agents():
+    """에이전트 생성"""
+    try:
+        # Game Master Agent
+        game_master = Agent(
+            **GAME_MASTER_PROFILE,
+            tools=[dice_tool, context_tool, update_context_tool],
+            verbose=True,
+            llm=f"openai/{config.MODEL_NAME}",
+            max_tokens=config.MAX_TOKENS,
+            temperature=config.TEMPERATURE
+        )
+
+        # Rules Advisor Agent
+        rules_advisor = Agent(
+            role="규칙 조언자",
+            goal="복잡한 상황에서 D&D 규칙 조언 제공",
+            backstory="""D&D 5판 규칙 전문가로서, 복잡한 상황에서만 
+            규칙 해석과 판정 조언을 제공합니다.""",
+            tools=[ability_tool, dice_tool],
+            verbose=True,
+            llm=f"openai/{config.MODEL_NAME}",
+            max_tokens=config.MAX_TOKENS // 2,
+            temperature=0.3
+        )
+        
+        logger.info("에이전트 생성 완료")
+        return game_master, rules_advisor
+    except Exception as e:
+        logger.error("에이전트 생성 실패: %s", e)
+        raise
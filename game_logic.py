@@ -1,179 +1,130 @@
-import json
-import random
+import time
 import logging
-import requests
-import litellm
-from typing import Dict, List, Any
-from dataclasses import asdict
-
-from pydantic import BaseModel, Field
-from crewai import Agent, Task, Crew, Process
-from crewai.tools import BaseTool
+import threading
+from concurrent.futures import Future, wait as wait_futures
 
 from config import config
 from models import game_state_manager, InputValidator
+import metrics
+from metrics import recorder
 
 logger = logging.getLogger(__name__)
 
-# ===== CrewAI 도구들 =====
-class DiceRollInput(BaseModel):
-    sides: int = Field(default=20, description="주사위 면 수", ge=2, le=100)
-    count: int = Field(default=1, description="주사위 개수", ge=1, le=10)
-    modifier: int = Field(default=0, description="수정치", ge=-20, le=20)
-
-class DiceRollTool(BaseTool):
-    name: str = "roll_dice"
-    description: str = "주사위를 굴립니다 (2d6+3 형태로 입력)"
-    args_schema: type[BaseModel] = DiceRollInput
-    
-    def _run(self, sides: int = 20, count: int = 1, modifier: int = 0) -> str:
-        try:
-            rolls = [random.randint(1, sides) for _ in range(count)]
-            total = sum(rolls) + modifier
-            
-            result = {
-                "rolls": rolls,
-                "modifier": modifier,
-                "total": total,
-                "description": f"{count}d{sides}+{modifier} = {rolls} + {modifier} = {total}",
-                "critical": any(roll == sides for roll in rolls),
-                "fumble": any(roll == 1 for roll in rolls) and sides == 20
-            }
-            
-            logger.info(f"주사위 굴림: {result['description']}")
-            return json.dumps(result, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"주사위 굴리기 실패: {e}")
-            return json.dumps({"error": str(e)}, ensure_ascii=False)
+# ===== 게임 마스터 프로필 =====
+# game_agents의 에이전트 생성과 프롬프트 캐시 예열이 같은 프롬프트를 쓰도록 공유
+GAME_MASTER_PROFILE = {
+    "role": "게임 마스터",
+    "goal": "플레이어 입력에 따라 즉시 반응하고 재미있는 게임을 진행",
+    "backstory": """당신은 숙련된 D&D 게임 마스터입니다. 
+            플레이어의 행동에 즉시 반응하고 흥미진진한 상황을 만들어냅니다.
+            필요시 주사위를 굴리고 상황을 업데이트합니다.""",
+}
 
-class AbilityCheckInput(BaseModel):
-    ability_score: int = Field(description="능력치 수치", ge=1, le=30)
-    difficulty: int = Field(default=10, description="난이도", ge=5, le=30)
-    advantage: bool = Field(default=False, description="유리함 여부")
-    disadvantage: bool = Field(default=False, description="불리함 여부")
+def build_system_prompt(profile: dict) -> str:
+    """CrewAI 시스템 프롬프트의 앞부분(role_playing)과 동일한 문자열 생성"""
+    return f"You are {profile['role']}. {profile['backstory']}\nYour personal goal is: {profile['goal']}"
 
-class AbilityCheckTool(BaseTool):
-    name: str = "ability_check"
-    description: str = "능력치 판정을 수행합니다"
-    args_schema: type[BaseModel] = AbilityCheckInput
+# ===== 연결 워밍업 =====
+class ConnectionWarmup:
+    """백그라운드 LLM 연결 확인 및 프롬프트 캐시 예열
     
-    def _run(self, ability_score: int, difficulty: int = 10, advantage: bool = False, disadvantage: bool = False) -> str:
-        try:
-            # 유리함/불리함 처리
-            if advantage and disadvantage:
-                advantage = disadvantage = False  # 상쇄
-            
-            if advantage:
-                roll1, roll2 = random.randint(1, 20), random.randint(1, 20)
-                roll = max(roll1, roll2)
-                roll_desc = f"2d20 유리함({roll1}, {roll2}) -> {roll}"
-            elif disadvantage:
-                roll1, roll2 = random.randint(1, 20), random.randint(1, 20)
-                roll = min(roll1, roll2)
-                roll_desc = f"2d20 불리함({roll1}, {roll2}) -> {roll}"
-            else:
-                roll = random.randint(1, 20)
-                roll_desc = f"d20({roll})"
-            
-            modifier = (ability_score - 10) // 2
-            total = roll + modifier
-            success = total >= difficulty
-            
-            result = {
-                "roll": roll,
-                "modifier": modifier,
-                "total": total,
-                "difficulty": difficulty,
-                "success": success,
-                "critical_success": roll == 20,
-                "critical_failure": roll == 1,
-                "description": f"{roll_desc} + 수정치({modifier}) = {total} vs DC{difficulty} - {'성공' if success else '실패'}"
-            }
-            
-            logger.info(f"능력치 판정: {result['description']}")
-            return json.dumps(result, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"능력치 판정 실패: {e}")
-            return json.dumps({"error": str(e)}, ensure_ascii=False)
-
-class GameContextTool(BaseTool):
-    name: str = "get_game_context"
-    description: str = "현재 게임 상황과 컨텍스트를 가져옵니다"
+    연결 테스트, GM 시스템 프롬프트 KV 캐시 예열, Crew 생성을 동시에 시작하고
+    첫 턴에서 아직 끝나지 않은 작업만 기다린다.
+    """
     
-    def _run(self) -> str:
-        try:
-            context = game_state_manager.get_context()
-            characters = [asdict(char) for char in game_state_manager.state.active_characters]
-            
-            result = {
-                "current_context": context,
-                "characters": characters,
-                "scene": game_state_manager.state.current_scene,
-                "last_updated": game_state_manager.state.last_updated
-            }
-            return json.dumps(result, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"게임 컨텍스트 조회 실패: {e}")
-            return json.dumps({"error": str(e)}, ensure_ascii=False)
-
-class UpdateContextInput(BaseModel):
-    new_context: str = Field(description="새로운 게임 컨텍스트")
-
-class UpdateContextTool(BaseTool):
-    name: str = "update_game_context"
-    description: str = "게임 상황과 컨텍스트를 업데이트합니다"
-    args_schema: type[BaseModel] = UpdateContextInput
+    def __init__(self, engine: "DnDGameEngine"):
+        self.engine = engine
+        self.latencies = {}
+        self.errors = {}
+        self._futures = {}
     
-    def _run(self, new_context: str) -> str:
+    def start(self):
+        """워밍업 작업 시작 (즉시 반환)"""
+        jobs = {
+            "connection": self.engine.test_connection,
+            "prompt_cache": self._prime_prompt_cache,
+            "crew": self.engine._get_crew,
+        }
+        for name, job in jobs.items():
+            future = Future()
+            self._futures[name] = future
+            # 데몬 스레드: 워밍업 중 게임을 종료해도 응답을 기다리지 않음
+            threading.Thread(
+                target=self._run, args=(name, job, future),
+                name=f"warmup-{name}", daemon=True
+            ).start()
+        logger.info("LLM 워밍업 시작 (백그라운드)")
+    
+    def _run(self, name: str, job, future: Future):
+        """작업 실행 및 소요 시간 기록"""
+        start = time.perf_counter()
         try:
-            game_state_manager.update_context(new_context)
-            return f"✅ 게임 컨텍스트가 업데이트되었습니다: {new_context[:100]}..."
+            future.set_result(job())
         except Exception as e:
-            logger.error(f"게임 컨텍스트 업데이트 실패: {e}")
-            return f"❌ 컨텍스트 업데이트 실패: {str(e)}"
-
-# Tool 인스턴스 생성
-dice_tool = DiceRollTool()
-ability_tool = AbilityCheckTool()
-context_tool = GameContextTool()
-update_context_tool = UpdateContextTool()
-
-# ===== Agent 정의 =====
-def create_agents():
-    """에이전트 생성"""
-    try:
-        # Game Master Agent
-        game_master = Agent(
-            role="게임 마스터",
-            goal="플레이어 입력에 따라 즉시 반응하고 재미있는 게임을 진행",
-            backstory="""당신은 숙련된 D&D 게임 마스터입니다. 
-            플레이어의 행동에 즉시 반응하고 흥미진진한 상황을 만들어냅니다.
-            필요시 주사위를 굴리고 상황을 업데이트합니다.""",
-            tools=[dice_tool, context_tool, update_context_tool],
-            verbose=True,
-            llm=f"openai/{config.MODEL_NAME}",
-            max_tokens=config.MAX_TOKENS,
-            temperature=config.TEMPERATURE
-        )
-
-        # Rules Advisor Agent
-        rules_advisor = Agent(
-            role="규칙 조언자",
-            goal="복잡한 상황에서 D&D 규칙 조언 제공",
-            backstory="""D&D 5판 규칙 전문가로서, 복잡한 상황에서만 
-            규칙 해석과 판정 조언을 제공합니다.""",
-            tools=[ability_tool, dice_tool],
-            verbose=True,
-            llm=f"openai/{config.MODEL_NAME}",
-            max_tokens=config.MAX_TOKENS // 2,
-            temperature=0.3
+            self.errors[name] = e
+            future.set_exception(e)
+        finally:
+            self.latencies[name] = time.perf_counter() - start
+            logger.info("워밍업 '%s' 종료: %.2f초", name, self.latencies[name])
+    
+    def _prime_prompt_cache(self):
+        """GM 시스템 프롬프트를 한 번 보내 서버의 프롬프트(KV) 캐시 예열"""
+        litellm = config.get_litellm()
+        litellm.completion(
+            model=f"openai/{config.MODEL_NAME}",
+            messages=[
+                {"role": "system", "content": build_system_prompt(GAME_MASTER_PROFILE)},
+                {"role": "user", "content": "준비"}
+            ],
+            api_base=config.API_BASE_URL,
+            api_key=config.API_KEY,
+            temperature=0.0,
+            max_tokens=1,
+            timeout=config.TIMEOUT
         )
+    
+    @property
+    def is_ready(self) -> bool:
+        """모든 워밍업 작업 완료 여부"""
+        return bool(self._futures) and all(f.done() for f in self._futures.values())
+    
+    def wait(self, timeout: float = None):
+        """남은 워밍업 작업 대기 - 연결 테스트 실패는 그대로 전달"""
+        pending = [f for f in self._futures.values() if not f.done()]
+        if pending:
+            start = time.perf_counter()
+            wait_futures(pending, timeout=timeout)
+            logger.info("첫 턴이 워밍업 완료를 %.2f초 기다림", time.perf_counter() - start)
+        
+        # 캐시 예열/Crew 생성 실패는 치명적이지 않음 (턴 처리 중 재시도)
+        for name in ("prompt_cache", "crew"):
+            if name in self.errors:
+                logger.warning("워밍업 '%s' 실패 (무시): %s", name, self.errors[name])
         
-        logger.info("에이전트 생성 완료")
-        return game_master, rules_advisor
-    except Exception as e:
-        logger.error(f"에이전트 생성 실패: {e}")
-        raise
+        self._futures["connection"].result(timeout=0)
+    
+    def describe(self) -> str:
+        """준비 상태 및 지연 시간 요약"""
+        if not self._futures:
+            return "⚪ 워밍업 미실행"
+        
+        labels = {"connection": "연결", "prompt_cache": "프롬프트 캐시", "crew": "에이전트"}
+        parts = []
+        for name, label in labels.items():
+            if name in self.errors:
+                parts.append(f"{label} 실패")
+            elif name in self.latencies:
+                parts.append(f"{label} {self.latencies[name]:.1f}초")
+            else:
+                parts.append(f"{label} 진행 중")
+        
+        if "connection" in self.errors:
+            state = "🔴 연결 실패"
+        elif self.is_ready:
+            state = "🟢 준비 완료"
+        else:
+            state = "🟡 준비 중"
+        return f"{state} ({', '.join(parts)})"
 
 # ===== 게임 엔진 =====
 class DnDGameEngine:
@@ -183,10 +134,16 @@ class DnDGameEngine:
         self.is_running = False
         self._crew = None
         self._agents = None
+        self._connection_checked = False
+        self._warmup = None
         self.logger = logging.getLogger(self.__class__.__name__)
+        recorder.set_metrics_file(config.METRICS_FILE)
         
     def test_connection(self) -> bool:
         """LLM 연결 테스트 - 필수"""
+        import requests
+        litellm = config.get_litellm()
+        
         try:
             self.logger.info("LLM 연결 테스트 중...")
             response = litellm.completion(
@@ -201,22 +158,27 @@ class DnDGameEngine:
             self.logger.info("✅ LLM 연결 성공!")
             return True
         except requests.exceptions.ConnectionError as e:
-            self.logger.error(f"❌ 연결 오류: {e}")
+            self.logger.error("❌ 연결 오류: %s", e)
             raise ConnectionError(f"LLM 서버에 연결할 수 없습니다: {e}")
         except requests.exceptions.Timeout as e:
-            self.logger.error(f"❌ 시간 초과: {e}")
+            self.logger.error("❌ 시간 초과: %s", e)
             raise TimeoutError(f"LLM 서버 응답 시간 초과: {e}")
         except litellm.AuthenticationError as e:
-            self.logger.error(f"❌ 인증 오류: {e}")
+            self.logger.error("❌ 인증 오류: %s", e)
             raise ValueError(f"API 키 인증 실패: {e}")
         except Exception as e:
-            self.logger.error(f"❌ 예상치 못한 오류: {e}")
+            self.logger.error("❌ 예상치 못한 오류: %s", e)
             raise RuntimeError(f"LLM 연결 중 오류 발생: {e}")
     
     def _get_crew(self):
         """Crew 인스턴스 가져오기"""
         if self._crew is None or self._agents is None:
             try:
+                # CrewAI는 첫 LLM 호출 시점에 임포트
+                config.get_litellm()
+                from crewai import Crew, Process
+                from game_agents import create_agents
+                
                 self._agents = create_agents()
                 self._crew = Crew(
                     agents=self._agents,
@@ -224,9 +186,10 @@ class DnDGameEngine:
                     process=Process.sequential,
                     verbose=False
                 )
+                metrics.install_crewai_hooks()
                 self.logger.info("Crew 인스턴스 생성 완료")
             except Exception as e:
-                self.logger.error(f"Crew 생성 실패: {e}")
+                self.logger.error("Crew 생성 실패: %s", e)
                 raise RuntimeError(f"AI 에이전트 생성 실패: {e}")
         return self._crew
     
@@ -236,8 +199,14 @@ class DnDGameEngine:
         
         self.logger.info("=== D&D Crew AI 게임 시작 ===")
         
-        # 연결 테스트 (필수)
-        self.test_connection()
+        # 연결 테스트 (필수) - 빠른 시작 모드에서는 백그라운드 워밍업 후 첫 턴에서 확인
+        if config.FAST_START:
+            self._connection_checked = False
+            self._warmup = ConnectionWarmup(self)
+            self._warmup.start()
+        else:
+            self.test_connection()
+            self._connection_checked = True
         
         self.is_running = True
         
@@ -275,17 +244,42 @@ class DnDGameEngine:
         if not self.is_running:
             raise RuntimeError("게임이 시작되지 않았습니다. start_game()을 먼저 호출하세요.")
         
+        with recorder.turn():
+            return self._process_turn(player_input)
+    
+    def _process_turn(self, player_input: str) -> str:
+        """한 턴 처리 - 단계별 소요 시간은 metrics.recorder에 기록"""
         # 입력 검증
-        sanitized_input = InputValidator.sanitize_input(player_input)
+        with recorder.span("validate"):
+            sanitized_input = InputValidator.sanitize_input(player_input)
+            valid = bool(sanitized_input) and InputValidator.validate_command(sanitized_input)
         if not sanitized_input:
             return "❌ 유효하지 않은 입력입니다."
         
-        if not InputValidator.validate_command(sanitized_input):
+        if not valid:
             return "❌ 입력이 너무 깁니다. 간단하게 입력해주세요."
         
-        self.logger.info(f"플레이어 입력: {sanitized_input}")
+        self.logger.info("플레이어 입력: %s", sanitized_input)
+        
+        # 빠른 시작 모드: 워밍업이 끝나지 않았으면 대기, 실패했으면 다음 턴에 동기 재시도
+        if not self._connection_checked:
+            with recorder.span("warmup_wait"):
+                if self._warmup is not None:
+                    try:
+                        self._warmup.wait()
+                    except Exception:
+                        self._warmup = None
+                        raise
+                else:
+                    self.test_connection()
+            self._connection_checked = True
+        
+        import requests
+        litellm = config.get_litellm()
+        from crewai import Task
         
         try:
+            setup_start = time.perf_counter()
             # 동적 Task 생성
             response_task = Task(
                 description=f"""
@@ -309,24 +303,39 @@ class DnDGameEngine:
             # 새로운 Task로 Crew 업데이트
             crew = self._get_crew()
             crew.tasks = [response_task]
+            recorder.add_span("crew_setup", time.perf_counter() - setup_start)
             
-            result = crew.kickoff()
+            # LLM 호출과 도구 실행 (세부 시간은 llm/tool.* span으로 기록)
+            with recorder.span("kickoff"):
+                result = crew.kickoff()
+            metrics.flush_crewai_events()
+            metrics.record_crew_usage(crew, result)
             self.logger.info("GM 응답 생성 완료")
             return str(result)
             
         except requests.exceptions.ConnectionError as e:
-            self.logger.error(f"연결 오류: {e}")
+            self.logger.error("연결 오류: %s", e)
             raise ConnectionError("LLM 서버와의 연결이 끊어졌습니다. 네트워크 상태를 확인해주세요.")
         except requests.exceptions.Timeout as e:
-            self.logger.error(f"시간 초과: {e}")
+            self.logger.error("시간 초과: %s", e)
             raise TimeoutError("LLM 서버 응답 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.")
         except litellm.AuthenticationError as e:
-            self.logger.error(f"인증 오류: {e}")
+            self.logger.error("인증 오류: %s", e)
             raise ValueError("API 키 인증에 실패했습니다. 설정을 확인해주세요.")
         except Exception as e:
-            self.logger.error(f"입력 처리 중 오류: {e}")
+            self.logger.error("입력 처리 중 오류: %s", e)
             raise RuntimeError(f"게임 처리 중 오류가 발생했습니다: {e}")
     
+    def get_warmup_status(self) -> str:
+        """LLM 준비 상태"""
+        if self._warmup is not None:
+            return self._warmup.describe()
+        return "🟢 연결 확인됨" if self._connection_checked else "⚪ 첫 행동 시 연결 확인"
+    
+    def get_stats(self) -> str:
+        """턴 지연 시간/토큰 통계 (p50/p95/p99)"""
+        return recorder.format_stats()
+    
     def get_status(self) -> str:
         """게임 상태 정보"""
         try:
@@ -349,9 +358,10 @@ class DnDGameEngine:
 - 🎒 인벤토리: {', '.join(char.inventory)}
                 """.strip())
             
+            status_info.append(f"🔗 LLM 서버: {self.get_warmup_status()}")
             return "\n\n".join(status_info)
         except Exception as e:
-            self.logger.error(f"상태 조회 오류: {e}")
+            self.logger.error("상태 조회 오류: %s", e)
             return f"❌ 상태를 조회할 수 없습니다: {str(e)}"
     
     def save_game(self, filename: str = None) -> str:
@@ -364,7 +374,7 @@ class DnDGameEngine:
             else:
                 return "❌ 게임 저장에 실패했습니다."
         except Exception as e:
-            self.logger.error(f"게임 저장 오류: {e}")
+            self.logger.error("게임 저장 오류: %s", e)
             return f"❌ 게임 저장 중 오류가 발생했습니다: {str(e)}"
     
     def load_game(self, filename: str) -> str:
@@ -376,7 +386,7 @@ class DnDGameEngine:
             else:
                 return f"❌ 저장 파일을 찾을 수 없습니다: {filename}"
         except Exception as e:
-            self.logger.error(f"게임 불러오기 오류: {e}")
+            self.logger.error("게임 불러오기 오류: %s", e)
             return f"❌ 게임 불러오기 중 오류가 발생했습니다: {str(e)}"
     
     def list_saves(self) -> str:
@@ -389,5 +399,5 @@ class DnDGameEngine:
             save_list = "\n".join([f"  - {save}" for save in sorted(saves, reverse=True)])
             return f"📂 **저장된 게임 목록:**\n{save_list}\n\n사용법: load [파일명]"
         except Exception as e:
-            self.logger.error(f"저장 파일 목록 조회 오류: {e}")
+            self.logger.error("저장 파일 목록 조회 오류: %s", e)
             return f"❌ 저장 파일 목록을 불러올 수 없습니다: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""
+크기 제한 스트리밍 HTTP 다운로드
+
+본문 추출용 페이지를 requests.get(stream=True)로 받아
+- 응답 헤더만 보고 HTML/텍스트가 아닌 리소스(PDF, 이미지, 바이너리 등)는 본문을 받기 전에 거절하고
+- MAX_PAGE_BYTES까지만 읽은 뒤 연결을 끊으며 (압축 해제 후 바이트 기준이라 gzip 폭탄도 막힘)
+- 청크마다 증분 디코딩해 전체 바이트 사본을 따로 만들지 않는다.
+잘린 HTML도 앞부분에 본문이 있으므로 그대로 추출에 쓴다 (truncated로 표시).
+"""
+import os
+import re
+import codecs
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# 페이지 하나에서 읽을 최대 바이트 (압축 해제 후)
+MAX_PAGE_BYTES = int(os.getenv("MAX_PAGE_BYTES", str(2 * 1024 * 1024)))
+CHUNK_BYTES = 16 * 1024
+
+# 본문 추출 대상 Content-Type (없으면 허용)
+TEXT_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain", "text/xml", "application/xml")
+
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+
+@dataclass
+class FetchedPage:
+    """스트리밍으로 받은 응답 (requests.Response의 필요한 부분만)"""
+    url: str
+    status_code: int
+    headers: Mapping[str, str] = field(default_factory=dict)
+    text: str = ""
+    content_type: str = ""
+    bytes_read: int = 0
+    truncated: bool = False
+    rejected: Optional[str] = None   # 본문을 받지 않은 이유 (content_type)
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code == 200 and self.rejected is None
+
+
+def fetch_page(url: str, headers: Dict[str, str] = None, timeout: float = 15,
+               max_bytes: int = None, **kwargs) -> FetchedPage:
+    """GET 요청을 스트리밍으로 받아 FetchedPage 반환 (200이 아니면 본문을 읽지 않음)
+
+    네트워크 오류는 requests.RequestException으로 그대로 올린다.
+    """
+    max_bytes = max_bytes or MAX_PAGE_BYTES
+    kwargs.setdefault("allow_redirects", True)
+    kwargs.setdefault("verify", False)
+    response = requests.get(url, headers=headers, timeout=timeout, stream=True, **kwargs)
+    try:
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        page = FetchedPage(url=url, status_code=response.status_code, headers=response.headers,
+                           content_type=content_type)
+        if response.status_code != 200:
+            return page
+        if content_type and not content_type.startswith(TEXT_CONTENT_TYPES):
+            page.rejected = "content_type"
+            logger.info("⏭️ 텍스트가 아닌 리소스 건너뜀 (%s): %s", content_type, url)
+            return page
+
+        # 헤더에 charset이 있으면 그 인코딩, 없으면 첫 청크의 <meta charset>, 그래도 없으면 UTF-8
+        declared = "charset=" in response.headers.get("Content-Type", "").lower()
+        decoder = None
+        parts = []
+        for chunk in response.iter_content(chunk_size=CHUNK_BYTES):
+            if not chunk:
+                continue
+            remaining = max_bytes - page.bytes_read
+            if len(chunk) > remaining:
+                chunk = chunk[:remaining]
+                page.truncated = True
+            if decoder is None:
+                decoder = _decoder(response.encoding if declared else _sniff_charset(chunk))
+            page.bytes_read += len(chunk)
+            parts.append(decoder.decode(chunk))
+            if page.truncated or page.bytes_read >= max_bytes:
+                page.truncated = True
+                logger.info("✂️ 최대 크기(%s바이트)에서 다운로드 중단: %s", max_bytes, url)
+                break
+        if decoder is not None:
+            parts.append(decoder.decode(b"", final=True))
+        page.text = "".join(parts)
+        return page
+    finally:
+        # 남은 본문을 받지 않고 연결 종료
+        response.close()
+
+
+def _sniff_charset(chunk: bytes) -> str:
+    match = _META_CHARSET.search(chunk[:4096])
+    return match.group(1).decode("ascii", "ignore") if match else "utf-8"
+
+
+def _decoder(encoding: Optional[str]):
+    try:
+        return codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
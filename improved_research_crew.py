@@ -3,11 +3,18 @@
 """
 import os
 import logging
+import argparse
 from datetime import datetime
+from typing import Optional
 import litellm
 from crewai import Agent, Task, Crew, Process
 from dotenv import load_dotenv
-from fixed_search_tool import improved_web_search_tool, clear_search_history
+from fixed_search_tool import (
+    improved_web_search_tool, batch_web_search_tool, clear_search_history, run_batch_search
+)
+from logging_setup import setup_queue_logging, log_context
+from research_checkpoint import ResearchCheckpoint
+from planner_cache import planner_cache, parse_planned_queries, format_plan
 
 # 환경 설정
 load_dotenv()
@@ -15,15 +22,27 @@ os.environ.setdefault("OTEL_SDK_DISABLED", "true")
 os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
 
 # 로깅 설정
-logging.basicConfig(level=logging.INFO)
+setup_queue_logging(None)
 logger = logging.getLogger(__name__)
 
+# 검색 계획 쿼리 수 (계획 태스크 프롬프트와 같음)
+PLANNED_QUERY_COUNT = 5
+
 class ImprovedResearchCrew:
     """개선된 AI 리서치 크루 - 명확한 태스크 분할과 에러 처리"""
     
-    def __init__(self, topic: str, language: str = "한국어"):
+    def __init__(self, topic: str, language: str = "한국어", pipeline: bool = None, run_id: str = None,
+                 replan: bool = False):
         self.topic = topic
         self.language = language
+        # replan이면 검색 계획 캐시를 쓰지 않고 다시 계획 (새 계획으로 캐시 갱신)
+        self.replan = replan
+        # 파이프라인 모드: 플래너 출력에서 쿼리를 코드로 추출해 바로 검색 (리서처 에이전트 생략)
+        if pipeline is None:
+            pipeline = os.getenv("RESEARCH_PIPELINE", "false").lower() == "true"
+        self.pipeline = pipeline
+        # 단계별 체크포인트 (planning/research 출력)
+        self.checkpoint = ResearchCheckpoint(run_id or ResearchCheckpoint.new_run_id(topic), topic, crew="improved")
         self.setup_llm()
         
     def setup_llm(self):
@@ -41,7 +60,7 @@ class ImprovedResearchCrew:
         litellm.api_key = api_key
         litellm.drop_params = True
         
-        logger.info(f"LLM 설정 완료: {model_name} @ {api_base}")
+        logger.info("LLM 설정 완료: %s @ %s", model_name, api_base)
 
     def create_search_planner(self) -> Agent:
         """검색 계획 수립 에이전트"""
@@ -68,7 +87,7 @@ class ImprovedResearchCrew:
             각 검색마다 서로 다른 키워드를 사용하여 중복을 방지합니다.''',
             verbose=True,
             allow_delegation=False,
-            tools=[improved_web_search_tool],
+            tools=[batch_web_search_tool, improved_web_search_tool],
             llm=self.llm_config,
             max_tokens=1500,
             temperature=0.6
@@ -89,11 +108,27 @@ class ImprovedResearchCrew:
             temperature=0.8
         )
 
-    def create_tasks(self, planner: Agent, researcher: Agent, writer: Agent) -> list:
-        """개선된 태스크 생성"""
+    def create_tasks(self, planner: Agent, researcher: Agent, writer: Agent,
+                     plan: str = None, evidence: str = None) -> list:
+        """개선된 태스크 생성 - 체크포인트에서 복원한 단계(plan/evidence)는 태스크를 만들지 않는다"""
+        tasks = []
         
-        # 1단계: 검색 계획 수립
-        planning_task = Task(
+        if evidence is None:
+            # 1단계: 검색 계획 수립
+            if plan is None:
+                tasks.append(self.create_planning_task(planner))
+
+            # 2단계: 정보 수집
+            tasks.append(self.create_research_task(researcher, plan))
+
+        # 3단계: 콘텐츠 작성
+        tasks.append(self.create_writing_task(writer, evidence))
+
+        return tasks
+
+    def create_planning_task(self, planner: Agent) -> Task:
+        """검색 계획 태스크 - QUERY_n 형식으로 출력"""
+        return Task(
             description=f'''
             주제: "{self.topic}"
             
@@ -121,19 +156,21 @@ class ImprovedResearchCrew:
             expected_output="5개의 서로 다른 영어 검색 쿼리 목록"
         )
 
-        # 2단계: 정보 수집
-        research_task = Task(
+    def create_research_task(self, researcher: Agent, plan: str = None) -> Task:
+        """정보 수집 태스크 - 리서처 에이전트가 검색 도구 사용 (plan이 있으면 검색 계획을 직접 전달)"""
+        plan_section = f"\n\n            **검색 계획:**\n{plan}" if plan else ""
+        return Task(
             description=f'''
-            검색 계획을 바탕으로 "{self.topic}"에 대한 정보를 수집하세요.
+            검색 계획을 바탕으로 "{self.topic}"에 대한 정보를 수집하세요.{plan_section}
             
             **수행 방법:**
-            1. 제공받은 5개 검색 쿼리를 각각 한 번씩만 사용하여 웹 검색을 수행하세요
-            2. 각 검색마다 다른 검색어를 사용하여 중복을 피하세요
-            3. 검색 결과에서 핵심 정보를 추출하세요
+            1. 제공받은 5개 검색 쿼리를 리스트로 묶어 'Batch Web Search Tool'을 한 번 호출하세요
+               (쿼리들이 동시에 검색되고 중복 URL이 제거된 결과가 한 번에 반환됩니다)
+            2. 검색 결과에서 핵심 정보를 추출하세요
             
             **중요 사항:**
             - 같은 검색어를 반복 사용하지 마세요
-            - 검색 오류가 발생하면 비슷하지만 다른 키워드로 시도하세요
+            - 검색 오류가 발생한 쿼리만 비슷하지만 다른 키워드로 'Web Search Tool'을 사용해 다시 시도하세요
             - 각 검색 결과에서 핵심 내용을 요약하세요
             
             **수집할 정보:**
@@ -149,10 +186,12 @@ class ImprovedResearchCrew:
             expected_output=f"{self.topic}에 대한 종합적인 연구 자료 및 핵심 인사이트"
         )
 
-        # 3단계: 콘텐츠 작성
-        writing_task = Task(
+    def create_writing_task(self, writer: Agent, evidence: str = None) -> Task:
+        """콘텐츠 작성 태스크 - evidence가 있으면 (파이프라인 모드) 검색 자료를 직접 전달"""
+        evidence_section = f"\n\n            **수집된 검색 자료:**\n{evidence}" if evidence else ""
+        return Task(
             description=f'''
-            수집된 연구 자료를 바탕으로 "{self.topic}"에 대한 고품질 블로그 포스트를 작성하세요.
+            수집된 연구 자료를 바탕으로 "{self.topic}"에 대한 고품질 블로그 포스트를 작성하세요.{evidence_section}
             
             **글 구조:**
             1. 매력적인 제목
@@ -185,33 +224,124 @@ class ImprovedResearchCrew:
             expected_output=f"{self.topic}에 대한 고품질 {self.language} 블로그 포스트 (800-1000단어)"
         )
 
-        return [planning_task, research_task, writing_task]
+    def run_pipeline(self, planner: Agent, writer: Agent, plan: str = None, evidence: str = None):
+        """파이프라인 모드 - 검색 계획 → 코드로 쿼리 추출/동시 검색 → 작성
+        
+        리서처 에이전트가 계획을 다시 읽고 도구 호출을 결정하는 LLM 왕복이 없고,
+        작성자에게는 병합된 검색 결과만 전달된다. 체크포인트에서 복원한 단계는 건너뛴다.
+        """
+        logger.info("🚀 '%s' 리서치 시작 (파이프라인 모드)", self.topic)
+        
+        if evidence is None:
+            # 1단계: 검색 계획 수립
+            if plan is None:
+                planning_crew = Crew(
+                    agents=[planner],
+                    tasks=[self.create_planning_task(planner)],
+                    process=Process.sequential,
+                    verbose=True,
+                    max_execution_time=300
+                )
+                plan = str(planning_crew.kickoff())
+                self.checkpoint.save("planning", plan)
+                self.cache_plan(plan)
+            
+            # 2단계: 쿼리 추출 후 코드에서 직접 검색
+            queries = parse_planned_queries(plan, limit=PLANNED_QUERY_COUNT)
+            if not queries:
+                logger.warning("⚠️ 플래너 출력에서 QUERY_n 형식의 쿼리를 찾지 못해 주제로 검색합니다")
+                queries = [self.topic]
+            logger.info("📋 추출된 검색 쿼리 %s개: %s", len(queries), queries)
+            evidence = run_batch_search(queries)
+            self.checkpoint.save("research", evidence, queries=queries)
+        
+        # 3단계: 콘텐츠 작성
+        writing_crew = Crew(
+            agents=[writer],
+            tasks=[self.create_writing_task(writer, evidence)],
+            process=Process.sequential,
+            verbose=True,
+            max_execution_time=600
+        )
+        return writing_crew.kickoff()
+
+    def _save_on_complete(self, task: Task, stage: str):
+        """태스크가 끝나는 즉시 출력을 체크포인트에 저장 (이후 단계가 실패해도 보존)"""
+        def callback(output):
+            text = getattr(output, "raw", None) or str(output)
+            self.checkpoint.save(stage, text)
+            if stage == "planning":
+                self.cache_plan(text)
+        task.callback = callback
+
+    def cached_plan(self) -> Optional[str]:
+        """캐시된 검색 계획 (QUERY_n 형식) - replan이거나 유효한 캐시가 없으면 None"""
+        if self.replan:
+            return None
+        cached = planner_cache.get(self.topic, PLANNED_QUERY_COUNT, self.language)
+        if cached is None:
+            return None
+        logger.info("📋 검색 계획 캐시 사용 (%.1f시간 전, 검색어 %s개) - 계획 단계 생략",
+                    cached.age_hours, len(cached.queries))
+        plan = format_plan(cached.queries, prefix="QUERY")
+        self.checkpoint.save("planning", plan, cached=True)
+        return plan
+
+    def cache_plan(self, plan: str):
+        """플래너 출력의 검색어를 캐시에 저장"""
+        planner_cache.put(self.topic, PLANNED_QUERY_COUNT, self.language,
+                          parse_planned_queries(plan, limit=PLANNED_QUERY_COUNT))
 
-    def run_research(self) -> str:
-        """리서치 실행"""
+    @log_context()
+    def run_research(self, resume: bool = False) -> str:
+        """리서치 실행 - resume이면 체크포인트에 저장된 단계를 건너뛴다"""
         try:
             # 검색 히스토리 초기화
             clear_search_history()
             
+            # 완료된 단계 복원
+            plan = self.checkpoint.load("planning") if resume and self.checkpoint.has("planning") else None
+            evidence = self.checkpoint.load("research") if resume and self.checkpoint.has("research") else None
+            if plan is not None or evidence is not None:
+                logger.info("♻️ 체크포인트 %s에서 재개 - 완료 단계: %s", self.checkpoint.run_id,
+                            ", ".join(stage for stage, output in (("planning", plan), ("research", evidence))
+                                      if output is not None))
+            
+            # 같은 주제/언어로 최근에 세운 검색 계획이 있으면 계획 단계 생략
+            if plan is None and evidence is None:
+                plan = self.cached_plan()
+            
             # 에이전트 생성
             planner = self.create_search_planner()
-            researcher = self.create_researcher()
             writer = self.create_writer()
             
-            # 태스크 생성
-            tasks = self.create_tasks(planner, researcher, writer)
-            
-            # 크루 생성 및 실행
-            crew = Crew(
-                agents=[planner, researcher, writer],
-                tasks=tasks,
-                process=Process.sequential,
-                verbose=True,
-                max_execution_time=900  # 15분 제한
-            )
-            
-            logger.info(f"🚀 '{self.topic}' 리서치 시작")
-            result = crew.kickoff()
+            if self.pipeline:
+                result = self.run_pipeline(planner, writer, plan, evidence)
+            else:
+                researcher = self.create_researcher()
+                
+                # 태스크 생성 (작성 단계 이전 태스크는 완료 시 체크포인트 저장)
+                tasks = self.create_tasks(planner, researcher, writer, plan=plan, evidence=evidence)
+                if evidence is not None:
+                    stages = []
+                elif plan is not None:
+                    stages = ["research"]
+                else:
+                    stages = ["planning", "research"]
+                for task, stage in zip(tasks, stages):
+                    self._save_on_complete(task, stage)
+                
+                # 크루 생성 및 실행
+                crew = Crew(
+                    agents=[planner, researcher, writer],
+                    tasks=tasks,
+                    process=Process.sequential,
+                    verbose=True,
+                    max_execution_time=900  # 15분 제한
+                )
+                
+                logger.info("🚀 '%s' 리서치 시작", self.topic)
+                result = crew.kickoff()
             
             # 결과 저장
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -223,25 +353,53 @@ class ImprovedResearchCrew:
                 f.write("---\n\n")
                 f.write(str(result))
             
-            logger.info(f"✅ 리서치 완료. 결과 저장: {filename}")
+            self.checkpoint.mark_complete(filename)
+            logger.info("✅ 리서치 완료. 결과 저장: %s", filename)
             return str(result)
             
         except Exception as e:
-            logger.error(f"❌ 리서치 실행 중 오류: {e}")
+            logger.error("❌ 리서치 실행 중 오류: %s", e)
+            if self.checkpoint.meta["stages"]:
+                logger.info("♻️ 완료된 단계는 저장되었습니다. 재개: --resume %s", self.checkpoint.run_id)
             return f"리서치 실행 중 오류가 발생했습니다: {str(e)}"
 
 def main():
     """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='개선된 AI 리서치 크루')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='플래너 쿼리를 코드로 바로 검색 (리서처 에이전트 생략)')
+    parser.add_argument('--language', '-l', default='한국어', help='출력 언어')
+    parser.add_argument('--run-id', help='체크포인트 실행 id (기본값: 주제_시각)')
+    parser.add_argument('--resume', nargs='?', const='latest', metavar='RUN_ID',
+                        help='저장된 단계를 건너뛰고 이어서 실행 (RUN_ID 생략 시 가장 최근 실행)')
+    parser.add_argument('--replan', action='store_true',
+                        help='검색 계획 캐시를 쓰지 않고 다시 계획')
+    args = parser.parse_args()
+    
     print("🔬 개선된 AI 리서치 크루")
     print("=" * 50)
     
-    topic = input("📝 연구 주제를 입력하세요: ").strip()
-    if not topic:
-        topic = "2025년 최신 AI 트렌드"
-        print(f"기본 주제 사용: {topic}")
+    run_id = args.run_id
+    if args.resume:
+        # 같은 디렉터리에 통합 크루의 근거 체크포인트도 저장되므로 이 크루의 실행만 재개
+        if args.resume == 'latest':
+            checkpoint = ResearchCheckpoint.latest(crew="improved")
+        else:
+            checkpoint = ResearchCheckpoint(args.resume)
+        if checkpoint is None or not checkpoint.topic or checkpoint.crew not in (None, "improved"):
+            print(f"❌ 재개할 실행을 찾을 수 없습니다: {args.resume}")
+            return
+        topic, run_id = checkpoint.topic, checkpoint.run_id
+        print(f"♻️ 실행 재개: {run_id} - 주제: {topic} (완료 단계: {', '.join(checkpoint.meta['stages']) or '없음'})")
+    else:
+        topic = input("📝 연구 주제를 입력하세요: ").strip()
+        if not topic:
+            topic = "2025년 최신 AI 트렌드"
+            print(f"기본 주제 사용: {topic}")
     
-    crew = ImprovedResearchCrew(topic)
-    result = crew.run_research()
+    crew = ImprovedResearchCrew(topic, language=args.language, pipeline=args.pipeline or None, run_id=run_id,
+                                replan=args.replan)
+    result = crew.run_research(resume=bool(args.resume))
     
     print("\n" + "=" * 50)
     print("📋 최종 결과:")
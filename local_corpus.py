@@ -0,0 +1,491 @@
+"""
+로컬 문서 코퍼스 색인과 검색 (웹 접근 없이 RAG 방식 리서치)
+
+디렉터리의 Markdown/텍스트/HTML/PDF 문서(과거 research_report_*.md 포함)를 청크로 나눠
+BM25 역색인과 (선택) 임베딩 행렬을 만들고, mmap으로 바로 열 수 있는 파일로 저장한다.
+
+  meta.json             청크 수, 평균 길이, 원본 파일 목록, 임베딩 모델
+  vocab.json            용어 → 용어 번호
+  term_offsets.npy      용어별 포스팅 시작 위치 (CSR, int64, 용어 수 + 1)
+  postings_doc.npy      포스팅 청크 번호 (int32)
+  postings_tf.npy       포스팅 용어 빈도 (float32)
+  idf.npy / doc_lengths.npy
+  chunks.jsonl          청크 본문과 출처 (한 줄에 하나)
+  chunk_offsets.npy     chunks.jsonl 안의 줄 시작 바이트 (청크 번호로 바로 읽기)
+  embeddings.npy        정규화한 청크 임베딩 (EMBEDDING_MODEL을 지정한 경우)
+
+청크 임베딩은 embedding_store에 콘텐츠 해시로 저장해 두므로, 다시 색인해도 바뀐 청크만 새로 계산한다.
+
+검색은 질의 용어의 포스팅만 NumPy로 합산해 argpartition으로 상위 k개를 고르므로
+수천~수만 청크에서도 밀리초 안에 끝난다. 임베딩이 있으면 BM25 순위와 RRF로 합친다.
+
+사용 예:
+  python local_corpus.py ingest ./notes . --index corpus_index [--embed]
+  python local_corpus.py search "메타버스 플랫폼 동향"
+"""
+import os
+import re
+import sys
+import json
+import mmap
+import time
+import shutil
+import logging
+import argparse
+import threading
+from collections import Counter
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from evidence_compress import estimate_tokens, terms
+from logging_setup import setup_queue_logging
+from embedding_store import EMBEDDING_STORE_DIR, get_embedding_store, text_hash, top_k_cosine
+
+logger = logging.getLogger(__name__)
+
+LOCAL_CORPUS_INDEX = os.getenv("LOCAL_CORPUS_INDEX", "corpus_index")
+# 임베딩 모델 (OpenAI 호환 /v1/embeddings, 예: nomic-embed-text) - 비우면 BM25만 사용
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "")
+EMBEDDING_URL = os.getenv("EMBEDDING_URL", os.getenv("DEFAULT_URL", "http://localhost:11434"))
+EMBEDDING_API_KEY = os.getenv("DEFAULT_API_KEY", "ollama")
+EMBEDDING_BATCH = 32
+
+CORPUS_EXTENSIONS = (".md", ".markdown", ".txt", ".html", ".htm", ".pdf")
+SKIP_DIRS = {".git", "venv", ".venv", "__pycache__", "node_modules", "page_cache", "research_runs",
+             "embedding_store", "planner_cache"}
+# 색인 교체 중 남은 임시 디렉터리 (<색인>.building.<pid> / <색인>.old.<pid>)
+_LEFTOVER_INDEX_DIR = re.compile(r'\.(?:building|old)\.\d+$')
+
+# 청크 크기 (추정 토큰) - 이웃 청크와 문맥이 끊기지 않게 앞 청크 끝부분을 겹침
+CHUNK_TOKENS = 350
+CHUNK_OVERLAP_TOKENS = 60
+
+# BM25 파라미터 (search_ranking과 동일)
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 역순위 결합(RRF) 상수
+RRF_K = 60
+
+_HEADING = re.compile(r'^\s{0,3}#{1,6}\s+(.+?)\s*#*\s*$')
+_SENTENCE_END = re.compile(r'(?<=[.!?。])\s+')
+
+
+@dataclass
+class Chunk:
+    """색인 단위 (문서의 연속된 단락 묶음)"""
+    source: str
+    title: str
+    section: str
+    text: str
+
+
+@dataclass
+class CorpusHit:
+    """검색 결과 한 건"""
+    chunk_id: int
+    score: float
+    source: str
+    title: str
+    section: str
+    text: str
+
+
+# ===== 문서 읽기 =====
+def read_document(path: Path) -> Tuple[str, str]:
+    """(제목, 본문 텍스트) - 읽을 수 없으면 빈 본문"""
+    suffix = path.suffix.lower()
+    if suffix == ".pdf":
+        return path.stem, _read_pdf(path)
+    raw = path.read_text(encoding="utf-8", errors="replace")
+    if suffix in (".html", ".htm"):
+        return _read_html(raw, path.stem)
+    for line in raw.splitlines():
+        match = _HEADING.match(line)
+        if match:
+            return match.group(1), raw
+    return path.stem, raw
+
+
+def _read_html(raw: str, default_title: str) -> Tuple[str, str]:
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(raw, "html.parser")
+    for tag in soup(["script", "style", "nav", "header", "footer", "aside", "noscript"]):
+        tag.decompose()
+    title = soup.title.get_text(strip=True) if soup.title else default_title
+    # 제목 태그는 마크다운 제목으로 바꿔 섹션 경계로 쓴다
+    for level in range(1, 4):
+        for heading in soup.find_all(f"h{level}"):
+            heading.replace_with(f"\n\n{'#' * level} {heading.get_text(' ', strip=True)}\n\n")
+    text = soup.get_text("\n")
+    return title or default_title, re.sub(r'\n\s*\n+', '\n\n', text)
+
+
+def _read_pdf(path: Path) -> str:
+    try:
+        from pdfminer.high_level import extract_text
+    except ImportError:
+        logger.warning("PDF 건너뜀 (pdfminer.six 필요): %s", path)
+        return ""
+    try:
+        return extract_text(str(path)) or ""
+    except Exception as e:
+        logger.warning("PDF 읽기 실패 (%s): %s", path, e)
+        return ""
+
+
+def _skip_dir(name: str) -> bool:
+    return name in SKIP_DIRS or bool(_LEFTOVER_INDEX_DIR.search(name))
+
+
+def iter_documents(paths: Sequence[str]) -> Iterable[Path]:
+    """경로 목록(파일/디렉터리)에서 지원하는 문서 파일 (정렬 순서)
+
+    색인/임베딩 저장소 디렉터리(LOCAL_CORPUS_INDEX, EMBEDDING_STORE_DIR)와 그 임시 디렉터리는 건너뛴다.
+    """
+    excluded = {Path(d).resolve() for d in (LOCAL_CORPUS_INDEX, EMBEDDING_STORE_DIR)}
+    seen = set()
+    for root in paths:
+        root = Path(root)
+        candidates = [root] if root.is_file() else sorted(
+            p for p in root.rglob("*") if not any(_skip_dir(part) for part in p.relative_to(root).parts[:-1]))
+        for path in candidates:
+            if path.is_file() and path.suffix.lower() in CORPUS_EXTENSIONS:
+                resolved = path.resolve()
+                if excluded & set(resolved.parents):
+                    continue
+                if resolved not in seen:
+                    seen.add(resolved)
+                    yield path
+
+
+# ===== 청크 분할 =====
+def chunk_text(text: str, source: str, title: str,
+               max_tokens: int = CHUNK_TOKENS, overlap_tokens: int = CHUNK_OVERLAP_TOKENS) -> List[Chunk]:
+    """단락 단위로 max_tokens까지 묶어 청크 생성 (제목을 만나면 새 청크, 긴 단락은 문장 단위로 분할)"""
+    chunks: List[Chunk] = []
+    section = ""
+    parts: List[str] = []
+    size = 0
+
+    def flush(keep_overlap: bool):
+        nonlocal parts, size
+        body = "\n\n".join(parts).strip()
+        if body:
+            chunks.append(Chunk(source=source, title=title, section=section, text=body))
+        # 다음 청크에 앞 청크 끝 단락을 겹쳐 둠
+        carry: List[str] = []
+        if keep_overlap:
+            carry_size = 0
+            for part in reversed(parts):
+                tokens = estimate_tokens(part)
+                if carry_size + tokens > overlap_tokens:
+                    break
+                carry.insert(0, part)
+                carry_size += tokens
+        parts = carry
+        size = sum(estimate_tokens(part) for part in parts)
+
+    for paragraph in re.split(r'\n\s*\n', text or ""):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        heading = _HEADING.match(paragraph.splitlines()[0])
+        if heading:
+            flush(keep_overlap=False)
+            section = heading.group(1)
+            paragraph = "\n".join(paragraph.splitlines()[1:]).strip()
+            if not paragraph:
+                continue
+        pieces = [paragraph]
+        if estimate_tokens(paragraph) > max_tokens:
+            pieces = [s for s in _SENTENCE_END.split(paragraph) if s.strip()]
+        for piece in pieces:
+            tokens = estimate_tokens(piece)
+            if parts and size + tokens > max_tokens:
+                flush(keep_overlap=True)
+            parts.append(piece)
+            size += tokens
+    flush(keep_overlap=False)
+    return chunks
+
+
+# ===== 임베딩 =====
+def embed_texts(texts: Sequence[str], model: str = None) -> np.ndarray:
+    """OpenAI 호환 임베딩 API로 정규화한 임베딩 행렬 (float32, 행 = 텍스트)"""
+    import litellm
+    model = model or EMBEDDING_MODEL
+    api_base = EMBEDDING_URL.rstrip('/')
+    if not api_base.endswith('/v1'):
+        api_base += '/v1'
+    vectors = []
+    for start in range(0, len(texts), EMBEDDING_BATCH):
+        response = litellm.embedding(model=f"openai/{model}", input=list(texts[start:start + EMBEDDING_BATCH]),
+                                     api_base=api_base, api_key=EMBEDDING_API_KEY)
+        vectors.extend(item["embedding"] for item in response.data)
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+# ===== 색인 생성 =====
+def _chunk_terms(chunk: Chunk) -> List[str]:
+    return terms(f"{chunk.section} {chunk.text}")
+
+
+def build_index(paths: Sequence[str], index_dir: str = None, embed: bool = False,
+                model: str = None) -> Dict[str, object]:
+    """문서를 읽어 색인 디렉터리를 새로 만든다 (완성된 뒤 기존 색인과 교체) - meta 반환"""
+    index_path = Path(index_dir or LOCAL_CORPUS_INDEX)
+    started = time.perf_counter()
+    chunks: List[Chunk] = []
+    sources = []
+    for path in iter_documents(paths):
+        if index_path.resolve() in path.resolve().parents:
+            continue
+        title, text = read_document(path)
+        document_chunks = chunk_text(text, str(path), title)
+        chunks.extend(document_chunks)
+        stat = path.stat()
+        sources.append({"path": str(path), "mtime": stat.st_mtime, "size": stat.st_size,
+                        "chunks": len(document_chunks)})
+        logger.info("📚 %s: %s개 청크", path, len(document_chunks))
+    if not chunks:
+        raise ValueError("색인할 문서가 없습니다")
+
+    # 역색인 (CSR)
+    vocab: Dict[str, int] = {}
+    postings: List[List[Tuple[int, int]]] = []
+    doc_lengths = np.zeros(len(chunks), dtype=np.float32)
+    for chunk_id, chunk in enumerate(chunks):
+        chunk_terms = _chunk_terms(chunk)
+        doc_lengths[chunk_id] = len(chunk_terms)
+        for term, tf in Counter(chunk_terms).items():
+            term_id = vocab.setdefault(term, len(vocab))
+            if term_id == len(postings):
+                postings.append([])
+            postings[term_id].append((chunk_id, tf))
+    term_offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+    term_offsets[1:] = np.cumsum([len(p) for p in postings])
+    postings_doc = np.fromiter((d for p in postings for d, _ in p), dtype=np.int32, count=int(term_offsets[-1]))
+    postings_tf = np.fromiter((tf for p in postings for _, tf in p), dtype=np.float32, count=int(term_offsets[-1]))
+    df = np.diff(term_offsets).astype(np.float32)
+    idf = np.log(1 + (len(chunks) - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+    embeddings = None
+    model = model or EMBEDDING_MODEL
+    if embed:
+        if not model:
+            raise ValueError("임베딩 색인에는 EMBEDDING_MODEL(또는 --model)이 필요합니다")
+        store = get_embedding_store(model)
+        rows = store.ensure([f"{c.title} {c.section}\n{c.text}" for c in chunks],
+                            lambda texts: embed_texts(texts, model))
+        embeddings = store.matrix[rows]
+
+    meta = {
+        "version": 1,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "chunks": len(chunks),
+        "terms": len(vocab),
+        "avg_length": float(doc_lengths.mean()),
+        "embedding_model": model if embeddings is not None else None,
+        "embedding_dim": int(embeddings.shape[1]) if embeddings is not None else 0,
+        "sources": sources,
+    }
+
+    # 임시 디렉터리에 모두 쓴 뒤 교체 (색인을 여는 중인 프로세스는 이전 파일을 계속 읽음)
+    building = index_path.with_name(f"{index_path.name}.building.{os.getpid()}")
+    shutil.rmtree(building, ignore_errors=True)
+    building.mkdir(parents=True)
+    np.save(building / "term_offsets.npy", term_offsets)
+    np.save(building / "postings_doc.npy", postings_doc)
+    np.save(building / "postings_tf.npy", postings_tf)
+    np.save(building / "idf.npy", idf)
+    np.save(building / "doc_lengths.npy", doc_lengths)
+    if embeddings is not None:
+        np.save(building / "embeddings.npy", embeddings)
+    offsets = np.zeros(len(chunks), dtype=np.int64)
+    with open(building / "chunks.jsonl", "wb") as f:
+        for chunk_id, chunk in enumerate(chunks):
+            offsets[chunk_id] = f.tell()
+            f.write(json.dumps(asdict(chunk), ensure_ascii=False).encode("utf-8") + b"\n")
+    np.save(building / "chunk_offsets.npy", offsets)
+    (building / "vocab.json").write_text(json.dumps(vocab, ensure_ascii=False), encoding="utf-8")
+    (building / "meta.json").write_text(json.dumps(meta, ensure_ascii=False, indent=1), encoding="utf-8")
+
+    previous = index_path.with_name(f"{index_path.name}.old.{os.getpid()}")
+    if index_path.exists():
+        os.replace(index_path, previous)
+    os.replace(building, index_path)
+    shutil.rmtree(previous, ignore_errors=True)
+
+    logger.info("✅ 코퍼스 색인 완료: 문서 %s개, 청크 %s개, 용어 %s개 (%.1f초)%s",
+                len(sources), len(chunks), len(vocab), time.perf_counter() - started,
+                f", 임베딩 {model}" if embeddings is not None else "")
+    return meta
+
+
+# ===== 검색 =====
+class CorpusIndex:
+    """mmap으로 연 코퍼스 색인 (읽기 전용, 스레드 안전)"""
+
+    def __init__(self, index_dir: str = None):
+        self.path = Path(index_dir or LOCAL_CORPUS_INDEX)
+        self.meta = json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        self.vocab: Dict[str, int] = json.loads((self.path / "vocab.json").read_text(encoding="utf-8"))
+        load = lambda name: np.load(self.path / name, mmap_mode="r")
+        self.term_offsets = load("term_offsets.npy")
+        self.postings_doc = load("postings_doc.npy")
+        self.postings_tf = load("postings_tf.npy")
+        self.idf = load("idf.npy")
+        self.doc_lengths = load("doc_lengths.npy")
+        self.chunk_offsets = load("chunk_offsets.npy")
+        embeddings_path = self.path / "embeddings.npy"
+        self.embeddings = np.load(embeddings_path, mmap_mode="r") if embeddings_path.exists() else None
+        self._chunks_file = open(self.path / "chunks.jsonl", "rb")
+        self._chunks = mmap.mmap(self._chunks_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return int(self.meta["chunks"])
+
+    def chunk(self, chunk_id: int) -> Chunk:
+        start = int(self.chunk_offsets[chunk_id])
+        end = self._chunks.find(b"\n", start)
+        return Chunk(**json.loads(self._chunks[start:end if end >= 0 else len(self._chunks)]))
+
+    def bm25_scores(self, query: str) -> np.ndarray:
+        """모든 청크의 BM25 점수 (질의 용어의 포스팅만 합산)"""
+        scores = np.zeros(len(self), dtype=np.float32)
+        average_length = self.meta["avg_length"] or 1.0
+        for term in set(terms(query)):
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+            docs = self.postings_doc[start:end]
+            tf = self.postings_tf[start:end]
+            norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[docs] / average_length)
+            scores[docs] += self.idf[term_id] * tf * (BM25_K1 + 1) / norm
+        return scores
+
+    def search(self, query: str, k: int = 5, use_embeddings: bool = None) -> List[CorpusHit]:
+        """BM25 (+임베딩 RRF 결합) 상위 k개 청크"""
+        scores = self.bm25_scores(query)
+        ranked = _top_k(scores, k * 4 if self.embeddings is not None else k)
+
+        if use_embeddings is None:
+            use_embeddings = self.embeddings is not None and bool(self.meta.get("embedding_model"))
+        if use_embeddings and self.embeddings is not None:
+            try:
+                model = self.meta["embedding_model"]
+                # 질의는 저장소에 쌓지 않는다 (청크와 같은 텍스트면 저장된 벡터 재사용)
+                query_vector = get_embedding_store(model).get(text_hash(query))
+                if query_vector is None:
+                    query_vector = embed_texts([query], model)[0]
+            except Exception as e:
+                logger.warning("질의 임베딩 실패 - BM25만 사용: %s", e)
+            else:
+                semantic = [chunk_id for chunk_id, _ in top_k_cosine(self.embeddings, query_vector, k * 4)]
+                fused: Dict[int, float] = {}
+                for ranking in (ranked, semantic):
+                    for rank, chunk_id in enumerate(ranking):
+                        fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+                ranked = sorted(fused, key=lambda chunk_id: -fused[chunk_id])
+                scores = np.zeros_like(scores)
+                scores[ranked] = [fused[chunk_id] for chunk_id in ranked]
+
+        hits = []
+        for chunk_id in ranked[:k]:
+            chunk = self.chunk(chunk_id)
+            hits.append(CorpusHit(chunk_id=int(chunk_id), score=round(float(scores[chunk_id]), 4), **asdict(chunk)))
+        return hits
+
+    def close(self):
+        self._chunks.close()
+        self._chunks_file.close()
+
+
+def _top_k(scores: np.ndarray, k: int) -> List[int]:
+    """점수가 0보다 큰 상위 k개 번호 (내림차순) - 전체 정렬 대신 argpartition"""
+    candidates = np.flatnonzero(scores > 0)
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    return [int(i) for i in candidates[np.argsort(-scores[candidates], kind="stable")]]
+
+
+# 모듈 기본 색인 (처음 사용할 때 열고, 다시 만들어지면 새로 엶)
+_default: Optional[CorpusIndex] = None
+_default_mtime = 0.0
+_default_lock = threading.Lock()
+
+
+def get_corpus_index(index_dir: str = None) -> Optional[CorpusIndex]:
+    """LOCAL_CORPUS_INDEX 색인 (없으면 None)"""
+    global _default, _default_mtime
+    meta_path = Path(index_dir or LOCAL_CORPUS_INDEX) / "meta.json"
+    try:
+        mtime = meta_path.stat().st_mtime
+    except OSError:
+        return None
+    with _default_lock:
+        if _default is None or mtime != _default_mtime or _default.path != meta_path.parent:
+            try:
+                _default, _default_mtime = CorpusIndex(str(meta_path.parent)), mtime
+            except (OSError, ValueError) as e:
+                logger.warning("코퍼스 색인 열기 실패 (%s): %s", meta_path.parent, e)
+                return None
+        return _default
+
+
+def format_corpus_hits(query: str, hits: Sequence[CorpusHit], max_chars: int = 700) -> str:
+    """에이전트에게 돌려줄 검색 결과 텍스트"""
+    if not hits:
+        return f"⚠️ 로컬 코퍼스에서 '{query}'와 관련된 문서를 찾지 못했습니다. 웹 검색을 사용하세요."
+    lines = [f"📚 로컬 코퍼스 '{query}' 검색 결과:\n"]
+    for i, hit in enumerate(hits, 1):
+        text = hit.text if len(hit.text) <= max_chars else hit.text[:max_chars] + "..."
+        section = f" › {hit.section}" if hit.section and hit.section != hit.title else ""
+        lines.append(f"{i}. **{hit.title}{section}** (점수 {hit.score})\n   📁 {hit.source}\n   {text}\n")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 문서 코퍼스 색인/검색")
+    parser.add_argument("--index", default=LOCAL_CORPUS_INDEX, help=f"색인 디렉터리 (기본값: {LOCAL_CORPUS_INDEX})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    ingest = subparsers.add_parser("ingest", help="문서 디렉터리/파일 색인")
+    ingest.add_argument("paths", nargs="+", help="Markdown/HTML/PDF 파일 또는 디렉터리")
+    ingest.add_argument("--embed", action="store_true", help="임베딩 색인도 생성 (EMBEDDING_MODEL 필요)")
+    ingest.add_argument("--model", default=EMBEDDING_MODEL, help="임베딩 모델 이름")
+    search = subparsers.add_parser("search", help="색인 검색")
+    search.add_argument("query")
+    search.add_argument("-k", type=int, default=5, help="결과 수 (기본값: 5)")
+    args = parser.parse_args()
+
+    # 로깅 설정 (큐 기반, LOG_JSON/LOG_ROTATION 환경 변수 지원)
+    setup_queue_logging("local_corpus", log_dir=".", fmt='%(asctime)s - %(levelname)s - %(message)s')
+    if args.command == "ingest":
+        try:
+            meta = build_index(args.paths, args.index, embed=args.embed, model=args.model)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"✅ 청크 {meta['chunks']}개, 용어 {meta['terms']}개 → {args.index}")
+        return
+
+    index = get_corpus_index(args.index)
+    if index is None:
+        print(f"❌ 색인이 없습니다: {args.index} (먼저 ingest 실행)")
+        sys.exit(1)
+    started = time.perf_counter()
+    hits = index.search(args.query, k=args.k)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(format_corpus_hits(args.query, hits))
+    print(f"⏱️ {elapsed:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+큐 기반 비동기 로깅 설정
+
+- 게임/리서치 스레드는 QueueHandler에 레코드만 넣고, 파일/콘솔 출력은 QueueListener 스레드가 처리
+- 로그 호출은 %-스타일 인자를 사용해 비활성 레벨에서는 문자열 포매팅 비용이 없음
+- LOG_JSON=true 이면 파일 로그를 JSON Lines로 기록 (턴/실행 단위 correlation id 포함)
+- LOG_ROTATION=size|time 으로 크기 또는 자정 기준 로테이션
+"""
+import os
+import sys
+import copy
+import json
+import uuid
+import queue
+import atexit
+import logging
+import logging.handlers
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# 현재 턴(게임) 또는 실행(리서치) 식별자
+_correlation_id: ContextVar[str] = ContextVar("correlation_id", default="-")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+
+
+def new_correlation_id() -> str:
+    """짧은 correlation id 생성"""
+    return uuid.uuid4().hex[:12]
+
+
+def get_correlation_id() -> str:
+    """현재 컨텍스트의 correlation id"""
+    return _correlation_id.get()
+
+
+@contextmanager
+def log_context(correlation_id: str = None):
+    """블록 안의 로그 레코드에 correlation id 부여 (턴/실행 단위)"""
+    token = _correlation_id.set(correlation_id or new_correlation_id())
+    try:
+        yield _correlation_id.get()
+    finally:
+        _correlation_id.reset(token)
+
+
+class CorrelationFilter(logging.Filter):
+    """로그를 남긴 스레드의 correlation id를 레코드에 기록"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = _correlation_id.get()
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """한 줄에 하나의 JSON 객체로 레코드 직렬화"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "correlation_id": getattr(record, "correlation_id", "-"),
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """포매터를 거치지 않고 메시지만 확정해 큐에 넣는 핸들러
+
+    기본 QueueHandler.prepare는 호출 스레드에서 전체 포맷을 수행하므로,
+    메시지 인자 병합만 하고 나머지 포매팅은 리스너 스레드에 맡긴다.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+def _create_file_handler(path: Path, rotation: str, max_bytes: int, backup_count: int) -> logging.Handler:
+    """로테이션 방식에 맞는 파일 핸들러 생성"""
+    if rotation == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            path, when="midnight", backupCount=backup_count, encoding="utf-8"
+        )
+    if rotation == "size":
+        return logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+    return logging.FileHandler(path, encoding="utf-8")
+
+
+def setup_queue_logging(log_name: str,
+                        log_dir: str = "logs",
+                        fmt: str = DEFAULT_FORMAT,
+                        level: int = logging.INFO,
+                        console: bool = True,
+                        json_lines: bool = None,
+                        rotation: str = None,
+                        max_bytes: int = None,
+                        backup_count: int = None) -> logging.handlers.QueueListener:
+    """루트 로거에 큐 핸들러를 설치하고 리스너 스레드 시작
+
+    log_name이 None이면 파일 로그 없이 콘솔만 사용한다.
+    설정하지 않은 인자는 LOG_JSON, LOG_ROTATION, LOG_MAX_BYTES, LOG_BACKUP_COUNT 환경 변수를 따른다.
+    이미 설정되어 있으면 기존 리스너를 그대로 반환한다.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return _listener
+
+    if json_lines is None:
+        json_lines = _env_flag("LOG_JSON")
+    if rotation is None:
+        rotation = os.getenv("LOG_ROTATION", "size").lower()
+    if max_bytes is None:
+        max_bytes = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+    if backup_count is None:
+        backup_count = int(os.getenv("LOG_BACKUP_COUNT", "7"))
+
+    handlers = []
+    if log_name:
+        directory = Path(log_dir)
+        directory.mkdir(exist_ok=True)
+        suffix = "jsonl" if json_lines else "log"
+        file_handler = _create_file_handler(directory / f"{log_name}.{suffix}", rotation, max_bytes, backup_count)
+        file_handler.setFormatter(JsonLinesFormatter() if json_lines else logging.Formatter(fmt))
+        handlers.append(file_handler)
+
+    if console:
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(logging.Formatter(fmt))
+        handlers.append(stream_handler)
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = DeferredQueueHandler(log_queue)
+    _queue_handler.addFilter(CorrelationFilter())
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_queue_logging)
+    return _listener
+
+
+def stop_queue_logging():
+    """남은 로그를 모두 기록하고 리스너 종료"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        _listener = None
+        _queue_handler = None
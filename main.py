@@ -1,9 +1,11 @@
 import logging
 from datetime import datetime
 
-from config import config
+from config import config, setup_logging
 from models import Character, game_state_manager
 from game_logic import DnDGameEngine
+from logging_setup import log_context
+from metrics import recorder
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +44,7 @@ def get_help() -> str:
 - 'load [파일명]' - 게임 불러오기
 - 'saves' - 저장 파일 목록
 - 'status' - 캐릭터 상태 확인
+- 'stats' - 턴 지연 시간/토큰 통계 (p50/p95/p99)
 
 **게임 내 행동:**
 - '조사하기' - 주변을 조사
@@ -74,6 +77,9 @@ def handle_command(game: DnDGameEngine, user_input: str) -> bool:
     elif user_input.lower() == 'status':
         print(game.get_status())
     
+    elif user_input.lower() == 'stats':
+        print(game.get_stats())
+    
     elif user_input.lower() == 'saves':
         print(game.list_saves())
     
@@ -95,7 +101,8 @@ def handle_command(game: DnDGameEngine, user_input: str) -> bool:
         # 일반 게임 입력 처리
         print("🎭 AI 게임 마스터가 생각하는 중...")
         try:
-            response = game.process_input(user_input)
+            with log_context():
+                response = game.process_input(user_input)
             print(f"\n{response}")
         except (ConnectionError, TimeoutError, ValueError, RuntimeError) as e:
             print(f"\n❌ {str(e)}")
@@ -113,12 +120,17 @@ def run_game():
         # 게임 엔진 생성
         game = DnDGameEngine()
         
-        print("🔗 LLM 서버 연결을 확인하는 중...")
+        if not config.FAST_START:
+            print("🔗 LLM 서버 연결을 확인하는 중...")
         
-        # 게임 시작 - 연결 테스트 포함
+        # 게임 시작 - 연결 테스트 포함 (빠른 시작 모드에서는 첫 턴으로 연기)
         start_message = game.start_game()
         print(start_message)
         
+        if config.FAST_START:
+            print(f"\n🔥 LLM 서버 워밍업 중: {game.get_warmup_status()}")
+            print("   ('status'로 준비 상태 확인, 첫 행동 전에 끝나지 않으면 자동으로 기다립니다)")
+        
         print("\n" + "="*60)
         print("🎮 게임이 시작되었습니다!")
         print("'help'를 입력하면 명령어를 볼 수 있습니다.")
@@ -171,7 +183,7 @@ def run_game():
         print("3. 설정 파일 확인")
     
     except Exception as e:
-        logger.error(f"예상치 못한 오류: {e}")
+        logger.error("예상치 못한 오류: %s", e)
         print(f"\n❌ 예상치 못한 오류가 발생했습니다.")
         print(f"오류 내용: {str(e)}")
         print("\n🔧 해결 방법:")
@@ -181,13 +193,17 @@ def run_game():
 
 def main():
     """메인 함수"""
+    setup_logging()
     try:
         show_welcome()
         run_game()
     except Exception as e:
-        logger.error(f"프로그램 실행 실패: {e}")
+        logger.error("프로그램 실행 실패: %s", e)
         print(f"❌ 프로그램을 시작할 수 없습니다: {str(e)}")
     finally:
+        summary_path = recorder.save_summary()
+        if summary_path:
+            print(f"📊 턴 계측 요약 저장: {summary_path}")
         print("\n👋 D&D Crew AI를 이용해주셔서 감사합니다!")
 
 if __name__ == "__main__":
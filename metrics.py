@@ -0,0 +1,328 @@
+"""
+턴 단위 지연 시간/토큰 계측
+
+- span: 턴 안의 단계(입력 검증, Crew 준비, LLM 호출, 도구 호출 등) 소요 시간
+- 토큰: 프롬프트/완성 토큰 수와 초당 생성 토큰
+- 도구 호출 횟수
+턴이 끝나면 단계별 히스토그램(p50/p95/p99)에 반영하고 메트릭 파일(JSON Lines)에 한 줄씩 기록한다.
+"""
+import math
+import json
+import time
+import logging
+import threading
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from logging_setup import get_correlation_id
+
+logger = logging.getLogger(__name__)
+
+# 히스토그램별 보관 샘플 수 (오래된 샘플부터 버림)
+MAX_SAMPLES = 1000
+
+
+class Histogram:
+    """최근 샘플 기반 백분위 계산"""
+
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self.samples = deque(maxlen=max_samples)
+
+    def add(self, value: float):
+        self.samples.append(value)
+
+    def percentile(self, q: float) -> float:
+        """nearest-rank 백분위 (q: 0~100)"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        rank = max(1, math.ceil(q / 100 * len(ordered)))
+        return ordered[min(rank, len(ordered)) - 1]
+
+    def summary(self) -> Dict[str, float]:
+        if not self.samples:
+            return {"count": 0}
+        return {
+            "count": len(self.samples),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "mean": sum(self.samples) / len(self.samples),
+            "max": max(self.samples),
+        }
+
+
+class TurnRecord:
+    """한 턴 동안 수집된 측정값"""
+
+    def __init__(self, correlation_id: str):
+        self.correlation_id = correlation_id
+        self.started_at = time.time()
+        self.spans: Dict[str, List[float]] = defaultdict(list)
+        self.tool_calls: Counter = Counter()
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.llm_calls = 0
+        self.total = 0.0
+        self.error: Optional[str] = None
+
+    @property
+    def tokens_per_second(self) -> float:
+        """LLM 호출 시간 기준 초당 완성 토큰 (LLM 계측이 없으면 턴 전체 시간 기준)"""
+        elapsed = sum(self.spans.get("llm", ())) or self.total
+        return self.completion_tokens / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "correlation_id": self.correlation_id,
+            "started_at": self.started_at,
+            "total": self.total,
+            "spans": {name: sum(values) for name, values in self.spans.items()},
+            "span_counts": {name: len(values) for name, values in self.spans.items()},
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "tokens_per_second": self.tokens_per_second,
+            "llm_calls": self.llm_calls,
+            "tool_calls": dict(self.tool_calls),
+            "error": self.error,
+        }
+
+
+class MetricsRecorder:
+    """턴 계측 수집기
+
+    게임은 한 번에 한 턴만 처리하므로 진행 중인 턴을 하나만 둔다.
+    CrewAI 이벤트 핸들러처럼 다른 스레드에서 들어오는 측정값도 진행 중인 턴에 기록된다.
+    """
+
+    def __init__(self, metrics_file: str = None):
+        self.metrics_file = Path(metrics_file) if metrics_file else None
+        self.histograms: Dict[str, Histogram] = defaultdict(Histogram)
+        self.tool_totals: Counter = Counter()
+        self.turns = 0
+        self._active: Optional[TurnRecord] = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def turn(self):
+        """턴 계측 시작 - 블록이 끝나면 히스토그램과 메트릭 파일에 반영"""
+        record = TurnRecord(get_correlation_id())
+        with self._lock:
+            self._active = record
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record.error = type(e).__name__
+            raise
+        finally:
+            record.total = time.perf_counter() - start
+            with self._lock:
+                self._active = None
+            self._finish(record)
+
+    @contextmanager
+    def span(self, name: str):
+        """진행 중인 턴에 단계 소요 시간 기록 (턴 밖에서는 아무것도 하지 않음)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, time.perf_counter() - start)
+
+    def add_span(self, name: str, seconds: float):
+        with self._lock:
+            if self._active is not None:
+                self._active.spans[name].append(seconds)
+
+    def record_tokens(self, prompt_tokens: int, completion_tokens: int, llm_calls: int = 0):
+        with self._lock:
+            if self._active is not None:
+                self._active.prompt_tokens += prompt_tokens or 0
+                self._active.completion_tokens += completion_tokens or 0
+                self._active.llm_calls += llm_calls or 0
+
+    def count_tool(self, name: str):
+        with self._lock:
+            if self._active is not None:
+                self._active.tool_calls[name] += 1
+
+    def set_metrics_file(self, metrics_file: str):
+        """턴별 기록 파일 지정 (None이면 기록하지 않음)"""
+        self.metrics_file = Path(metrics_file) if metrics_file else None
+
+    def _finish(self, record: TurnRecord):
+        """턴 결과를 히스토그램에 반영하고 메트릭 파일에 기록"""
+        with self._lock:
+            self.turns += 1
+            self.histograms["turn"].add(record.total)
+            for name, values in record.spans.items():
+                self.histograms[name].add(sum(values))
+            if record.completion_tokens:
+                self.histograms["prompt_tokens"].add(record.prompt_tokens)
+                self.histograms["completion_tokens"].add(record.completion_tokens)
+                self.histograms["tokens_per_second"].add(record.tokens_per_second)
+            self.tool_totals.update(record.tool_calls)
+
+        logger.info("턴 계측 - %.2f초, 토큰 %s/%s, %.1f tok/s, 도구 %s회",
+                    record.total, record.prompt_tokens, record.completion_tokens,
+                    record.tokens_per_second, sum(record.tool_calls.values()))
+
+        if self.metrics_file is not None:
+            try:
+                self.metrics_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.metrics_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record.to_dict(), ensure_ascii=False) + "\n")
+            except OSError as e:
+                logger.warning("메트릭 파일 기록 실패: %s", e)
+
+    def snapshot(self) -> dict:
+        """히스토그램 요약 (오프라인 분석용)"""
+        with self._lock:
+            return {
+                "turns": self.turns,
+                "histograms": {name: hist.summary() for name, hist in self.histograms.items()},
+                "tool_calls": dict(self.tool_totals),
+            }
+
+    def save_summary(self) -> Optional[Path]:
+        """히스토그램 요약을 메트릭 파일 옆에 저장 (<이름>_summary.json)"""
+        if self.metrics_file is None or not self.turns:
+            return None
+        path = self.metrics_file.with_name(f"{self.metrics_file.stem}_summary.json")
+        try:
+            path.write_text(json.dumps(self.snapshot(), ensure_ascii=False, indent=2), encoding="utf-8")
+            return path
+        except OSError as e:
+            logger.warning("메트릭 요약 저장 실패: %s", e)
+            return None
+
+    def format_stats(self) -> str:
+        """'stats' 명령어 출력"""
+        snapshot = self.snapshot()
+        if not snapshot["turns"]:
+            return "📊 아직 계측된 턴이 없습니다."
+
+        lines = [f"📊 **턴 계측 통계** (총 {snapshot['turns']}턴)", "",
+                 f"{'항목':<28}{'p50':>10}{'p95':>10}{'p99':>10}{'횟수':>6}"]
+        histograms = snapshot["histograms"]
+        for name in sorted(histograms, key=lambda n: (n != "turn", n)):
+            stats = histograms[name]
+            if not stats["count"]:
+                continue
+            unit = "" if name.endswith(("tokens", "per_second")) else "s"
+            lines.append(f"{name:<28}" + "".join(
+                f"{stats[q]:>9.2f}{unit or ' '}" for q in ("p50", "p95", "p99")
+            ) + f"{stats['count']:>6}")
+
+        if snapshot["tool_calls"]:
+            calls = ", ".join(f"{name} {count}회" for name, count in
+                              sorted(snapshot["tool_calls"].items(), key=lambda item: -item[1]))
+            lines.append("")
+            lines.append(f"🔧 도구 호출: {calls}")
+        if self.metrics_file is not None:
+            lines.append(f"📁 턴별 기록: {self.metrics_file}")
+        return "\n".join(lines)
+
+
+def traced_tool(method):
+    """CrewAI 도구 _run 메서드 계측 (호출 횟수 + tool.<이름> span)"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        recorder.count_tool(self.name)
+        with recorder.span(f"tool.{self.name}"):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+_crewai_hooks_installed = False
+_crewai_hooks_lock = threading.Lock()
+
+
+def install_crewai_hooks():
+    """CrewAI 이벤트 버스에서 LLM 호출 시간 수집 (첫 Crew 생성 시 한 번)
+
+    스트리밍 응답이면 첫 청크까지를 llm.queue(대기+프롬프트 처리), 이후를 llm.generate로 나눈다.
+    이벤트 API가 없는 CrewAI 버전에서는 턴/단계 계측만 동작한다.
+    """
+    global _crewai_hooks_installed
+    with _crewai_hooks_lock:
+        if _crewai_hooks_installed:
+            return
+        _crewai_hooks_installed = True
+
+    try:
+        from crewai.events import crewai_event_bus
+        from crewai.events.types.llm_events import (
+            LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent, LLMStreamChunkEvent
+        )
+    except ImportError:
+        logger.info("CrewAI 이벤트 API 없음 - LLM 호출 계측 생략")
+        return
+
+    started = {}
+    first_chunk = {}
+
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def _on_llm_started(source, event):
+        started[event.call_id] = event.timestamp
+
+    @crewai_event_bus.on(LLMStreamChunkEvent)
+    def _on_llm_chunk(source, event):
+        first_chunk.setdefault(event.call_id, event.timestamp)
+
+    def _on_llm_finished(event):
+        begin = started.pop(event.call_id, None)
+        chunk = first_chunk.pop(event.call_id, None)
+        if begin is None:
+            return
+        recorder.add_span("llm", (event.timestamp - begin).total_seconds())
+        if chunk is not None:
+            recorder.add_span("llm.queue", (chunk - begin).total_seconds())
+            recorder.add_span("llm.generate", (event.timestamp - chunk).total_seconds())
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def _on_llm_completed(source, event):
+        _on_llm_finished(event)
+
+    @crewai_event_bus.on(LLMCallFailedEvent)
+    def _on_llm_failed(source, event):
+        _on_llm_finished(event)
+
+
+def flush_crewai_events(timeout: float = 1.0):
+    """비동기로 처리되는 CrewAI 이벤트 핸들러가 턴이 끝나기 전에 반영되도록 대기"""
+    try:
+        from crewai.events import crewai_event_bus
+    except ImportError:
+        return
+    flush = getattr(crewai_event_bus, "flush", None)
+    if flush is not None:
+        flush(timeout=timeout)
+
+
+_USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "successful_requests")
+_last_crew_usage: Dict[int, tuple] = {}
+
+
+def record_crew_usage(crew, result):
+    """Crew 실행 결과의 토큰 사용량 기록
+
+    재사용하는 Crew의 token_usage는 누적값이므로 직전 kickoff 대비 증가분만 기록한다.
+    """
+    usage = getattr(result, "token_usage", None)
+    if usage is None:
+        return
+    current = tuple(getattr(usage, field, 0) or 0 for field in _USAGE_FIELDS)
+    previous = _last_crew_usage.get(id(crew), (0, 0, 0))
+    if any(now < before for now, before in zip(current, previous)):
+        previous = (0, 0, 0)  # 사용량이 초기화된 경우
+    _last_crew_usage[id(crew)] = current
+    recorder.record_tokens(*(now - before for now, before in zip(current, previous)))
+
+
+# 글로벌 수집기 (main.py/dnd.py가 메트릭 파일 경로를 지정)
+recorder = MetricsRecorder()
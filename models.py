@@ -2,7 +2,7 @@ import re
 import json
 import logging
 import threading
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
 from datetime import datetime
@@ -22,6 +22,19 @@ class InputValidator:
         r'<.*?>',  # HTML 태그 제거
     ]
     
+    # 패턴별로 임포트 시 한 번만 컴파일 - (패턴, 매칭에 꼭 필요한 문자)
+    # 패턴을 하나로 합치면 앞 패턴을 지운 뒤 새로 생기는 매치(예: 'evaljavascript:(')를 놓치므로
+    # 기존과 같이 패턴 순서대로 한 번씩 적용한다.
+    _DANGEROUS_RES = tuple(
+        (re.compile(pattern, re.IGNORECASE), trigger)
+        for pattern, trigger in zip(DANGEROUS_PATTERNS, ('<', ':', '(', '<'))
+    )
+    
+    VALID_COMMANDS = frozenset({
+        'help', 'quit', 'save', 'load', 'status', 'inventory',
+        '조사', '수락', '거절', '공격', '도망', '상태', '인벤토리'
+    })
+    
     @classmethod
     def sanitize_input(cls, user_input: str) -> str:
         """사용자 입력 정제"""
@@ -29,26 +42,45 @@ class InputValidator:
             return ""
         
         # 길이 제한
-        if len(user_input) > config.MAX_INPUT_LENGTH:
-            user_input = user_input[:config.MAX_INPUT_LENGTH]
-            logger.warning(f"입력이 최대 길이로 제한됨: {config.MAX_INPUT_LENGTH}자")
+        max_length = config.MAX_INPUT_LENGTH
+        if len(user_input) > max_length:
+            user_input = user_input[:max_length]
+            logger.warning("입력이 최대 길이로 제한됨: %s자", max_length)
         
         # 위험한 패턴 제거
-        for pattern in cls.DANGEROUS_PATTERNS:
-            user_input = re.sub(pattern, '', user_input, flags=re.IGNORECASE)
+        return cls._strip_dangerous(user_input).strip()
+    
+    @classmethod
+    def _strip_dangerous(cls, text: str) -> str:
+        """패턴 순서대로 제거 (패턴별 re.sub와 동일한 결과)
         
-        return user_input.strip()
+        패턴에 꼭 필요한 문자('<', ':', '(')가 없으면 정규식을 실행하지 않으므로
+        일반 한국어 입력은 str 검색 몇 번으로 끝난다.
+        """
+        for pattern, trigger in cls._DANGEROUS_RES:
+            if trigger in text:
+                text = pattern.sub('', text)
+        return text
+    
+    @classmethod
+    def sanitize_batch(cls, inputs: Iterable[str]) -> List[str]:
+        """여러 입력을 한 번에 정제"""
+        sanitize = cls.sanitize_input
+        return [sanitize(user_input) for user_input in inputs]
     
     @classmethod
     def validate_command(cls, command: str) -> bool:
         """명령어 유효성 검사"""
-        valid_commands = {
-            'help', 'quit', 'save', 'load', 'status', 'inventory',
-            '조사', '수락', '거절', '공격', '도망', '상태', '인벤토리'
-        }
-        
         # 기본 명령어이거나 자유 입력 허용
-        return command.lower() in valid_commands or len(command.split()) <= 20
+        return command.lower() in cls.VALID_COMMANDS or len(command.split()) <= 20
+    
+    @classmethod
+    def validate_batch(cls, inputs: Iterable[str]) -> List[Tuple[str, bool]]:
+        """여러 입력을 정제하고 (정제된 입력, 유효 여부) 목록 반환"""
+        results = []
+        for sanitized in cls.sanitize_batch(inputs):
+            results.append((sanitized, bool(sanitized) and cls.validate_command(sanitized)))
+        return results
 
 # ===== 데이터 모델 =====
 @dataclass
@@ -130,7 +162,7 @@ class GameStateManager:
             self.state.game_context = new_context
             self.state.session_log.append(f"[{datetime.now().strftime('%H:%M:%S')}] {new_context}")
             self.state.last_updated = datetime.now().isoformat()
-            logger.info(f"게임 컨텍스트 업데이트: {new_context[:100]}...")
+            logger.info("게임 컨텍스트 업데이트: %s...", new_context[:100])
     
     def get_context(self) -> str:
         """현재 게임 컨텍스트 조회"""
@@ -140,7 +172,7 @@ class GameStateManager:
         """캐릭터 추가"""
         with self._lock:
             self.state.active_characters.append(character)
-            logger.info(f"캐릭터 추가됨: {character.name}")
+            logger.info("캐릭터 추가됨: %s", character.name)
     
     def get_character(self, name: str) -> Optional[Character]:
         """캐릭터 조회"""
@@ -166,10 +198,10 @@ class GameStateManager:
             with open(save_path, 'w', encoding='utf-8') as f:
                 json.dump(save_data, f, ensure_ascii=False, indent=2)
             
-            logger.info(f"게임 저장 완료: {save_path}")
+            logger.info("게임 저장 완료: %s", save_path)
             return True
         except Exception as e:
-            logger.error(f"게임 저장 실패: {e}")
+            logger.error("게임 저장 실패: %s", e)
             return False
     
     def load_game(self, filename: str) -> bool:
@@ -177,7 +209,7 @@ class GameStateManager:
         try:
             save_path = self.saves_dir / filename
             if not save_path.exists():
-                logger.warning(f"저장 파일을 찾을 수 없음: {save_path}")
+                logger.warning("저장 파일을 찾을 수 없음: %s", save_path)
                 return False
             
             with open(save_path, 'r', encoding='utf-8') as f:
@@ -195,10 +227,10 @@ class GameStateManager:
                     Character(**char_data) for char_data in characters_data
                 ]
             
-            logger.info(f"게임 불러오기 완료: {save_path}")
+            logger.info("게임 불러오기 완료: %s", save_path)
             return True
         except Exception as e:
-            logger.error(f"게임 불러오기 실패: {e}")
+            logger.error("게임 불러오기 실패: %s", e)
             return False
     
     def get_save_files(self) -> List[str]:
@@ -206,7 +238,7 @@ class GameStateManager:
         try:
             return [f.name for f in self.saves_dir.glob("*.json")]
         except Exception as e:
-            logger.error(f"저장 파일 목록 조회 실패: {e}")
+            logger.error("저장 파일 목록 조회 실패: %s", e)
             return []
 
 # 글로벌 게임 상태 매니저
@@ -0,0 +1,175 @@
+"""
+웹 페이지 본문 디스크 캐시 (콘텐츠 주소 기반)
+
+같은 인기 페이지를 실행마다 다시 내려받고 다시 추출하지 않도록 다음을 저장한다.
+  entries/<url 해시>.json         URL → 콘텐츠 해시, HTTP 검증자(ETag/Last-Modified), 가져온 시각
+  blobs/<콘텐츠 해시>.html.gz     원본 HTML (내용이 같으면 URL이 달라도 한 번만 저장)
+  extracted/<콘텐츠 해시>.json    추출 방법과 추출 본문
+
+다음 요청에는 조건부 헤더(If-None-Match/If-Modified-Since)를 붙이고,
+304 응답이면 저장된 추출 본문을 그대로 쓴다 (작은 왕복 한 번, 추출 CPU 없음).
+200 응답이어도 내용 해시가 같으면 저장된 추출 본문을 다시 쓴다 (검증자를 주지 않는 서버 대비).
+
+PAGE_CACHE_DIR (기본값 page_cache) 아래에 저장하며, PAGE_CACHE=0이면 사용하지 않는다.
+"""
+import os
+import gzip
+import json
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE_DIR = os.getenv("PAGE_CACHE_DIR", "page_cache")
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE", "1").lower() not in ("0", "false", "no")
+
+
+@dataclass
+class CachedPage:
+    """URL 하나의 캐시 항목 (추출 본문 포함)"""
+    url: str
+    content_hash: str
+    method: str
+    text: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: str = ""
+    revalidated_at: str = ""
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """재검증 요청 헤더"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+def content_hash(html: str) -> str:
+    return hashlib.sha256(html.encode('utf-8', 'replace')).hexdigest()
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+def _header(headers: Optional[Mapping[str, str]], name: str) -> Optional[str]:
+    """응답 헤더 조회 (requests는 대소문자 무시, Playwright는 소문자 키)"""
+    if not headers:
+        return None
+    return headers.get(name) or headers.get(name.lower())
+
+
+def _write_atomic(path: Path, data: bytes):
+    """임시 파일에 쓴 뒤 교체 - 동시 실행/중단에도 깨진 항목이 남지 않음"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class PageCache:
+    """콘텐츠 주소 기반 페이지 저장소"""
+
+    def __init__(self, base_dir: str = None, enabled: bool = None):
+        self.path = Path(base_dir or PAGE_CACHE_DIR)
+        self.enabled = PAGE_CACHE_ENABLED if enabled is None else enabled
+
+    def _entry_path(self, url: str) -> Path:
+        key = _url_key(url)
+        return self.path / "entries" / key[:2] / f"{key}.json"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.path / "blobs" / digest[:2] / f"{digest}.html.gz"
+
+    def _extracted_path(self, digest: str) -> Path:
+        return self.path / "extracted" / digest[:2] / f"{digest}.json"
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("페이지 캐시 읽기 실패 (%s): %s", path, e)
+            return None
+
+    # ----- 조회 -----
+    def lookup(self, url: str) -> Optional[CachedPage]:
+        """URL의 캐시 항목 (추출 본문이 없으면 None)"""
+        if not self.enabled:
+            return None
+        entry = self._read_json(self._entry_path(url))
+        if not entry:
+            return None
+        extracted = self.extracted(entry["content_hash"])
+        if not extracted:
+            return None
+        return CachedPage(url=url, method=extracted["method"], text=extracted["text"],
+                          **{k: entry.get(k) for k in ("content_hash", "etag", "last_modified",
+                                                         "fetched_at", "revalidated_at")})
+
+    def extracted(self, digest: str) -> Optional[Dict[str, str]]:
+        """콘텐츠 해시의 추출 결과 {method, text}"""
+        if not self.enabled:
+            return None
+        return self._read_json(self._extracted_path(digest))
+
+    def extracted_for_html(self, html: str) -> Optional[Dict[str, str]]:
+        """같은 내용의 HTML을 이미 추출한 적이 있으면 그 결과"""
+        return self.extracted(content_hash(html)) if self.enabled and html else None
+
+    def load_html(self, digest: str) -> Optional[str]:
+        """저장된 원본 HTML"""
+        try:
+            return gzip.decompress(self._blob_path(digest).read_bytes()).decode('utf-8')
+        except (OSError, ValueError):
+            return None
+
+    # ----- 저장 -----
+    def store(self, url: str, html: str, headers: Optional[Mapping[str, str]], method: str, text: str):
+        """원본 HTML, 추출 결과, HTTP 검증자 저장 - 실패해도 추출 흐름은 계속한다"""
+        if not self.enabled or not html or not text:
+            return
+        digest = content_hash(html)
+        now = datetime.now().isoformat(timespec="seconds")
+        try:
+            blob = self._blob_path(digest)
+            if not blob.exists():
+                _write_atomic(blob, gzip.compress(html.encode('utf-8', 'replace')))
+            _write_atomic(self._extracted_path(digest), json.dumps(
+                {"method": method, "text": text, "extracted_at": now}, ensure_ascii=False).encode('utf-8'))
+            _write_atomic(self._entry_path(url), json.dumps({
+                "url": url,
+                "content_hash": digest,
+                "etag": _header(headers, 'ETag'),
+                "last_modified": _header(headers, 'Last-Modified'),
+                "fetched_at": now,
+                "revalidated_at": now,
+            }, ensure_ascii=False).encode('utf-8'))
+        except OSError as e:
+            logger.warning("페이지 캐시 저장 실패 (%s): %s", url, e)
+
+    def mark_revalidated(self, page: CachedPage, headers: Optional[Mapping[str, str]] = None):
+        """304 응답 - 재검증 시각과 (새로 받은) 검증자 갱신"""
+        if not self.enabled:
+            return
+        page.etag = _header(headers, 'ETag') or page.etag
+        page.last_modified = _header(headers, 'Last-Modified') or page.last_modified
+        page.revalidated_at = datetime.now().isoformat(timespec="seconds")
+        entry = {k: v for k, v in asdict(page).items() if k not in ("method", "text")}
+        try:
+            _write_atomic(self._entry_path(page.url), json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+        except OSError as e:
+            logger.warning("페이지 캐시 갱신 실패 (%s): %s", page.url, e)
+
+
+# 모듈 기본 저장소
+page_cache = PageCache()
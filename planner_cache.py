@@ -0,0 +1,119 @@
+"""
+검색 계획(플래너 출력) 캐시
+
+검색 계획 단계는 LLM 호출 한 번으로 검색어 5개 정도를 만드는데, 같은 주제/검색어 수/언어라면
+결과가 크게 달라지지 않는다. 파싱한 검색어 목록을 TTL 동안 저장해 두고, 반복 실행과 배치 실행에서는
+계획 단계를 건너뛰고 저장된 검색어로 바로 리서치한다 (--replan이면 다시 계획하고 캐시를 갱신).
+
+  planner_cache/<키 해시>.json   {topic, count, language, queries, created_at}
+
+PLANNER_CACHE_DIR (기본값 planner_cache) 아래에 저장하며, PLANNER_CACHE=0이면 사용하지 않는다.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+PLANNER_CACHE_DIR = os.getenv("PLANNER_CACHE_DIR", "planner_cache")
+PLANNER_CACHE_ENABLED = os.getenv("PLANNER_CACHE", "1").lower() not in ("0", "false", "no")
+# 캐시 유효 기간 (시간) - 최신 동향 주제라 너무 오래 쓰지 않는다
+PLANNER_CACHE_TTL_HOURS = float(os.getenv("PLANNER_CACHE_TTL_HOURS", "24"))
+
+# 플래너 출력의 쿼리 줄 (QUERY_1: "..." / SEARCH_QUERY_1: ...)
+_QUERY_LINE = re.compile(r'^\s*\**\s*(?:SEARCH_)?QUERY_\d+\s*\**\s*[:：]\s*(.+?)\s*$', re.IGNORECASE | re.MULTILINE)
+
+
+@dataclass
+class CachedPlan:
+    """캐시된 검색 계획"""
+    topic: str
+    count: int
+    language: str
+    queries: List[str]
+    created_at: float
+
+    @property
+    def age_hours(self) -> float:
+        return (time.time() - self.created_at) / 3600
+
+
+def plan_key(topic: str, count: int, language: str) -> str:
+    """캐시 키 - 주제는 대소문자/공백 차이를 무시"""
+    normalized = re.sub(r'\s+', ' ', topic).strip().lower()
+    return hashlib.sha256(json.dumps([normalized, count, language], ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def parse_planned_queries(text: str, limit: int = None) -> List[str]:
+    """플래너 출력에서 QUERY_n 줄의 검색어 추출 (따옴표/마크다운 제거, 중복 제외)"""
+    queries: List[str] = []
+    seen = set()
+    for raw in _QUERY_LINE.findall(text or ""):
+        query = raw.strip().strip('*').strip().strip('"\'“”‘’`').strip()
+        if len(query) < 3:
+            continue
+        if query.lower() not in seen:
+            seen.add(query.lower())
+            queries.append(query)
+    return queries[:limit] if limit else queries
+
+
+def format_plan(queries: List[str], prefix: str = "SEARCH_QUERY") -> str:
+    """검색어 목록을 플래너 출력 형식(PREFIX_n: "검색어")으로 - 계획 태스크 출력 대신 사용"""
+    return "\n".join(f'{prefix}_{i}: "{query}"' for i, query in enumerate(queries, 1))
+
+
+class PlannerCache:
+    """주제/검색어 수/언어별 검색어 목록 저장소"""
+
+    def __init__(self, base_dir: str = None, ttl_hours: float = None, enabled: bool = None):
+        self.path = Path(base_dir or PLANNER_CACHE_DIR)
+        self.ttl_hours = PLANNER_CACHE_TTL_HOURS if ttl_hours is None else ttl_hours
+        self.enabled = PLANNER_CACHE_ENABLED if enabled is None else enabled
+
+    def _entry_path(self, topic: str, count: int, language: str) -> Path:
+        return self.path / f"{plan_key(topic, count, language)}.json"
+
+    def get(self, topic: str, count: int, language: str) -> Optional[CachedPlan]:
+        """유효한 캐시 항목 (없거나 만료되면 None)"""
+        if not self.enabled:
+            return None
+        path = self._entry_path(topic, count, language)
+        try:
+            plan = CachedPlan(**json.loads(path.read_text(encoding='utf-8')))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("검색 계획 캐시 읽기 실패 (%s): %s", path, e)
+            return None
+        if plan.age_hours > self.ttl_hours or not plan.queries:
+            logger.info("⌛ 검색 계획 캐시 만료 (%.1f시간 전): %s", plan.age_hours, topic)
+            return None
+        return plan
+
+    def put(self, topic: str, count: int, language: str, queries: List[str]):
+        """파싱한 검색어 목록 저장 (비어 있으면 저장하지 않음) - 실패해도 리서치는 계속한다"""
+        if not self.enabled or not queries:
+            return
+        plan = CachedPlan(topic=topic, count=count, language=language, queries=list(queries),
+                          created_at=time.time())
+        path = self._entry_path(topic, count, language)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(asdict(plan), ensure_ascii=False, indent=2), encoding='utf-8')
+            os.replace(tmp, path)
+            logger.info("💾 검색 계획 캐시 저장: %s (검색어 %s개)", topic, len(plan.queries))
+        except OSError as e:
+            logger.warning("검색 계획 캐시 저장 실패 (%s): %s", topic, e)
+
+
+# 모듈 기본 저장소
+planner_cache = PlannerCache()
@@ -0,0 +1,156 @@
+"""
+유사 검색어(근접 중복) 감지
+
+get_query_hash는 소문자 쿼리의 MD5라서 "AI trends 2025"와 "2025 AI trends"를 다른 검색으로 본다.
+여기서는 이미 검색한 쿼리와 다음 순서로 비교해 가장 가까운 쿼리를 찾는다.
+1. 용어 집합 (불용어 제거, 한국어 어간, 순서 무시) - 같으면 유사도 1.0
+2. 용어 집합 Jaccard ≥ QUERY_TOKEN_THRESHOLD
+3. 용어별 글자 3-gram 집합(순서 무시) Jaccard ≥ QUERY_SHINGLE_THRESHOLD - 단수/복수, 띄어쓰기 차이
+4. (선택, QUERY_DEDUP_EMBEDDINGS=1) 임베딩 코사인 ≥ QUERY_EMBEDDING_THRESHOLD
+
+숫자(연도, 버전)가 다르면 다른 검색으로 본다 ("AI trends 2024" ≠ "AI trends 2025").
+"""
+import os
+import re
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import FrozenSet, List, Optional
+
+from evidence_compress import terms
+
+logger = logging.getLogger(__name__)
+
+QUERY_TOKEN_THRESHOLD = float(os.getenv("QUERY_TOKEN_THRESHOLD", "0.8"))
+QUERY_SHINGLE_THRESHOLD = float(os.getenv("QUERY_SHINGLE_THRESHOLD", "0.75"))
+QUERY_EMBEDDING_THRESHOLD = float(os.getenv("QUERY_EMBEDDING_THRESHOLD", "0.92"))
+QUERY_DEDUP_EMBEDDINGS = os.getenv("QUERY_DEDUP_EMBEDDINGS", "0").lower() in ("1", "true", "yes")
+SHINGLE_SIZE = 3
+
+_NUMBER = re.compile(r'\d+')
+
+
+def query_terms(query: str) -> FrozenSet[str]:
+    """순서와 무관한 쿼리 용어 집합"""
+    return frozenset(terms(query))
+
+
+def query_shingles(tokens: FrozenSet[str]) -> FrozenSet[str]:
+    """용어별 글자 n-gram 집합 (짧은 용어는 그대로)"""
+    shingles = set()
+    for token in tokens:
+        padded = f"^{token}$"
+        if len(padded) <= SHINGLE_SIZE:
+            shingles.add(padded)
+        else:
+            shingles.update(padded[i:i + SHINGLE_SIZE] for i in range(len(padded) - SHINGLE_SIZE + 1))
+    return frozenset(shingles)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+@dataclass
+class QueryMatch:
+    """가장 가까운 기존 쿼리"""
+    query: str
+    key: str
+    similarity: float
+    method: str
+
+
+@dataclass
+class _Entry:
+    query: str
+    key: str
+    tokens: FrozenSet[str]
+    shingles: FrozenSet[str]
+    numbers: FrozenSet[str]
+    embedding_row: Optional[int] = None
+
+
+@dataclass
+class QueryIndex:
+    """검색한 쿼리 목록과 근접 중복 조회 (스레드 안전)"""
+    use_embeddings: bool = QUERY_DEDUP_EMBEDDINGS
+    entries: List[_Entry] = field(default_factory=list)
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def add(self, query: str, key: str):
+        """검색한 쿼리 등록 (key는 결과 캐시 키)"""
+        entry = self._entry(query, key)
+        if self.use_embeddings:
+            entry.embedding_row = self._embed(query)
+        with self._lock:
+            self.entries.append(entry)
+
+    def nearest(self, query: str, exclude_key: str = None) -> Optional[QueryMatch]:
+        """임계값을 넘는 가장 유사한 기존 쿼리 (없으면 None)"""
+        probe = self._entry(query, "")
+        with self._lock:
+            candidates = [e for e in self.entries if e.key != exclude_key and e.numbers == probe.numbers]
+        if not candidates or not probe.tokens:
+            return None
+
+        best: Optional[QueryMatch] = None
+        for entry in candidates:
+            token_score = jaccard(probe.tokens, entry.tokens)
+            if token_score >= QUERY_TOKEN_THRESHOLD:
+                match = QueryMatch(entry.query, entry.key, token_score, "용어 집합")
+            else:
+                shingle_score = jaccard(probe.shingles, entry.shingles)
+                if shingle_score < QUERY_SHINGLE_THRESHOLD:
+                    continue
+                match = QueryMatch(entry.query, entry.key, shingle_score, "글자 n-gram")
+            if best is None or match.similarity > best.similarity:
+                best = match
+        if best is not None or not self.use_embeddings:
+            return best
+        return self._nearest_by_embedding(query, candidates)
+
+    @staticmethod
+    def _entry(query: str, key: str) -> _Entry:
+        tokens = query_terms(query)
+        return _Entry(query=query, key=key, tokens=tokens, shingles=query_shingles(tokens),
+                      numbers=frozenset(_NUMBER.findall(query)))
+
+    # ----- 임베딩 (선택) -----
+    def _embed(self, query: str) -> Optional[int]:
+        try:
+            from local_corpus import EMBEDDING_MODEL, embed_texts
+            from embedding_store import get_embedding_store
+            if not EMBEDDING_MODEL:
+                return None
+            store = get_embedding_store(EMBEDDING_MODEL)
+            return store.ensure([query], lambda texts: embed_texts(texts, EMBEDDING_MODEL))[0]
+        except Exception as e:
+            logger.warning("쿼리 임베딩 실패 - 용어 비교만 사용: %s", e)
+            return None
+
+    def _nearest_by_embedding(self, query: str, candidates: List[_Entry]) -> Optional[QueryMatch]:
+        rows = [e.embedding_row for e in candidates if e.embedding_row is not None]
+        row = self._embed(query) if rows else None
+        if row is None:
+            return None
+        from local_corpus import EMBEDDING_MODEL
+        from embedding_store import get_embedding_store, top_k_cosine
+        store = get_embedding_store(EMBEDDING_MODEL)
+        (best_row, similarity), = top_k_cosine(store.matrix, store.matrix[row], 1, rows=rows)
+        if similarity < QUERY_EMBEDDING_THRESHOLD:
+            return None
+        entry = next(e for e in candidates if e.embedding_row == best_row)
+        return QueryMatch(entry.query, entry.key, similarity, "임베딩")
+
+
+def reuse_notice(query: str, match: QueryMatch) -> str:
+    """근접 중복 쿼리에 캐시 결과를 돌려줄 때 에이전트에게 알리는 머리말"""
+    return (f"🔁 '{query}'는 이미 검색한 '{match.query}'와 거의 같은 검색어라서 "
+            f"그 결과를 재사용합니다 (유사도 {match.similarity:.2f}, {match.method}). "
+            f"새로운 정보가 필요하면 다른 관점의 검색어를 사용하세요.\n")
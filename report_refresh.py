@@ -0,0 +1,161 @@
+"""
+반복 주제 보고서 증분 갱신 (근거 집합, 섹션 분할/병합)
+
+같은 주제를 주기적으로 다시 조사할 때 모든 단계를 처음부터 반복하지 않도록
+- 보고서를 만들 때 쓴 검색 결과(근거)를 URL과 내용 지문(fingerprint)으로 저장해 두고
+- 갱신할 때는 같은 검색어로 다시 검색해 이미 본 URL/내용을 걸러낸 새 근거만 남긴 뒤
+- 새 근거를 용어 겹침으로 기존 보고서 섹션에 배정해, 근거가 바뀐 섹션만 다시 작성하고 나머지는 그대로 둔다.
+어느 섹션에도 맞지 않는 새 근거는 새 섹션 하나로 덧붙인다.
+"""
+import re
+import hashlib
+import threading
+from collections import Counter
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+from evidence_compress import terms
+
+# 새 근거를 섹션에 배정하는 최소 겹침 (근거 용어 중 섹션에 나오는 비율)
+SECTION_MATCH_THRESHOLD = 0.2
+# 섹션별로 작성 단계에 넘기는 새 근거 최대 개수
+MAX_EVIDENCE_PER_SECTION = 6
+
+_HEADING = re.compile(r'^(#{1,3})\s+(.+?)\s*#*\s*$', re.MULTILINE)
+_HEADER_RULE = re.compile(r'^---\s*$', re.MULTILINE)
+
+
+def fingerprint(text: str) -> str:
+    """내용 지문 - 표기/공백/불용어 차이는 무시 (같은 기사가 다른 URL로 실린 경우 감지)"""
+    return hashlib.sha1(" ".join(terms(text)).encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class EvidenceItem:
+    """검색 결과 한 건"""
+    url: str
+    title: str
+    body: str
+    query: str
+    fingerprint: str = ""
+
+    def __post_init__(self):
+        if not self.fingerprint:
+            self.fingerprint = fingerprint(f"{self.title} {self.body}")
+
+    @property
+    def text(self) -> str:
+        return f"{self.title} {self.body}"
+
+
+@dataclass
+class EvidenceSet:
+    """보고서 한 편의 근거 (검색어, 검색 결과)
+
+    seen_urls/seen_fingerprints에 있는 결과는 기록하지 않는다 (갱신 모드에서는 이전 보고서의 근거로 채움).
+    """
+    queries: List[str] = field(default_factory=list)
+    items: List[EvidenceItem] = field(default_factory=list)
+    seen_urls: Set[str] = field(default_factory=set)
+    seen_fingerprints: Set[str] = field(default_factory=set)
+    skipped: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, query: str, results: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """검색 결과 기록 - 처음 보는 결과만 반환 (배치 검색 워커 스레드에서 동시에 호출됨)"""
+        with self._lock:
+            if query not in self.queries:
+                self.queries.append(query)
+            fresh = []
+            for result in results:
+                item = EvidenceItem(url=result.get('href', ''), title=result.get('title', ''),
+                                    body=result.get('body', ''), query=query)
+                if not item.url or item.url in self.seen_urls or item.fingerprint in self.seen_fingerprints:
+                    self.skipped += 1
+                    continue
+                self.seen_urls.add(item.url)
+                self.seen_fingerprints.add(item.fingerprint)
+                self.items.append(item)
+                fresh.append(result)
+            return fresh
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"queries": self.queries, "items": [asdict(item) for item in self.items]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EvidenceSet":
+        return cls(queries=list(data.get("queries", [])),
+                   items=[EvidenceItem(**item) for item in data.get("items", [])])
+
+    def seen_filter(self) -> "EvidenceSet":
+        """이 근거를 이미 본 것으로 취급하는 빈 근거 집합 (갱신 검색용)"""
+        return EvidenceSet(seen_urls={i.url for i in self.items},
+                           seen_fingerprints={i.fingerprint for i in self.items})
+
+    def merged(self, newer: "EvidenceSet") -> "EvidenceSet":
+        """이전 근거 + 새 근거 (다음 갱신의 기준)"""
+        queries = self.queries + [q for q in newer.queries if q not in self.queries]
+        return EvidenceSet(queries=queries, items=self.items + newer.items)
+
+
+@dataclass
+class Section:
+    """보고서 섹션 (heading이 빈 문자열이면 첫 제목 앞의 도입부)"""
+    heading: str
+    body: str
+
+    @property
+    def text(self) -> str:
+        return f"{self.heading}\n{self.body}" if self.heading else self.body
+
+
+def report_body(report: str) -> str:
+    """보고서 파일에서 머리말(생성 시간 등, 첫 --- 줄까지)을 뺀 본문"""
+    match = _HEADER_RULE.search(report)
+    return report[match.end():].lstrip("\n") if match and report.startswith("# ") else report
+
+
+def split_sections(markdown: str) -> List[Section]:
+    """## 수준 이하 제목 기준으로 섹션 분할 (# 제목 하나뿐인 글은 제목 줄을 도입부로)"""
+    headings = [m for m in _HEADING.finditer(markdown) if len(m.group(1)) >= 2]
+    if not headings:
+        return [Section("", markdown.strip())]
+    sections = []
+    preamble = markdown[:headings[0].start()].strip()
+    if preamble:
+        sections.append(Section("", preamble))
+    for current, following in zip(headings, headings[1:] + [None]):
+        end = following.start() if following else len(markdown)
+        sections.append(Section(current.group(0).strip(), markdown[current.end():end].strip()))
+    return sections
+
+
+def merge_sections(sections: Sequence[Section]) -> str:
+    return "\n\n".join(section.text.strip() for section in sections if section.text.strip()) + "\n"
+
+
+def assign_evidence(sections: Sequence[Section], items: Sequence[EvidenceItem],
+                    threshold: float = SECTION_MATCH_THRESHOLD) -> Dict[Optional[int], List[EvidenceItem]]:
+    """새 근거를 가장 많이 겹치는 섹션 번호에 배정 ({섹션 번호 또는 None(새 섹션): 근거 목록})
+
+    도입부(제목 없는 섹션)에는 배정하지 않는다.
+    """
+    section_terms = [set(terms(section.text)) if section.heading else set() for section in sections]
+    assigned: Dict[Optional[int], List[EvidenceItem]] = {}
+    for item in items:
+        item_terms = Counter(terms(item.text))
+        total = sum(item_terms.values()) or 1
+        best, best_score = None, 0.0
+        for index, vocabulary in enumerate(section_terms):
+            score = sum(count for term, count in item_terms.items() if term in vocabulary) / total
+            if score >= threshold and score > best_score:
+                best, best_score = index, score
+        bucket = assigned.setdefault(best, [])
+        if len(bucket) < MAX_EVIDENCE_PER_SECTION:
+            bucket.append(item)
+    return assigned
+
+
+def format_evidence(items: Sequence[EvidenceItem]) -> str:
+    """작성 단계에 넘길 새 근거 목록"""
+    return "\n".join(f"- {item.title}: {item.body} (출처: {item.url})" for item in items)
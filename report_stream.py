@@ -0,0 +1,249 @@
+"""
+작성 단계 스트리밍 보고서 기록
+
+작성(writer) 태스크의 LLM 응답을 토큰이 도착하는 대로 stdout과 보고서 파일(<파일명>.partial)에 기록한다.
+- 섹션(마크다운 제목 줄) 경계, FLUSH_CHARS 글자, FLUSH_SECONDS 초 중 먼저 오는 시점에 디스크로 flush + fsync
+- 완료되면 태스크 최종 출력으로 보고서 파일을 원자적으로 교체하고 .partial 파일을 지운다
+- 시간 제한/오류로 중단되면 .partial 파일에 중단 사유를 덧붙여 남겨 둔다 (그때까지의 내용 보존)
+
+ReAct 형식 응답("Thought: ... Final Answer: ...")은 Final Answer 이후만 기록하고,
+같은 태스크에서 새 LLM 응답이 시작되면(재시도) 본문을 헤더 위치로 되돌린다.
+CrewAI 이벤트 버스는 스트림 청크 이벤트를 발생 스레드에서 동기 실행하므로 청크 순서가 보장된다.
+"""
+import os
+import re
+import sys
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 스트리밍 기록 사용 여부 (CLI --no-stream으로 끌 수 있음)
+REPORT_STREAM = os.getenv("REPORT_STREAM", "1").lower() not in ("0", "false", "no")
+# 섹션 경계가 없어도 이만큼 쌓이거나 이 시간이 지나면 flush
+FLUSH_CHARS = int(os.getenv("REPORT_FLUSH_CHARS", "2000"))
+FLUSH_SECONDS = float(os.getenv("REPORT_FLUSH_SECONDS", "2"))
+
+PARTIAL_SUFFIX = ".partial"
+_FINAL_ANSWER = "Final Answer:"
+_THOUGHT = "Thought:"
+# 다음 섹션 시작 (줄 맨 앞의 마크다운 제목)
+_SECTION_START = re.compile(r'\n(?=#{1,6}\s)')
+
+# 태스크 id → 기록기 (이벤트 핸들러에서 조회)
+_active: Dict[str, "StreamingReportWriter"] = {}
+_active_lock = threading.Lock()
+_handler_installed = False
+
+
+class StreamingReportWriter:
+    """작성 태스크 하나의 출력을 보고서 파일과 stdout으로 흘려보내는 기록기"""
+
+    def __init__(self, filename: str, header: str, echo: bool = True):
+        self.filename = filename
+        self.partial_file = filename + PARTIAL_SUFFIX
+        self.header = header
+        self.echo = echo
+        self.task_id: Optional[str] = None
+        self.streamed_chars = 0
+        self._file = None
+        self._pending = ""          # 아직 디스크에 쓰지 않은 본문
+        self._preamble = ""         # Final Answer 이전 (기록하지 않음)
+        self._in_answer = False
+        self._response_id = None
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    # ----- 수명 주기 -----
+    def attach(self, task) -> "StreamingReportWriter":
+        """작성 태스크에 연결 - 헤더를 쓰고 태스크 에이전트의 LLM 스트리밍을 켠다"""
+        if not _install_handler():
+            return self
+        llm = getattr(task.agent, "llm", None)
+        if llm is None or not hasattr(llm, "stream"):
+            logger.info("작성 에이전트 LLM이 스트리밍을 지원하지 않음 - 완료 후 한 번에 저장")
+            return self
+        try:
+            self._file = open(self.partial_file, 'w', encoding='utf-8')
+            self._file.write(self.header)
+            self._sync()
+        except OSError as e:
+            logger.warning("스트리밍 보고서 파일 열기 실패 (%s): %s", self.partial_file, e)
+            self._file = None
+            return self
+        llm.stream = True
+        self.task_id = str(task.id)
+        with _active_lock:
+            _active[self.task_id] = self
+        logger.info("📝 작성 단계 스트리밍 기록: %s", self.partial_file)
+        return self
+
+    @property
+    def active(self) -> bool:
+        return self._file is not None
+
+    def finalize(self, result) -> Optional[str]:
+        """태스크 최종 출력으로 보고서 파일 완성 - 저장한 파일명 반환 (실패 시 None)
+
+        스트림에는 재시도/형식 오류 응답이 섞일 수 있으므로 최종 파일은 태스크 출력으로 다시 쓴다.
+        """
+        self._detach()
+        tmp = self.filename + ".tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(self.header)
+                f.write(str(result))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.filename)
+        except OSError as e:
+            logger.error("❌ 파일 저장 실패: %s", e)
+            return None
+        self._close()
+        try:
+            os.remove(self.partial_file)
+        except OSError:
+            pass
+        return self.filename
+
+    def abort(self, reason) -> Optional[str]:
+        """중단 - 지금까지의 내용을 .partial 파일에 남기고 경로 반환 (기록한 적 없으면 None)"""
+        self._detach()
+        if self._file is None:
+            return None
+        with self._lock:
+            try:
+                self._file.write(self._pending)
+                self._pending = ""
+                stamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                self._file.write(f"\n\n---\n\n> ⚠️ 작성 중단 ({stamp}): {reason}\n")
+                self._sync()
+            except OSError as e:
+                logger.warning("부분 보고서 기록 실패: %s", e)
+        self._close()
+        logger.warning("⚠️ 작성 중단 - 부분 보고서 보존: %s (%s자)", self.partial_file, self.streamed_chars)
+        return self.partial_file
+
+    # ----- 스트림 처리 -----
+    def on_chunk(self, chunk: str, response_id: Optional[str] = None):
+        """LLM 스트림 청크 하나 처리"""
+        with self._lock:
+            if self._file is None or not chunk:
+                return
+            if response_id and response_id != self._response_id:
+                if self._response_id is not None:
+                    self._restart()
+                self._response_id = response_id
+            text = self._answer_text(chunk)
+            if not text:
+                return
+            self.streamed_chars += len(text)
+            self._pending += text
+            if self.echo:
+                sys.stdout.write(text)
+                sys.stdout.flush()
+            self._flush_sections()
+
+    def _answer_text(self, chunk: str) -> str:
+        """ReAct 형식이면 Final Answer 이후만 돌려줌"""
+        if self._in_answer:
+            return chunk
+        self._preamble += chunk
+        stripped = self._preamble.lstrip()
+        if len(stripped) < len(_THOUGHT) and _THOUGHT.startswith(stripped):
+            return ""  # 아직 판단할 수 없음
+        if not stripped.startswith(_THOUGHT):
+            self._in_answer = True
+            return self._preamble
+        marker = self._preamble.find(_FINAL_ANSWER)
+        if marker == -1:
+            return ""
+        self._in_answer = True
+        return self._preamble[marker + len(_FINAL_ANSWER):].lstrip()
+
+    def _flush_sections(self):
+        """완성된 섹션까지 기록 (섹션 경계가 없으면 크기/시간 기준)"""
+        boundary = None
+        for match in _SECTION_START.finditer(self._pending):
+            boundary = match.start() + 1
+        if boundary is None and (len(self._pending) >= FLUSH_CHARS
+                                 or time.monotonic() - self._last_flush >= FLUSH_SECONDS):
+            boundary = len(self._pending)
+        if not boundary:
+            return
+        try:
+            self._file.write(self._pending[:boundary])
+            self._sync()
+        except OSError as e:
+            logger.warning("부분 보고서 기록 실패: %s", e)
+            return
+        self._pending = self._pending[boundary:]
+
+    def _restart(self):
+        """같은 태스크의 새 LLM 응답 - 본문을 헤더 위치로 되돌림"""
+        self._pending = ""
+        self._preamble = ""
+        self._in_answer = False
+        self.streamed_chars = 0
+        try:
+            self._file.seek(0)
+            self._file.truncate()
+            self._file.write(self.header)
+            self._sync()
+        except OSError as e:
+            logger.warning("부분 보고서 초기화 실패: %s", e)
+        if self.echo:
+            sys.stdout.write("\n\n🔁 (작성 재시도)\n")
+            sys.stdout.flush()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_flush = time.monotonic()
+
+    def _detach(self):
+        if self.task_id is not None:
+            with _active_lock:
+                _active.pop(self.task_id, None)
+        if self.echo and self.streamed_chars:
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+
+    def _close(self):
+        with self._lock:
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None
+
+
+def _install_handler() -> bool:
+    """CrewAI 이벤트 버스에 스트림 청크 핸들러 등록 (한 번만)"""
+    global _handler_installed
+    with _active_lock:
+        if _handler_installed:
+            return True
+        try:
+            from crewai.events import crewai_event_bus
+            from crewai.events.types.llm_events import LLMStreamChunkEvent
+        except ImportError:
+            logger.info("CrewAI 스트림 이벤트 API 없음 - 작성 완료 후 한 번에 저장")
+            return False
+
+        # 등록을 마친 뒤에 설치 표시 - 동시에 호출한 다른 작성기가 핸들러 없이 청크를 놓치지 않게
+        @crewai_event_bus.on(LLMStreamChunkEvent)
+        def _on_stream_chunk(source, event):
+            if getattr(event, "tool_call", None):
+                return
+            with _active_lock:
+                writer = _active.get(str(getattr(event, "task_id", "") or ""))
+            if writer is not None:
+                writer.on_chunk(event.chunk, getattr(event, "response_id", None))
+
+        _handler_installed = True
+    return True
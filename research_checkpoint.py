@@ -0,0 +1,131 @@
+"""
+리서치 단계별 체크포인트
+
+planning/research 같은 단계 출력을 실행 id 아래에 저장해 두고,
+작성 단계가 실패하거나 시간 제한에 걸려도 --resume으로 완료된 단계를 건너뛰고 이어서 실행한다.
+
+디렉터리 구조 (RESEARCH_RUNS_DIR, 기본값 research_runs):
+  <run_id>/meta.json        주제, 크루 이름, 생성/갱신 시각, 완료 단계, 최종 보고서 파일
+  <run_id>/<stage>.json     단계 출력
+"""
+import os
+import re
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+RUNS_DIR = os.getenv("RESEARCH_RUNS_DIR", "research_runs")
+
+
+def _write_json(path: Path, payload: Dict[str, Any]):
+    """임시 파일에 쓴 뒤 교체 - 중간에 종료돼도 이전 체크포인트가 깨지지 않음"""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class ResearchCheckpoint:
+    """실행 id 하나의 단계 출력 저장소"""
+
+    def __init__(self, run_id: str, topic: str = None, base_dir: str = None, crew: str = None):
+        """crew: 체크포인트를 만든 크루 (improved, unified) - 같은 디렉터리를 쓰므로 재개/갱신 시 구분"""
+        self.run_id = run_id
+        self.path = Path(base_dir or RUNS_DIR) / run_id
+        self.meta = self._read(self.path / "meta.json") or {
+            "run_id": run_id,
+            "topic": topic,
+            "crew": crew,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "stages": [],
+        }
+        if topic and not self.meta.get("topic"):
+            self.meta["topic"] = topic
+
+    @property
+    def topic(self) -> Optional[str]:
+        return self.meta.get("topic")
+
+    @property
+    def crew(self) -> Optional[str]:
+        return self.meta.get("crew")
+
+    @staticmethod
+    def new_run_id(topic: str) -> str:
+        """주제와 시각으로 실행 id 생성"""
+        safe_topic = re.sub(r'[^\w-]', '', topic.replace(' ', '_'))[:40] or "research"
+        return f"{safe_topic}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+    @classmethod
+    def latest(cls, topic: str = None, base_dir: str = None, stage: str = None,
+               **match) -> Optional["ResearchCheckpoint"]:
+        """가장 최근에 갱신된 실행 (topic을 주면 같은 주제만)
+
+        stage를 주면 그 단계가 완료된 실행만, match로 준 메타 값(quality_mode 등)이 같은 실행만 찾는다.
+        """
+        root = Path(base_dir or RUNS_DIR)
+        candidates = []
+        for meta_file in root.glob("*/meta.json"):
+            meta = cls._read(meta_file)
+            if (meta and (topic is None or meta.get("topic") == topic)
+                    and (stage is None or stage in meta.get("stages", []))
+                    and all(meta.get(key) == value for key, value in match.items())):
+                candidates.append((meta.get("updated_at") or meta.get("created_at") or "", meta_file.parent.name))
+        if not candidates:
+            return None
+        return cls(max(candidates)[1], base_dir=base_dir)
+
+    @staticmethod
+    def _read(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("체크포인트 읽기 실패 (%s): %s", path, e)
+            return None
+
+    # ----- 단계 출력 -----
+    def has(self, stage: str) -> bool:
+        return stage in self.meta["stages"] and (self.path / f"{stage}.json").exists()
+
+    def load(self, stage: str) -> Optional[str]:
+        """저장된 단계 출력 (없으면 None)"""
+        data = self.data(stage)
+        return data.get("output") if data else None
+
+    def data(self, stage: str) -> Optional[Dict[str, Any]]:
+        """저장된 단계 기록 전체 (save의 extra 값 포함)"""
+        return self._read(self.path / f"{stage}.json")
+
+    def save(self, stage: str, output: str, **extra):
+        """단계 출력 저장 - 실패해도 실행은 계속한다"""
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            payload = {"stage": stage, "saved_at": datetime.now().isoformat(timespec="seconds"),
+                       "output": str(output)}
+            payload.update(extra)
+            _write_json(self.path / f"{stage}.json", payload)
+            if stage not in self.meta["stages"]:
+                self.meta["stages"].append(stage)
+            self._save_meta()
+            logger.info("💾 체크포인트 저장: %s/%s", self.run_id, stage)
+        except OSError as e:
+            logger.warning("체크포인트 저장 실패 (%s): %s", stage, e)
+
+    def mark_complete(self, report_file: str = None):
+        """최종 보고서 기록"""
+        self.meta["report_file"] = report_file
+        self.meta["completed_at"] = datetime.now().isoformat(timespec="seconds")
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._save_meta()
+        except OSError as e:
+            logger.warning("체크포인트 메타 저장 실패: %s", e)
+
+    def _save_meta(self):
+        self.meta["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        _write_json(self.path / "meta.json", self.meta)
@@ -0,0 +1,278 @@
+"""
+리서치 크루 실행 프로파일
+
+한 번의 research() 실행 동안 다음을 기록해 보고서 옆에 JSON으로 저장한다.
+- 에이전트/태스크별 소요 시간 (planner, researcher, writer)
+- 검색 쿼리별, 페이지 가져오기별, 추출 방법별 소요 시간과 성공 여부
+- LLM 입력/출력 토큰 (전체 및 에이전트별)
+
+research()에서 RunProfiler(...).start() / finish(report_file)로 실행 구간을 감싸고,
+검색 도구 같은 모듈 함수에서는 profile_span()을 사용한다. 실행 중인 프로파일이 없으면 아무것도 기록하지 않는다.
+활성 프로파일은 컨텍스트(스레드)별로 관리되므로 여러 research()를 동시에 실행해도 섞이지 않는다.
+"""
+import json
+import time
+import logging
+import threading
+import contextvars
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from logging_setup import get_correlation_id
+from metrics import flush_crewai_events
+
+logger = logging.getLogger(__name__)
+
+# 현재 컨텍스트의 프로파일 (profile_span 기록 대상)
+_current: contextvars.ContextVar[Optional["RunProfiler"]] = contextvars.ContextVar("run_profiler", default=None)
+# 실행 중인 전체 프로파일과 태스크 id → 프로파일 (LLM 이벤트 귀속용)
+_running: List["RunProfiler"] = []
+_task_profilers: Dict[str, "RunProfiler"] = {}
+_active_lock = threading.Lock()
+
+
+class RunProfiler:
+    """리서치 실행 한 번의 측정값 수집기"""
+
+    def __init__(self, crew_name: str, topic: str, **settings):
+        self.crew_name = crew_name
+        self.topic = topic
+        self.settings = settings
+        self.correlation_id = get_correlation_id()
+        self.started_at = datetime.now()
+        self.events: List[Dict[str, Any]] = []
+        self.tasks: List[Dict[str, Any]] = []
+        self.token_usage: Dict[str, int] = {}
+        self.agent_tokens: Dict[str, Dict[str, int]] = defaultdict(lambda: {"prompt": 0, "completion": 0, "calls": 0})
+        self.wall_time = 0.0
+        self._start = time.perf_counter()
+        self._kickoff_start = self._start
+        self._last_task_end = None
+        self._token = None
+        self._task_ids: List[str] = []
+        self._lock = threading.Lock()
+
+    # ----- 실행 구간 -----
+    def start(self):
+        """이 프로파일을 활성화 - 이후 같은 컨텍스트의 profile_span() 호출이 여기에 기록된다"""
+        _install_llm_hooks()
+        self._token = _current.set(self)
+        with _active_lock:
+            _running.append(self)
+        return self
+
+    def finish(self, report_file: str = None) -> Optional[str]:
+        """비활성화하고 요약 로그 출력 후 보고서 옆에 프로파일 저장"""
+        flush_crewai_events(timeout=2.0)
+        self.wall_time = time.perf_counter() - self._start
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+        with _active_lock:
+            if self in _running:
+                _running.remove(self)
+            for task_id in self._task_ids:
+                _task_profilers.pop(task_id, None)
+        self.log_summary()
+        return self.save(report_file)
+
+    # ----- 범용 span -----
+    @contextmanager
+    def span(self, category: str, name: str, **attrs):
+        """블록 소요 시간 기록 - yield한 dict에 결과 속성(ok, chars 등)을 추가할 수 있다"""
+        start = time.perf_counter()
+        try:
+            yield attrs
+        except Exception as e:
+            attrs.setdefault("ok", False)
+            attrs["error"] = type(e).__name__
+            raise
+        finally:
+            self.add(category, name, time.perf_counter() - start, offset=start - self._start, **attrs)
+
+    def add(self, category: str, name: str, seconds: float, offset: float = None, **attrs):
+        event = {"category": category, "name": name, "seconds": round(seconds, 4),
+                 "offset": round(offset if offset is not None else time.perf_counter() - self._start - seconds, 4)}
+        event.update(attrs)
+        with self._lock:
+            self.events.append(event)
+
+    # ----- 태스크 -----
+    def attach_tasks(self, tasks):
+        """순차 실행 태스크에 완료 콜백을 연결해 태스크/에이전트별 소요 시간 기록
+
+        sequential 프로세스에서는 직전 태스크 완료 시점부터 다음 태스크가 시작된다.
+        """
+        for task in tasks:
+            task.callback = self._chain_callback(task.callback)
+            task_id = str(getattr(task, "id", "") or "")
+            if task_id:
+                self._task_ids.append(task_id)
+                with _active_lock:
+                    _task_profilers[task_id] = self
+
+    def _chain_callback(self, original):
+        def callback(output):
+            self._record_task(output)
+            if original is not None:
+                return original(output)
+        return callback
+
+    def _record_task(self, output):
+        now = time.perf_counter()
+        start = self._last_task_end if self._last_task_end is not None else self._kickoff_start
+        self._last_task_end = now
+        agent = str(getattr(output, "agent", "") or "")
+        name = getattr(output, "name", None) or getattr(output, "description", "") or ""
+        name = " ".join(str(name).split())[:80]
+        raw = str(getattr(output, "raw", "") or "")
+        with self._lock:
+            self.tasks.append({
+                "agent": agent,
+                "task": name,
+                "seconds": round(now - start, 4),
+                "offset": round(start - self._start, 4),
+                "output_chars": len(raw),
+            })
+
+    @contextmanager
+    def kickoff(self):
+        """crew.kickoff() 구간 - 태스크 시작 시각 기준점"""
+        self._kickoff_start = time.perf_counter()
+        self._last_task_end = None
+        with self.span("crew", "kickoff"):
+            yield
+
+    # ----- 토큰 -----
+    def record_crew_usage(self, result):
+        """Crew 결과의 전체 토큰 사용량"""
+        usage = getattr(result, "token_usage", None)
+        if usage is None:
+            return
+        for field in ("prompt_tokens", "completion_tokens", "cached_prompt_tokens",
+                      "total_tokens", "successful_requests"):
+            value = getattr(usage, field, None)
+            if value is not None:
+                self.token_usage[field] = value
+
+    def record_llm_call(self, agent: str, usage: dict):
+        with self._lock:
+            stats = self.agent_tokens[agent or "unknown"]
+            stats["prompt"] += usage.get("prompt_tokens", 0) or 0
+            stats["completion"] += usage.get("completion_tokens", 0) or 0
+            stats["calls"] += 1
+
+    # ----- 요약/저장 -----
+    def summary(self) -> Dict[str, Any]:
+        """카테고리/이름별 집계"""
+        by_category: Dict[str, Dict[str, Any]] = {}
+        by_method: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            events = list(self.events)
+        for event in events:
+            stats = by_category.setdefault(event["category"], {"count": 0, "seconds": 0.0, "failures": 0})
+            stats["count"] += 1
+            stats["seconds"] += event["seconds"]
+            if event.get("ok") is False:
+                stats["failures"] += 1
+            if event["category"] == "extract":
+                method = by_method.setdefault(event["name"], {"count": 0, "seconds": 0.0, "success": 0})
+                method["count"] += 1
+                method["seconds"] += event["seconds"]
+                method["success"] += 1 if event.get("ok") else 0
+        for stats in list(by_category.values()) + list(by_method.values()):
+            stats["seconds"] = round(stats["seconds"], 4)
+
+        slowest = sorted((e for e in events if e["category"] in ("search", "fetch")),
+                         key=lambda e: e["seconds"], reverse=True)[:10]
+        return {
+            "by_category": by_category,
+            "extraction_methods": by_method,
+            "slowest": slowest,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "crew": self.crew_name,
+            "topic": self.topic,
+            "settings": self.settings,
+            "correlation_id": self.correlation_id,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_time": round(self.wall_time or time.perf_counter() - self._start, 4),
+            "tasks": self.tasks,
+            "token_usage": self.token_usage,
+            "agent_tokens": dict(self.agent_tokens),
+            "summary": self.summary(),
+            "events": self.events,
+        }
+
+    def save(self, report_file: str = None) -> Optional[str]:
+        """보고서 옆에 <보고서 이름>.profile.json 저장 (보고서가 없으면 타임스탬프 이름 사용)"""
+        if report_file:
+            path = Path(report_file).with_suffix(".profile.json")
+        else:
+            path = Path(f"research_profile_{self.started_at.strftime('%Y%m%d_%H%M%S')}.profile.json")
+        try:
+            path.write_text(json.dumps(self.to_dict(), ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+            logger.info("📈 실행 프로파일 저장: %s", path)
+            return str(path)
+        except OSError as e:
+            logger.warning("실행 프로파일 저장 실패: %s", e)
+            return None
+
+    def log_summary(self):
+        """소요 시간 요약 로그"""
+        logger.info("📈 총 소요 시간: %.1f초", self.wall_time)
+        for task in self.tasks:
+            logger.info("   %s: %.1f초", task["agent"] or task["task"], task["seconds"])
+        for category, stats in self.summary()["by_category"].items():
+            logger.info("   [%s] %s회, %.1f초 (실패 %s)", category, stats["count"], stats["seconds"], stats["failures"])
+        if self.token_usage:
+            logger.info("   토큰: 입력 %s / 출력 %s",
+                        self.token_usage.get("prompt_tokens", 0), self.token_usage.get("completion_tokens", 0))
+
+
+@contextmanager
+def profile_span(category: str, name: str, **attrs):
+    """실행 중인 프로파일에 span 기록 (없으면 속성 dict만 돌려줌)"""
+    profiler = _current.get()
+    if profiler is None:
+        yield attrs
+        return
+    with profiler.span(category, name, **attrs) as span_attrs:
+        yield span_attrs
+
+
+_hooks_installed = False
+
+
+def _install_llm_hooks():
+    """CrewAI 이벤트 버스에서 에이전트별 LLM 토큰 사용량 수집 (한 번만 등록)"""
+    global _hooks_installed
+    with _active_lock:
+        if _hooks_installed:
+            return
+        _hooks_installed = True
+
+    try:
+        from crewai.events import crewai_event_bus
+        from crewai.events.types.llm_events import LLMCallCompletedEvent
+    except ImportError:
+        logger.info("CrewAI 이벤트 API 없음 - 에이전트별 토큰 집계 생략")
+        return
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def _on_llm_completed(source, event):
+        # 이벤트 핸들러는 별도 스레드에서 실행되므로 태스크 id로 프로파일을 찾는다
+        with _active_lock:
+            profiler = _task_profilers.get(str(getattr(event, "task_id", "") or ""))
+            if profiler is None and len(_running) == 1:
+                profiler = _running[0]
+        usage = getattr(event, "usage", None)
+        if profiler is None or not usage:
+            return
+        agent = getattr(event, "agent_role", None) or getattr(getattr(event, "from_agent", None), "role", None)
+        profiler.record_llm_call(agent, usage)
@@ -0,0 +1,287 @@
+"""
+검색 백엔드 계층 (공급자 교체/헤지 요청/장애 조치/로컬 오프라인 인덱스)
+
+- SearchProvider: search(query, max_results) → [{title, href, body}] 인터페이스
+- DDGSProvider: DuckDuckGo (스레드별 클라이언트 재사용)
+- LocalIndexProvider: 이전에 가져온 문서의 SQLite FTS5 인덱스 (완전 오프라인 실행, 재현 가능한 벤치마크)
+- SearchRouter: 공급자 순서대로 시도하되
+  - 공급자별 제한 시간(timeout)을 넘기면 다음 공급자로 장애 조치
+  - 첫 공급자가 hedge_delay 안에 끝나지 않으면 다음 공급자를 동시에 시작하고 먼저 성공한 결과 사용
+  - 온라인 공급자의 결과는 로컬 인덱스에 쌓아 둔다
+
+SEARCH_PROVIDERS (기본값 "ddgs,local")로 순서를 정하며, "local"만 지정하면 네트워크 없이 검색한다.
+"""
+import os
+import re
+import time
+import sqlite3
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PROVIDERS = os.getenv("SEARCH_PROVIDERS", "ddgs,local")
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", "15"))
+SEARCH_HEDGE_DELAY = float(os.getenv("SEARCH_HEDGE_DELAY", "3.0"))
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", "search_index.db")
+LOCAL_SEARCH_TIMEOUT = 2.0
+# 추출 본문(page)이 있는 문서의 BM25 가중치 - 네트워크 없이 바로 쓸 수 있으므로 조금 앞으로
+PAGE_RANK_BOOST = 1.5
+# 스레드 풀 대기열에 있는 호출이 시작됐는지 확인하는 간격 (초)
+QUEUED_POLL_INTERVAL = 0.05
+
+_FTS_TERM = re.compile(r'\w+', re.UNICODE)
+
+# 헤지/제한 시간 처리를 위한 공용 스레드 풀 (제한 시간을 넘긴 호출은 백그라운드에서 끝까지 실행됨)
+# 제한 시간은 호출이 실제로 시작된 뒤부터 재므로, 풀이 가득 차 대기한 시간은 포함하지 않는다
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="search-provider")
+
+
+class SearchError(Exception):
+    """모든 공급자가 실패한 경우"""
+
+
+class SearchProvider:
+    """검색 공급자 기본 클래스"""
+    name = "base"
+
+    def __init__(self, timeout: float = SEARCH_TIMEOUT):
+        self.timeout = timeout
+
+    def search(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+class DDGSProvider(SearchProvider):
+    """DuckDuckGo text 검색 - 스레드마다 클라이언트 하나를 만들어 재사용 (HTTP 연결 재사용)
+
+    client_factory: 클라이언트 생성 함수 (기본값 ddgs.DDGS)
+    """
+    name = "ddgs"
+
+    def __init__(self, client_factory: Callable[[], Any] = None, timeout: float = SEARCH_TIMEOUT,
+                 region: str = 'wt-wt', safesearch: str = 'moderate'):
+        super().__init__(timeout)
+        self.client_factory = client_factory or _default_ddgs
+        self.region = region
+        self.safesearch = safesearch
+        self._local = threading.local()
+
+    def _client(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.client_factory()
+        return client
+
+    def search(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+        return self._client().text(query=query, region=self.region, safesearch=self.safesearch,
+                                   max_results=max_results) or []
+
+
+def _default_ddgs():
+    try:
+        from ddgs import DDGS
+    except ImportError:
+        from duckduckgo_search import DDGS
+    return DDGS()
+
+
+class LocalIndexProvider(SearchProvider):
+    """이전에 수집한 문서의 SQLite FTS5 전문 검색 인덱스
+
+    문서는 URL 기준 하나만 저장하며, 더 긴 본문(검색 요약 < 추출 본문)이 들어오면 교체한다.
+    추출 본문이 있는 문서는 결과에 content로 함께 돌려줘 페이지를 다시 가져오지 않아도 된다.
+    데이터베이스는 처음 검색/저장할 때 연다.
+    """
+    name = "local"
+
+    def __init__(self, path: str = None, timeout: float = LOCAL_SEARCH_TIMEOUT):
+        super().__init__(timeout)
+        self.path = path or SEARCH_INDEX_PATH
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._unavailable = False
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """열린 연결 (처음 호출할 때 열고 테이블 생성, 쓸 수 없으면 None) - self._lock 안에서 호출"""
+        if self._conn is None and not self._unavailable:
+            try:
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+                with conn:
+                    conn.execute(
+                        "CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5("
+                        "url UNINDEXED, title, body, kind UNINDEXED, added_at UNINDEXED, tokenize='unicode61')"
+                    )
+            except sqlite3.Error as e:
+                self._unavailable = True
+                logger.warning("로컬 검색 인덱스 사용 불가 (SQLite FTS5 필요): %s", e)
+                return None
+            self._conn = conn
+        return self._conn
+
+    def add(self, url: str, title: str, body: str, kind: str = "snippet"):
+        """문서 추가 (같은 URL의 기존 문서가 더 길면 유지) - 실패해도 검색 흐름은 계속한다"""
+        if not url or not body:
+            return
+        try:
+            with self._lock:
+                conn = self._connection()
+                if conn is None:
+                    return
+                with conn:
+                    row = conn.execute("SELECT rowid, length(body) FROM documents WHERE url = ?",
+                                       (url,)).fetchone()
+                    if row and row[1] >= len(body):
+                        return
+                    if row:
+                        conn.execute("DELETE FROM documents WHERE rowid = ?", (row[0],))
+                    conn.execute(
+                        "INSERT INTO documents (url, title, body, kind, added_at) VALUES (?, ?, ?, ?, ?)",
+                        (url, title or "", body, kind, datetime.now().isoformat(timespec="seconds")))
+        except sqlite3.Error as e:
+            logger.warning("로컬 검색 인덱스 저장 실패 (%s): %s", url, e)
+
+    def add_hits(self, hits: Sequence[Dict[str, Any]]):
+        for hit in hits:
+            self.add(hit.get('href', ''), hit.get('title', ''), hit.get('body', ''), kind="snippet")
+
+    def search(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+        words = _FTS_TERM.findall(query)
+        if not words:
+            return []
+        # 검색어 용어를 OR로 묶고 BM25 순으로 정렬 (FTS5 문법 문자는 따옴표로 무력화)
+        # bm25()는 관련성이 높을수록 작은 음수 - 본문이 저장된 문서는 PAGE_RANK_BOOST배로 앞당긴다
+        match = " OR ".join('"' + word.replace('"', '') + '"' for word in words)
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return []
+            rows = conn.execute(
+                "SELECT url, title, snippet(documents, 2, '', '', ' … ', 40), kind, body "
+                "FROM documents WHERE documents MATCH ? "
+                "ORDER BY bm25(documents) * (CASE WHEN kind = 'page' THEN ? ELSE 1.0 END) LIMIT ?",
+                (match, PAGE_RANK_BOOST, max_results),
+            ).fetchall()
+        results = []
+        for url, title, snippet, kind, body in rows:
+            hit = {'title': title, 'href': url, 'body': snippet, 'source': 'local'}
+            if kind == "page":
+                hit['content'] = body
+            results.append(hit)
+        return results
+
+
+class SearchRouter:
+    """여러 공급자에 걸친 검색 (헤지 요청 + 장애 조치)"""
+
+    def __init__(self, providers: Sequence[SearchProvider], hedge_delay: float = SEARCH_HEDGE_DELAY,
+                 index: Optional[LocalIndexProvider] = None):
+        self.providers = list(providers)
+        self.hedge_delay = hedge_delay
+        self.index = index
+
+    def search(self, query: str, max_results: int = 5) -> Tuple[List[Dict[str, Any]], str]:
+        """(결과, 결과를 준 공급자 이름) - 모두 실패하면 SearchError
+
+        빈 결과도 실패로 보고 다음 공급자를 시도한다 (모두 비었으면 빈 목록).
+        """
+        errors = []
+        # 진행 중인 호출 → (공급자, [시작 시각]) - 스레드 풀 대기열에 있는 동안은 시작 시각이 비어 있음
+        pending: Dict[Any, Tuple[SearchProvider, List[float]]] = {}
+        remaining = list(self.providers)
+        got_empty = None
+
+        def launch() -> float:
+            provider = remaining.pop(0)
+            started: List[float] = []
+
+            def run():
+                started.append(time.monotonic())
+                return provider.search(query, max_results)
+
+            future = _executor.submit(contextvars.copy_context().run, run)
+            pending[future] = (provider, started)
+            return time.monotonic()
+
+        hedge_at = launch() + self.hedge_delay
+        while pending:
+            # 다음 헤지 시점 또는 가장 가까운 제한 시간까지 대기 (아직 시작 안 된 호출이 있으면 짧게 확인)
+            now = time.monotonic()
+            deadlines = [started[0] + provider.timeout for provider, started in pending.values() if started]
+            wait_for = min(deadlines) - now if deadlines else QUEUED_POLL_INTERVAL
+            if len(deadlines) < len(pending):
+                wait_for = min(wait_for, QUEUED_POLL_INTERVAL)
+            if remaining:
+                wait_for = min(wait_for, hedge_at - now)
+            done, _ = wait(list(pending), timeout=max(0.0, wait_for), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                provider, _ = pending.pop(future)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    errors.append(f"{provider.name}: {e}")
+                    logger.warning("⚠️ 검색 공급자 실패 (%s): %s", provider.name, e)
+                    continue
+                if results:
+                    self._record(provider, results)
+                    return results, provider.name
+                got_empty = provider.name
+
+            now = time.monotonic()
+            for future, (provider, started) in list(pending.items()):
+                if started and now >= started[0] + provider.timeout:
+                    pending.pop(future)
+                    errors.append(f"{provider.name}: {provider.timeout:.1f}초 제한 시간 초과")
+                    logger.warning("⏱️ 검색 공급자 제한 시간 초과 (%s, %.1f초)", provider.name, provider.timeout)
+
+            # 실패/빈 결과로 진행 중인 요청이 없거나, 헤지 지연을 넘겼으면 다음 공급자 시작
+            if remaining and (not pending or now >= hedge_at):
+                if pending:
+                    logger.info("🪂 헤지 요청: '%s' - %s 응답 지연, %s 동시 시작",
+                                query, ", ".join(p.name for p, _ in pending.values()), remaining[0].name)
+                hedge_at = launch() + self.hedge_delay
+
+        if got_empty is not None:
+            return [], got_empty
+        raise SearchError("; ".join(errors) or "검색 공급자가 없습니다")
+
+    def _record(self, provider: SearchProvider, results: List[Dict[str, Any]]):
+        """온라인 공급자 결과를 로컬 인덱스에 저장 (오프라인 재실행용)"""
+        if self.index is not None and provider is not self.index:
+            self.index.add_hits(results)
+
+
+_local_index: Optional[LocalIndexProvider] = None
+_local_index_lock = threading.Lock()
+
+
+def get_local_index() -> Optional[LocalIndexProvider]:
+    """SEARCH_PROVIDERS에 local이 있으면 공용 로컬 인덱스 (데이터베이스는 처음 검색할 때 연다)"""
+    global _local_index
+    if "local" not in [name.strip() for name in SEARCH_PROVIDERS.split(",")]:
+        return None
+    with _local_index_lock:
+        if _local_index is None:
+            _local_index = LocalIndexProvider()
+        return _local_index
+
+
+def build_search_router(ddgs_factory: Callable[[], Any] = None, providers: str = None) -> SearchRouter:
+    """공급자 이름 목록(쉼표 구분, 기본값 SEARCH_PROVIDERS)으로 라우터 생성"""
+    index = get_local_index()
+    chain: List[SearchProvider] = []
+    for name in (providers or SEARCH_PROVIDERS).split(","):
+        name = name.strip().lower()
+        if name == "ddgs":
+            chain.append(DDGSProvider(ddgs_factory))
+        elif name == "local":
+            if index is not None:
+                chain.append(index)
+        elif name:
+            logger.warning("알 수 없는 검색 공급자 무시: %s", name)
+    return SearchRouter(chain, index=index)
@@ -1,5 +1,7 @@
 import os
+import sys
 import logging
+from pathlib import Path
 from datetime import datetime
 import litellm
 from crewai import Agent, Task, Crew, Process
@@ -11,18 +13,26 @@ import requests
 from urllib.parse import urljoin, urlparse
 import time
 import random
+import contextvars
 
 from ddgs import DDGS
 
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(f'research_crew_{datetime.now().strftime("%Y%m%d")}.log'),
-        logging.StreamHandler()
-    ]
-)
+# 저장소 루트의 공용 모듈 사용
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from logging_setup import setup_queue_logging, log_context
+from research_profile import RunProfiler, profile_span
+from text_quality import analyze_text, is_good_text
+from report_stream import StreamingReportWriter, REPORT_STREAM
+from evidence_compress import (CompressionStats, budget_for_context, compress_sections, compress_text,
+                               estimate_tokens, truncate_sections)
+from page_cache import page_cache
+from domain_stats import domain_of, get_domain_stats
+from search_ranking import rank_hits
+from http_fetch import fetch_page
+from search_providers import SearchError, build_search_router
+
+# 로깅 설정 (큐 기반, LOG_JSON/LOG_ROTATION 환경 변수 지원)
+setup_queue_logging("research_crew", log_dir=".", fmt='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # 환경 설정
@@ -40,13 +50,18 @@ class ResearchConfig:
                  max_pages_per_query: int = 3,
                  word_count_range: tuple = (700, 900),
                  language: str = "한국어",
-                 report_type: str = "블로그"):
+                 report_type: str = "블로그",
+                 evidence_tokens_per_query: int = None,
+                 writer_prompt_max_tokens: int = None):
         self.topic = topic
         self.search_queries_count = search_queries_count
         self.max_pages_per_query = max_pages_per_query
         self.word_count_range = word_count_range
         self.language = language
         self.report_type = report_type
+        # 근거 압축 예산 (None이면 환경 변수 기본값)
+        self.evidence_tokens_per_query = evidence_tokens_per_query or EVIDENCE_TOKENS_PER_QUERY
+        self.writer_prompt_max_tokens = writer_prompt_max_tokens or WRITER_PROMPT_MAX_TOKENS
         
         # 파일명용 안전한 토픽명 생성
         self.safe_topic = re.sub(r'[^\w\s-]', '', topic.replace(' ', '_'))[:50]
@@ -117,10 +132,10 @@ def setup_llm_config():
     litellm.drop_params = True
     
     # 정보 출력
-    logger.info(f"🤖 프로바이더: {provider}")
-    logger.info(f"🤖 모델: {full_model_name}")
-    logger.info(f"🔗 API Base: {api_base or '기본값 사용'}")
-    logger.info(f"🔑 API 키: {'설정됨' if api_key else '없음'}")
+    logger.info("🤖 프로바이더: %s", provider)
+    logger.info("🤖 모델: %s", full_model_name)
+    logger.info("🔗 API Base: %s", api_base or '기본값 사용')
+    logger.info("🔑 API 키: %s", '설정됨' if api_key else '없음')
     
     return {
         "provider": provider,
@@ -132,6 +147,18 @@ def setup_llm_config():
 # 환경 변수 (기존 유지)
 TIMEOUT = int(os.getenv("TIMEOUT", "30"))
 MAX_EXECUTION_TIME = int(os.getenv("MAX_EXECUTION_TIME", "900"))
+# 근거 압축: 검색 쿼리 하나의 추출 본문 토큰 예산, 작성 프롬프트 최대 토큰 (추정치 기준)
+EVIDENCE_TOKENS_PER_QUERY = int(os.getenv("EVIDENCE_TOKENS_PER_QUERY", "1500"))
+WRITER_PROMPT_MAX_TOKENS = int(os.getenv("WRITER_PROMPT_MAX_TOKENS", "6000"))
+# 작성 프롬프트에서 에이전트 역할/시스템 템플릿 몫으로 남겨 둘 토큰
+WRITER_PROMPT_RESERVE = 600
+# 쿼리당 추출 본문이 근거 예산의 이 배수에 이르면 페이지 가져오기 중단 (압축 단계가 고를 여유분)
+EVIDENCE_FETCH_FACTOR = float(os.getenv("EVIDENCE_FETCH_FACTOR", "2.0"))
+# 추출 프로파일에 본문 품질 지표(단어 수, 상용구/한글/라틴 비율)까지 기록 - 디버그 로그에서도 기록
+PROFILE_TEXT_QUALITY = os.getenv("PROFILE_TEXT_QUALITY", "0").lower() in ("1", "true", "yes")
+
+# 현재 research() 실행의 근거 수집/압축 설정(주제, 토큰 예산, 쿼리당 최대 페이지)과 누적 통계 (검색 도구에서 사용)
+_evidence_run: contextvars.ContextVar[dict] = contextvars.ContextVar("evidence_run", default=None)
 
 # 개선된 User-Agent 목록
 USER_AGENTS = [
@@ -156,83 +183,65 @@ def get_random_headers():
         'Upgrade-Insecure-Requests': '1'
     }
 
-def is_good_text(text):
-    """텍스트 품질 검증"""
-    if not text or len(text.strip()) < 50:
-        return False
-    
-    # JavaScript 코드나 에러 감지
-    js_indicators = [
-        'function(', '.push([', 'self.__next_f', 'window.', 
-        'document.', 'var ', 'const ', 'let ', 'getElementById',
-        'addEventListener', 'querySelector', '$(', 'jQuery'
-    ]
-    
-    if any(indicator in text for indicator in js_indicators):
-        return False
-    
-    # 에러 메시지 감지
-    error_indicators = [
-        'Page not found', '404', '403', 'Access denied',
-        'Forbidden', 'Error', 'exception', 'stacktrace'
-    ]
-    
-    lower_text = text.lower()
-    if any(error in lower_text for error in error_indicators):
-        return False
-    
-    # 의미있는 단어 비율 확인
-    words = text.split()
-    if len(words) < 15:
-        return False
-        
-    return True
-
 def extract_with_requests_only(url):
-    """requests + trafilatura만으로 텍스트 추출"""
+    """requests + trafilatura만으로 텍스트 추출
+    
+    페이지 캐시에 추출 본문이 있으면 조건부 요청을 보내고, 304이면 저장된 본문을 그대로 쓴다.
+    """
     try:
-        logger.info(f"📄 requests + trafilatura로 추출 시도: {url}")
+        logger.info("📄 requests + trafilatura로 추출 시도: %s", url)
         
+        cached = page_cache.lookup(url)
+        validators = cached.conditional_headers() if cached else {}
         headers = get_random_headers()
+        headers.update(validators)
         
-        # 여러 번 시도
+        # 여러 번 시도 (스트리밍 다운로드: HTML이 아니면 본문 전에 거절, 최대 크기에서 중단)
         for attempt in range(2):
             try:
-                response = requests.get(
-                    url, 
-                    headers=headers, 
-                    timeout=15,
-                    allow_redirects=True,
-                    verify=False
-                )
+                response = fetch_page(url, headers=headers, timeout=15)
                 
-                if response.status_code == 200:
+                if response.status_code == 304 and validators:
+                    page_cache.mark_revalidated(cached, response.headers)
+                    logger.info("♻️ 변경 없음 (304) - 캐시된 본문 사용 (%s, %s자): %s",
+                                cached.method, len(cached.text), url)
+                    return cached.text
+                elif response.status_code == 200:
                     break
                 elif response.status_code == 403:
-                    logger.warning(f"⚠️ 403 에러, 다른 헤더로 재시도: {url}")
+                    logger.warning("⚠️ 403 에러, 다른 헤더로 재시도: %s", url)
                     headers = get_random_headers()
+                    headers.update(validators)
                     time.sleep(1)
                     continue
                 else:
-                    logger.warning(f"⚠️ HTTP {response.status_code}: {url}")
+                    logger.warning("⚠️ HTTP %s: %s", response.status_code, url)
                     return None
                     
             except requests.RequestException as e:
-                logger.warning(f"⚠️ 요청 실패 (시도 {attempt + 1}): {str(e)}")
+                logger.warning("⚠️ 요청 실패 (시도 %s): %s", attempt + 1, str(e))
                 if attempt == 0:
                     time.sleep(2)
                     continue
                 return None
         
-        if response.status_code != 200:
+        if not response.ok:
             return None
+        
+        # 내용이 같은 HTML은 이미 추출한 본문 재사용 (검증자를 주지 않는 서버 대비)
+        html = response.text
+        reused = page_cache.extracted_for_html(html)
+        if reused:
+            page_cache.store(url, html, response.headers, reused["method"], reused["text"])
+            logger.info("♻️ 내용 동일 - 캐시된 본문 사용 (%s, %s자): %s", reused["method"], len(reused["text"]), url)
+            return reused["text"]
             
         # trafilatura로 텍스트 추출
         try:
             import trafilatura
             
             extracted_text = trafilatura.extract(
-                response.text,
+                html,
                 include_comments=False,
                 include_tables=True,
                 include_images=False,
@@ -244,19 +253,20 @@ def extract_with_requests_only(url):
                 if len(clean_text) > 3000:
                     clean_text = clean_text[:3000] + "..."
                 
-                logger.info(f"✅ requests+trafilatura 성공: {len(clean_text)}자")
+                page_cache.store(url, html, response.headers, "requests", clean_text)
+                logger.info("✅ requests+trafilatura 성공: %s자", len(clean_text))
                 return clean_text
                 
         except ImportError:
             logger.error("❌ trafilatura가 설치되지 않았습니다")
             return None
         except Exception as e:
-            logger.warning(f"⚠️ trafilatura 추출 실패: {str(e)}")
+            logger.warning("⚠️ trafilatura 추출 실패: %s", str(e))
             
         return None
         
     except Exception as e:
-        logger.warning(f"⚠️ requests 추출 실패: {str(e)}")
+        logger.warning("⚠️ requests 추출 실패: %s", str(e))
         return None
 
 def extract_with_playwright_improved(url):
@@ -264,7 +274,7 @@ def extract_with_playwright_improved(url):
     try:
         from playwright.sync_api import sync_playwright
         
-        logger.info(f"🎭 Playwright 백업 시도: {url}")
+        logger.info("🎭 Playwright 백업 시도: %s", url)
         
         with sync_playwright() as p:
             browser = p.chromium.launch(
@@ -287,11 +297,12 @@ def extract_with_playwright_improved(url):
             page = context.new_page()
             
             try:
-                page.goto(url, wait_until='domcontentloaded', timeout=15000)
+                page_response = page.goto(url, wait_until='domcontentloaded', timeout=15000)
                 time.sleep(1)
                 content = page.content()
+                response_headers = page_response.headers if page_response else {}
             except Exception as e:
-                logger.warning(f"⚠️ Playwright 페이지 로드 실패: {str(e)}")
+                logger.warning("⚠️ Playwright 페이지 로드 실패: %s", str(e))
                 return None
             finally:
                 browser.close()
@@ -312,11 +323,12 @@ def extract_with_playwright_improved(url):
                     if len(clean_text) > 3000:
                         clean_text = clean_text[:3000] + "..."
                     
-                    logger.info(f"✅ Playwright 성공: {len(clean_text)}자")
+                    page_cache.store(url, content, response_headers, "playwright", clean_text)
+                    logger.info("✅ Playwright 성공: %s자", len(clean_text))
                     return clean_text
                     
             except Exception as e:
-                logger.warning(f"⚠️ Playwright trafilatura 실패: {str(e)}")
+                logger.warning("⚠️ Playwright trafilatura 실패: %s", str(e))
                 
         return None
         
@@ -324,18 +336,18 @@ def extract_with_playwright_improved(url):
         logger.warning("⚠️ Playwright가 설치되지 않았습니다")
         return None
     except Exception as e:
-        logger.warning(f"⚠️ Playwright 추출 실패: {str(e)}")
+        logger.warning("⚠️ Playwright 추출 실패: %s", str(e))
         return None
 
 def fallback_simple_extraction(url):
     """최후의 수단: 간단한 HTML 파싱"""
     try:
-        logger.info(f"🔧 간단한 HTML 파싱 시도: {url}")
+        logger.info("🔧 간단한 HTML 파싱 시도: %s", url)
         
         headers = get_random_headers()
-        response = requests.get(url, headers=headers, timeout=10, verify=False)
+        response = fetch_page(url, headers=headers, timeout=10)
         
-        if response.status_code != 200:
+        if not response.ok:
             return None
             
         # 간단한 HTML 태그 제거
@@ -354,39 +366,62 @@ def fallback_simple_extraction(url):
         if is_good_text(text):
             if len(text) > 2000:
                 text = text[:2000] + "..."
-            logger.info(f"✅ 간단한 파싱 성공: {len(text)}자")
+            page_cache.store(url, response.text, response.headers, "simple_html", text)
+            logger.info("✅ 간단한 파싱 성공: %s자", len(text))
             return text
             
     except ImportError:
         logger.warning("⚠️ BeautifulSoup이 설치되지 않았습니다")
     except Exception as e:
-        logger.warning(f"⚠️ 간단한 파싱 실패: {str(e)}")
+        logger.warning("⚠️ 간단한 파싱 실패: %s", str(e))
         
     return None
 
+# 추출 방법 (기본 시도 순서) - 도메인별 통계에 따라 순서를 바꾸거나 건너뜀
+EXTRACTORS = {
+    "requests": extract_with_requests_only,
+    "playwright": extract_with_playwright_improved,
+    "simple_html": fallback_simple_extraction,
+}
+
+def _profiled_extract(method, extractor, url):
+    """추출 방법별 소요 시간/성공 여부를 실행 프로파일에 기록
+    
+    품질 지표 전체 계산은 페이지마다 본문을 한 번 더 훑으므로 PROFILE_TEXT_QUALITY나 디버그 로그일 때만 한다.
+    """
+    with profile_span("extract", method, url=url) as span:
+        text = extractor(url)
+        span["ok"] = bool(text) and is_good_text(text)
+        span["chars"] = len(text) if text else 0
+        if text and (PROFILE_TEXT_QUALITY or logger.isEnabledFor(logging.DEBUG)):
+            quality = analyze_text(text)
+            span["words"] = quality.word_count
+            span["boilerplate_ratio"] = quality.boilerplate_ratio
+            span["hangul_ratio"] = quality.hangul_ratio
+            span["latin_ratio"] = quality.latin_ratio
+    return text
+
+# 검색 공급자 체인 (DDGS → 로컬 인덱스, SEARCH_PROVIDERS로 변경)
+_search_router = build_search_router(lambda: DDGS())
+
 # 웹 검색 도구 (기존과 동일)
 @tool("Web Search Tool")
 def web_search_tool(query: str) -> str:
     """개선된 통합 웹 검색 및 텍스트 추출 도구"""
     try:
-        logger.info(f"🔍 개선된 웹 검색 시작: '{query}'")
-        
-        # 1단계: 웹 검색
-        ddgs = DDGS()
+        logger.info("🔍 개선된 웹 검색 시작: '%s'", query)
         
+        # 1단계: 웹 검색 (공급자 헤지/장애 조치)
         try:
-            search_results = ddgs.text(
-                query=query, 
-                region='wt-wt', 
-                safesearch='moderate', 
-                max_results=8
-            )
-        except Exception as e:
-            logger.warning(f"⚠️ DuckDuckGo 검색 실패: {str(e)}")
+            with profile_span("search", query) as span:
+                search_results, span["provider"] = _search_router.search(query, max_results=8)
+                span["results"] = len(search_results)
+        except SearchError as e:
+            logger.warning("⚠️ 웹 검색 실패: %s", str(e))
             return f"'{query}' 검색에 실패했습니다: {str(e)}"
         
         if not search_results:
-            logger.warning(f"⚠️ '{query}' 검색 결과 없음")
+            logger.warning("⚠️ '%s' 검색 결과 없음", query)
             return f"'{query}'에 대한 검색 결과를 찾을 수 없습니다."
         
         # 중복 URL 제거 및 필터링
@@ -405,37 +440,68 @@ def web_search_tool(query: str) -> str:
             if url and url not in seen_urls:
                 domain_blocked = any(domain in url.lower() for domain in blocked_domains)
                 if not domain_blocked:
-                    unique_urls.append({'url': url, 'title': title})
+                    unique_urls.append({'url': url, 'title': title, 'body': result.get('body', ''),
+                                        'content': result.get('content')})
                     seen_urls.add(url)
                 else:
-                    logger.info(f"⚠️ 차단된 도메인 건너뜀: {url}")
+                    logger.info("⚠️ 차단된 도메인 건너뜀: %s", url)
         
         if not unique_urls:
             return f"'{query}'에 대한 접근 가능한 URL을 찾을 수 없습니다."
         
-        # 2단계: 페이지 크롤링 및 텍스트 추출
+        # 2단계: 제목/요약 기준 순위화 (BM25 + 최신성) 후 점수 순으로 근거 예산을 채울 때까지 가져오기
+        run = _evidence_run.get() or {}
+        max_pages = run.get('max_pages', 3)
+        fetch_budget = int(run.get('budget', EVIDENCE_TOKENS_PER_QUERY) * EVIDENCE_FETCH_FACTOR)
+        with profile_span("rank", query, candidates=len(unique_urls)) as span:
+            ranked = rank_hits(unique_urls, query, run.get('topic', ''))
+            # 로컬 인덱스에 본문이 저장된 결과는 가져올 필요가 없으므로 먼저 (순위 순서는 유지)
+            ranked.sort(key=lambda hit: not hit.get('content'))
+            span["scores"] = [hit['score'] for hit in ranked]
+        
         extracted_contents = []
-        max_pages = min(4, len(unique_urls))
+        collected_tokens = 0
+        domain_stats = get_domain_stats()
         
-        for i, item in enumerate(unique_urls[:max_pages]):
+        for i, item in enumerate(ranked):
+            if len(extracted_contents) >= max_pages or collected_tokens >= fetch_budget:
+                logger.info("📦 페이지 가져오기 종료: %s개 페이지, 약 %s토큰 (예산 %s, 최대 %s페이지)",
+                            len(extracted_contents), collected_tokens, fetch_budget, max_pages)
+                break
             url = item['url']
             title = item['title']
+            domain = domain_of(url)
             
-            logger.info(f"📄 페이지 처리 중 ({i+1}/{max_pages}): {url}")
-            
-            # 다단계 추출 시도
-            extracted_text = None
+            # 연속으로 실패한 도메인은 백오프 동안 건너뜀
+            blocked = domain_stats.blocked_for(domain)
+            if blocked:
+                logger.info("⛔ 네거티브 캐시 도메인 건너뜀 (%.0f분 남음): %s", blocked / 60, url)
+                continue
             
-            # 1차: requests + trafilatura
-            extracted_text = extract_with_requests_only(url)
+            logger.info("📄 페이지 처리 중 (%s/%s, 점수 %.2f): %s", i+1, len(ranked), item['score'], url)
             
-            # 2차: Playwright 백업
-            if not extracted_text:
-                extracted_text = extract_with_playwright_improved(url)
+            # 로컬 인덱스 결과에 저장된 본문이 있으면 가져오지 않고 그대로 사용 (오프라인 실행)
+            if item.get('content'):
+                extracted_contents.append({'title': title, 'url': url, 'content': item['content'], 'method': 'local'})
+                collected_tokens += estimate_tokens(item['content'])
+                logger.info("📚 로컬 인덱스 본문 사용: %s자", len(item['content']))
+                continue
             
-            # 3차: 간단한 HTML 파싱
-            if not extracted_text:
-                extracted_text = fallback_simple_extraction(url)
+            # 다단계 추출 시도 - 도메인별로 잘 되는 방법부터, 안 되는 방법은 건너뜀
+            # (페이지 캐시가 있으면 조건부 요청이 가능한 requests를 먼저)
+            methods = domain_stats.plan(domain, list(EXTRACTORS),
+                                        first="requests" if page_cache.lookup(url) else None)
+            with profile_span("fetch", url, query=query, methods=methods) as span:
+                extracted_text = None
+                for method in methods:
+                    started = time.perf_counter()
+                    extracted_text = _profiled_extract(method, EXTRACTORS[method], url)
+                    domain_stats.record(domain, method, bool(extracted_text), time.perf_counter() - started)
+                    if extracted_text:
+                        span["method"] = method
+                        break
+                domain_stats.record_page(domain, bool(extracted_text))
+                span["ok"] = bool(extracted_text)
             
             if extracted_text:
                 extracted_contents.append({
@@ -444,25 +510,47 @@ def web_search_tool(query: str) -> str:
                     'content': extracted_text,
                     'method': 'multi-stage'
                 })
-                logger.info(f"✅ 텍스트 추출 성공: {len(extracted_text)}자")
+                collected_tokens += estimate_tokens(extracted_text)
+                if _search_router.index is not None:
+                    _search_router.index.add(url, title, extracted_text, kind="page")
+                logger.info("✅ 텍스트 추출 성공: %s자", len(extracted_text))
             else:
-                logger.warning(f"⚠️ 모든 추출 방법 실패: {url}")
+                logger.warning("⚠️ 모든 추출 방법 실패: %s", url)
             
-            time.sleep(random.uniform(1, 2))
+            with profile_span("throttle", "page_delay"):
+                time.sleep(random.uniform(1, 2))
         
-        # 3단계: 결과 포맷팅
+        domain_stats.save()
+        
+        # 3단계: 근거 압축 (주제/검색어 관련 문장만 쿼리당 토큰 예산 안으로)
         if not extracted_contents:
             return f"'{query}' 검색 결과에서 텍스트를 추출할 수 없었습니다. 다른 검색어를 시도해보세요."
         
+        sections = [(f"📄 {i}. {content['title']}\n🔗 출처: {content['url']}\n", content['content'])
+                    for i, content in enumerate(extracted_contents, 1)]
+        budget = run.get('budget', EVIDENCE_TOKENS_PER_QUERY)
+        with profile_span("compress", query) as span:
+            compressed, stats = compress_sections(sections, f"{run.get('topic', '')} {query}", budget)
+            if not compressed:
+                # 고를 문장이 없으면(짧은 줄만 있는 본문) 섹션마다 앞부분을 예산만큼 자름 - 원문 그대로 보내지 않음
+                compressed = truncate_sections(sections, budget)
+                stats.compressed_chars = sum(len(body) for _, body in compressed)
+                stats.compressed_tokens = sum(estimate_tokens(body) for _, body in compressed)
+            span.update(stats.to_dict())
+        if run:
+            run['stats'].add(stats)
+        logger.info("📉 근거 압축: %s → %s 토큰 (비율 %.2f, 문장 %s/%s)", stats.original_tokens,
+                    stats.compressed_tokens, stats.ratio, stats.sentences_kept, stats.sentences_total)
+        
+        # 4단계: 결과 포맷팅
         formatted_result = f"🔍 '{query}' 검색 및 텍스트 추출 결과:\n\n"
         
-        for i, content in enumerate(extracted_contents, 1):
-            formatted_result += f"📄 {i}. {content['title']}\n"
-            formatted_result += f"🔗 출처: {content['url']}\n"
-            formatted_result += f"📝 내용:\n{content['content']}\n"
+        for header, content in compressed:
+            formatted_result += header
+            formatted_result += f"📝 내용:\n{content}\n"
             formatted_result += "-" * 80 + "\n\n"
         
-        logger.info(f"✅ 통합 검색 완료: {len(extracted_contents)}개 페이지에서 텍스트 추출")
+        logger.info("✅ 통합 검색 완료: %s개 페이지에서 텍스트 추출", len(extracted_contents))
         return formatted_result
         
     except Exception as e:
@@ -492,9 +580,11 @@ def get_preset_topic(preset_name: str) -> str:
 class UniversalResearchCrew:
     """모든 주제에 대해 리서치 보고서를 생성하는 AI 크루 시스템"""
     
-    def __init__(self, config: ResearchConfig):
+    def __init__(self, config: ResearchConfig, stream: bool = None):
         self.config = config
         self.llm_config = setup_llm_config()
+        # 작성 단계를 토큰 단위로 보고서 파일/stdout에 기록 (None이면 REPORT_STREAM 환경 변수)
+        self.stream = REPORT_STREAM if stream is None else stream
     
     def create_agents(self):
         """에이전트 생성"""
@@ -649,47 +739,101 @@ class UniversalResearchCrew:
         
         return planning_task, research_task, write_task
     
-    def save_result(self, result):
-        """결과를 파일로 저장"""
+    def report_header(self) -> str:
+        """보고서 파일 머리말"""
+        return (
+            f"# {self.config.topic} - 연구 보고서\n"
+            f"생성 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+            f"보고서 유형: {self.config.report_type}\n"
+            f"언어: {self.config.language}\n"
+            f"검색 쿼리 수: {self.config.search_queries_count}개\n"
+            f"페이지당 최대 크롤링: {self.config.max_pages_per_query}개\n"
+            f"LLM 프로바이더: {self.llm_config['provider']}\n"
+            f"LLM 모델: {self.llm_config['full_model_name']}\n"
+            "\n---\n\n"
+        )
+    
+    def save_result(self, result, stream: StreamingReportWriter = None):
+        """결과를 파일로 저장 (stream이 있으면 스트리밍 중인 .partial 파일을 최종 보고서로 마무리)"""
         if not result:
             logger.warning("저장할 결과가 없습니다.")
+            if stream:
+                stream.abort("작성 결과 없음")
             return None
+        
+        if stream:
+            filename = stream.finalize(result)
+            if filename:
+                logger.info("결과가 %s에 저장되었습니다.", filename)
+            return filename
             
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"research_report_{self.config.safe_topic}_{timestamp}.md"
         
         try:
             with open(filename, 'w', encoding='utf-8') as f:
-                f.write(f"# {self.config.topic} - 연구 보고서\n")
-                f.write(f"생성 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"보고서 유형: {self.config.report_type}\n")
-                f.write(f"언어: {self.config.language}\n")
-                f.write(f"검색 쿼리 수: {self.config.search_queries_count}개\n")
-                f.write(f"페이지당 최대 크롤링: {self.config.max_pages_per_query}개\n")
-                f.write(f"LLM 프로바이더: {self.llm_config['provider']}\n")
-                f.write(f"LLM 모델: {self.llm_config['full_model_name']}\n")
-                f.write("\n---\n\n")
+                f.write(self.report_header())
                 f.write(str(result))
             
-            logger.info(f"결과가 {filename}에 저장되었습니다.")
+            logger.info("결과가 %s에 저장되었습니다.", filename)
             return filename
         except Exception as e:
-            logger.error(f"결과 저장 실패: {e}")
+            logger.error("결과 저장 실패: %s", e)
             return None
     
+    def _fit_writer_context(self, write_task):
+        """연구 요약을 작성 프롬프트 상한 안으로 압축하는 research_task 콜백
+        
+        작성 태스크는 research_task.output.raw를 컨텍스트로 읽으므로 콜백에서 바꿔 둔다.
+        """
+        budget = budget_for_context(self.config.writer_prompt_max_tokens, write_task.description,
+                                    write_task.expected_output, reserve=WRITER_PROMPT_RESERVE)
+        
+        def callback(output):
+            with profile_span("compress", "writer_context", budget=budget) as span:
+                text, stats = compress_text(output.raw, self.config.topic, budget)
+                span.update(stats.to_dict())
+            if stats.compressed_tokens < stats.original_tokens:
+                output.raw = text
+                logger.info("📉 작성 컨텍스트 압축: %s → %s 토큰 (상한 %s, 비율 %.2f)",
+                            stats.original_tokens, stats.compressed_tokens, budget, stats.ratio)
+        return callback
+    
+    @log_context()
     def research(self):
         """메인 리서치 실행 메서드"""
+        profiler = RunProfiler(
+            "UniversalResearchCrew", self.config.topic,
+            search_queries_count=self.config.search_queries_count,
+            max_pages_per_query=self.config.max_pages_per_query,
+            report_type=self.config.report_type,
+            language=self.config.language,
+            model=self.llm_config["full_model_name"],
+            evidence_tokens_per_query=self.config.evidence_tokens_per_query,
+            writer_prompt_max_tokens=self.config.writer_prompt_max_tokens,
+        ).start()
+        saved_file = None
+        stream = None
+        evidence = {"topic": self.config.topic, "budget": self.config.evidence_tokens_per_query,
+                    "max_pages": self.config.max_pages_per_query, "stats": CompressionStats()}
+        evidence_token = _evidence_run.set(evidence)
         try:
             logger.info("=" * 60)
-            logger.info(f"🚀 범용 AI 리서치 크루 시작")
-            logger.info(f"📋 주제: {self.config.topic}")
-            logger.info(f"📊 보고서 유형: {self.config.report_type}")
-            logger.info(f"🔍 통합 웹 검색 도구 사용 (검색+크롤링+텍스트추출)")
+            logger.info("🚀 범용 AI 리서치 크루 시작")
+            logger.info("📋 주제: %s", self.config.topic)
+            logger.info("📊 보고서 유형: %s", self.config.report_type)
+            logger.info("🔍 통합 웹 검색 도구 사용 (검색+크롤링+텍스트추출)")
             logger.info("=" * 60)
             
             # 에이전트 및 작업 생성
             planner, researcher, writer = self.create_agents()
             planning_task, research_task, write_task = self.create_tasks(planner, researcher, writer)
+            research_task.callback = self._fit_writer_context(write_task)
+            profiler.attach_tasks([planning_task, research_task, write_task])
+            if self.stream:
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                stream = StreamingReportWriter(f"research_report_{self.config.safe_topic}_{timestamp}.md",
+                                               self.report_header()).attach(write_task)
             
             # 크루 실행
             crew = Crew(
@@ -700,28 +844,46 @@ class UniversalResearchCrew:
                 max_execution_time=MAX_EXECUTION_TIME
             )
             
-            logger.info(f"\n🎯 AI 크루 작업 시작: {self.config.topic}")
+            logger.info("\n🎯 AI 크루 작업 시작: %s", self.config.topic)
             logger.info("예상 소요 시간: 5-8분 (페이지 크롤링 포함)")
             
-            result = crew.kickoff()
+            with profiler.kickoff():
+                result = crew.kickoff()
+            profiler.record_crew_usage(result)
+            
+            stats = evidence["stats"]
+            if stats.original_tokens:
+                logger.info("📉 근거 압축 합계: %s → %s 토큰 (비율 %.2f)",
+                            stats.original_tokens, stats.compressed_tokens, stats.ratio)
             
             # 결과 저장
-            saved_file = self.save_result(result)
+            saved_file = self.save_result(result, stream)
             
             logger.info("\n🎉 크루 작업 완료!")
-            print(f"\n📄 생성된 {self.config.report_type}:")
-            print("=" * 80)
-            print(result)
-            print("=" * 80)
+            # 스트리밍했으면 본문은 이미 출력됨
+            if not (stream and stream.streamed_chars):
+                print(f"\n📄 생성된 {self.config.report_type}:")
+                print("=" * 80)
+                print(result)
+                print("=" * 80)
             
             if saved_file:
-                logger.info(f"\n📁 결과가 '{saved_file}' 파일에 저장되었습니다.")
+                logger.info("\n📁 결과가 '%s' 파일에 저장되었습니다.", saved_file)
             
             return result
             
         except Exception as e:
-            logger.error(f"❌ 리서치 실행 오류: {e}", exc_info=True)
+            logger.error("❌ 리서치 실행 오류: %s", e, exc_info=True)
+            # 시간 제한/오류 시 지금까지 작성된 부분 보고서 보존
+            if stream and stream.active:
+                saved_file = stream.abort(e)
             return None
+        finally:
+            # KeyboardInterrupt 등으로 중단된 경우에도 부분 보고서 보존
+            if stream and stream.active:
+                saved_file = stream.abort(sys.exc_info()[1] or "작성 미완료")
+            _evidence_run.reset(evidence_token)
+            profiler.finish(saved_file)
 
 def test_llm_connection():
     """LLM 연결 테스트"""
@@ -797,6 +959,15 @@ def main():
     parser.add_argument('--test-llm', 
                         action='store_true', 
                         help='LLM 연결 테스트만 실행')
+    parser.add_argument('--no-stream',
+                        action='store_true',
+                        help='작성 단계 스트리밍 끄기 (완료 후 한 번에 저장)')
+    parser.add_argument('--evidence-tokens',
+                        type=int, default=EVIDENCE_TOKENS_PER_QUERY,
+                        help=f'검색 쿼리당 추출 본문 토큰 예산 (기본값: {EVIDENCE_TOKENS_PER_QUERY})')
+    parser.add_argument('--writer-max-tokens',
+                        type=int, default=WRITER_PROMPT_MAX_TOKENS,
+                        help=f'작성 프롬프트 최대 토큰 (기본값: {WRITER_PROMPT_MAX_TOKENS})')
     
     args = parser.parse_args()
     
@@ -830,17 +1001,20 @@ def main():
         max_pages_per_query=args.pages,
         word_count_range=word_range,
         language=args.language,
-        report_type=args.type
+        report_type=args.type,
+        evidence_tokens_per_query=args.evidence_tokens,
+        writer_prompt_max_tokens=args.writer_max_tokens
     )
     
     print(f"🎯 연구 주제: {config.topic}")
     print(f"📊 보고서 유형: {config.report_type}")
     print(f"🔍 검색 쿼리: {config.search_queries_count}개")
     print(f"📄 쿼리당 크롤링: 최대 {config.max_pages_per_query}개 페이지")
+    print(f"📉 근거 예산: 쿼리당 {config.evidence_tokens_per_query}토큰, 작성 프롬프트 최대 {config.writer_prompt_max_tokens}토큰")
     print(f"📝 목표 단어 수: {config.word_count_range[0]}-{config.word_count_range[1]}단어")
     
     # 리서치 실행
-    crew = UniversalResearchCrew(config)
+    crew = UniversalResearchCrew(config, stream=not args.no_stream)
     result = crew.research()
     
     if result:
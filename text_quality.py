@@ -0,0 +1,160 @@
+"""
+웹 페이지 본문 품질 평가
+
+추출한 본문마다 호출되므로 판정 경로는 최소한으로 유지한다.
+- 판정: 거부 지표는 C로 구현된 부분 문자열 검색(`in`)으로 찾고 처음 발견하면 바로 끝낸다.
+  단어 수는 전체를 split()하지 않고 MIN_WORDS개까지만 센다.
+  (CPython에서는 지표마다 `in`을 쓰는 쪽이 지표를 합친 정규식이나
+  문자 단위로 도는 파이썬 Aho-Corasick보다 빠르다 - benchmarks/bench_text_quality.py)
+- 신호: 오류 문구/상용구 지표는 모듈 로드 시 하나의 정규식으로 컴파일해 두고
+  소문자 본문을 한 번만 스캔해 위치를 모은 뒤 상용구 비율을 계산한다.
+  한글/라틴 문자 비율과 단어 수도 함께 돌려준다.
+"""
+import re
+from itertools import islice
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List
+
+# 거부 지표 - JavaScript 코드 (대소문자 구분)
+JS_INDICATORS = [
+    'function(', '.push([', 'self.__next_f', 'window.',
+    'document.', 'var ', 'const ', 'let ', 'getElementById',
+    'addEventListener', 'querySelector', '$(', 'jQuery'
+]
+
+# 거부 지표 - 오류 페이지 (소문자 본문에서 검색)
+# 기존 is_good_text는 소문자로 바꾼 본문에서 'Page not found' 같은 대문자 포함 지표를 찾아
+# 실제로는 아래 네 개만 동작했으므로 같은 판정을 유지한다. 나머지는 ERROR_PHRASES 신호로만 센다.
+ERROR_INDICATORS = ['404', '403', 'exception', 'stacktrace']
+
+# 신호 전용 (판정에 사용하지 않음, 소문자 본문에서 검색)
+ERROR_PHRASES = ['page not found', 'access denied', 'forbidden', 'error']
+BOILERPLATE_PHRASES = [
+    'cookie', 'copyright', '©', 'all rights reserved', 'privacy policy', 'terms of use',
+    'subscribe', 'newsletter', 'sign in', 'sign up', 'log in', 'advertisement',
+    '로그인', '회원가입', '구독', '개인정보처리방침', '이용약관', '무단 전재', '무단전재',
+    '재배포 금지', '저작권', '공유하기', '기사제보', '광고문의',
+]
+
+MIN_CHARS = 50
+MIN_WORDS = 15
+
+# 상용구 지표 주변으로 상용구 구간에 포함시킬 최대 글자 수 (한 줄로 합쳐진 본문 대비)
+BOILERPLATE_WINDOW = 120
+# 문자 비율은 큰 문서에서 고르게 떨어진 구간만 표본으로 추정
+SAMPLE_WINDOWS = 4
+SAMPLE_WINDOW_CHARS = 5000
+
+_WORD = re.compile(r'\S+')
+_HANGUL_RUN = re.compile(r'[가-힣]+')
+_LATIN_RUN = re.compile(r'[A-Za-z]+')
+
+
+class MultiPatternScanner:
+    """그룹별 지표 문자열을 한 번의 스캔으로 찾는 스캐너 (생성 시 한 번 컴파일)"""
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        parts = []
+        for name, patterns in groups.items():
+            # 긴 지표 우선 (같은 위치에서 짧은 지표가 먼저 일치하지 않도록)
+            alternation = "|".join(re.escape(p) for p in sorted(set(patterns), key=len, reverse=True))
+            parts.append(f"(?P<{name}>{alternation})")
+        self.groups = list(groups)
+        self._regex = re.compile("|".join(parts))
+
+    def scan(self, text: str) -> Dict[str, List[int]]:
+        """그룹별 일치 시작 위치"""
+        hits: Dict[str, List[int]] = {name: [] for name in self.groups}
+        for match in self._regex.finditer(text):
+            hits[match.lastgroup].append(match.start())
+        return hits
+
+
+# 소문자 본문용 신호 스캐너 (대소문자 무시 정규식은 훨씬 느리므로 lower() 후 스캔)
+_signal_scanner = MultiPatternScanner({"error_phrase": ERROR_PHRASES, "boilerplate": BOILERPLATE_PHRASES})
+
+
+@dataclass
+class TextQuality:
+    """본문 품질 판정과 신호"""
+    ok: bool
+    reason: str = ""            # too_short, javascript, error_page, few_words
+    chars: int = 0
+    word_count: int = 0         # detailed=False이면 MIN_WORDS까지만 센다
+    error_phrase_hits: int = 0
+    boilerplate_hits: int = 0
+    boilerplate_ratio: float = 0.0  # 상용구 지표 주변 구간이 차지하는 글자 비율
+    hangul_ratio: float = 0.0       # 한글 음절 / 전체 글자 (표본 추정)
+    latin_ratio: float = 0.0        # 라틴 문자 / 전체 글자 (표본 추정)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def analyze_text(text: str, detailed: bool = True) -> TextQuality:
+    """본문 품질 평가 - detailed=False이면 판정에 필요한 값만 계산"""
+    if not text or len(text.strip()) < MIN_CHARS:
+        return TextQuality(ok=False, reason="too_short", chars=len(text or ""))
+
+    quality = TextQuality(ok=True, chars=len(text))
+    lower_text = None
+
+    # 판정 (처음 발견한 거부 사유에서 종료)
+    if any(indicator in text for indicator in JS_INDICATORS):
+        quality.ok, quality.reason = False, "javascript"
+    else:
+        lower_text = text.lower()
+        if any(indicator in lower_text for indicator in ERROR_INDICATORS):
+            quality.ok, quality.reason = False, "error_page"
+        else:
+            quality.word_count = sum(1 for _ in islice(_WORD.finditer(text), MIN_WORDS))
+            if quality.word_count < MIN_WORDS:
+                quality.ok, quality.reason = False, "few_words"
+
+    if not detailed:
+        return quality
+
+    # 신호
+    if lower_text is None:
+        lower_text = text.lower()
+    hits = _signal_scanner.scan(lower_text)
+    quality.word_count = len(text.split())
+    quality.error_phrase_hits = len(hits["error_phrase"])
+    quality.boilerplate_hits = len(hits["boilerplate"])
+    quality.boilerplate_ratio = _boilerplate_ratio(lower_text, hits["boilerplate"])
+    quality.hangul_ratio, quality.latin_ratio = _script_ratios(text)
+    return quality
+
+
+def is_good_text(text: str) -> bool:
+    """본문 품질 판정 (JavaScript/오류 페이지/너무 짧은 본문 거부)"""
+    return analyze_text(text, detailed=False).ok
+
+
+def _boilerplate_ratio(text: str, positions: List[int]) -> float:
+    """상용구 지표가 있는 줄(지표 앞뒤 BOILERPLATE_WINDOW자 이내)의 글자 비율"""
+    if not positions:
+        return 0.0
+    covered = 0
+    last_end = 0
+    for pos in positions:
+        start = max(text.rfind('\n', 0, pos) + 1, pos - BOILERPLATE_WINDOW, last_end)
+        end = text.find('\n', pos)
+        end = min(len(text) if end == -1 else end, pos + BOILERPLATE_WINDOW)
+        if end > start:
+            covered += end - start
+            last_end = end
+    return round(covered / len(text), 4)
+
+
+def _script_ratios(text: str):
+    """한글/라틴 문자 비율 - 큰 문서는 고르게 떨어진 표본 구간으로 추정"""
+    if len(text) <= SAMPLE_WINDOWS * SAMPLE_WINDOW_CHARS:
+        samples = [text]
+    else:
+        step = (len(text) - SAMPLE_WINDOW_CHARS) // (SAMPLE_WINDOWS - 1)
+        samples = [text[i * step:i * step + SAMPLE_WINDOW_CHARS] for i in range(SAMPLE_WINDOWS)]
+    total = sum(len(sample) for sample in samples)
+    hangul = sum(len(run) for sample in samples for run in _HANGUL_RUN.findall(sample))
+    latin = sum(len(run) for sample in samples for run in _LATIN_RUN.findall(sample))
+    return round(hangul / total, 4), round(latin / total, 4)
@@ -10,26 +10,32 @@ import sys
 import logging
 import argparse
 import re
-import hashlib
+import json
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Set, List, Dict, Any
+from typing import List, Dict, Any, Optional
 import litellm
 from crewai import Agent, Task, Crew, Process
 from crewai.tools import tool
 from dotenv import load_dotenv
 
-# DuckDuckGo Search
-from ddgs import DDGS
-
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(f'unified_research_crew_{datetime.now().strftime("%Y%m%d")}.log'),
-        logging.StreamHandler()
-    ]
+from logging_setup import setup_queue_logging, log_context
+from research_profile import RunProfiler, profile_span
+from report_stream import StreamingReportWriter, REPORT_STREAM
+from fixed_search_tool import (
+    improved_web_search_tool, batch_web_search_tool, clear_search_history, run_batch_search, search_evidence
 )
+from local_corpus import format_corpus_hits, get_corpus_index
+from research_checkpoint import ResearchCheckpoint
+from planner_cache import planner_cache, parse_planned_queries, format_plan
+from report_refresh import (EvidenceSet, Section, assign_evidence, format_evidence, merge_sections,
+                            report_body, split_sections)
+
+# 로깅 설정 (큐 기반, LOG_JSON/LOG_ROTATION 환경 변수 지원)
+setup_queue_logging("unified_research_crew", log_dir=".", fmt='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # 환경 설정
@@ -42,6 +48,9 @@ MODEL_NAME = os.getenv("DEFAULT_LLM", "mistral-small3.2")
 API_BASE_URL = os.getenv("DEFAULT_URL", "http://192.168.100.26:11434")
 API_KEY = os.getenv("DEFAULT_API_KEY", "ollama")
 MAX_EXECUTION_TIME = int(os.getenv("MAX_EXECUTION_TIME", "600"))
+# 배치 주제 모드: 동시 실행 크루 수와 전체 LLM 동시 호출 상한
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "3"))
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "2"))
 
 if not API_BASE_URL.endswith('/v1'):
     API_BASE_URL = API_BASE_URL.rstrip('/') + '/v1'
@@ -56,124 +65,30 @@ class ResearchConfig:
                  word_count_range: tuple = (700, 900),
                  language: str = "한국어",
                  report_type: str = "블로그",
-                 quality_mode: str = "standard"):  # standard, korean_optimized
+                 quality_mode: str = "standard",  # standard, korean_optimized
+                 variant: str = None):  # 멀티 출력 모드의 작성 변형 이름 (파일명에 사용)
         self.topic = topic
         self.search_queries_count = search_queries_count
         self.word_count_range = word_count_range
         self.language = language
         self.report_type = report_type
         self.quality_mode = quality_mode
+        self.variant = variant
         
         # 파일명용 안전한 토픽명 생성
         self.safe_topic = re.sub(r'[^\w\s-]', '', topic.replace(' ', '_'))[:50]
 
-# 개선된 웹 검색 도구 (fixed_search_tool.py 기반)
-_search_history: Set[str] = set()
-_search_results_cache: Dict[str, str] = {}
-
-def clear_search_history():
-    """검색 히스토리 초기화"""
-    global _search_history, _search_results_cache
-    _search_history.clear()
-    _search_results_cache.clear()
-
-def get_query_hash(query: str) -> str:
-    """쿼리의 해시값 생성 (유사한 쿼리 감지용)"""
-    normalized_query = query.lower().strip()
-    return hashlib.md5(normalized_query.encode()).hexdigest()
-
-@tool("Web Search Tool")
-def improved_web_search_tool(query: str) -> str:
-    """개선된 웹 검색 도구 - 중복 방지 및 에러 처리 강화"""
-    
-    # 입력 검증
-    if not query or not isinstance(query, str):
-        return "❌ 유효하지 않은 검색 쿼리입니다."
-    
-    query = query.strip()
-    if len(query) < 3:
-        return "❌ 검색 쿼리가 너무 짧습니다. 최소 3글자 이상 입력해주세요."
-    
-    # 쿼리 해시 생성
-    query_hash = get_query_hash(query)
-    
-    # 중복 검색 방지
-    if query_hash in _search_history:
-        if query_hash in _search_results_cache:
-            return f"🔄 (캐시됨) {_search_results_cache[query_hash]}"
-        else:
-            return f"⚠️ 이미 검색한 쿼리입니다: '{query}'. 다른 검색어를 시도해보세요."
-    
-    # 검색 히스토리에 추가
-    _search_history.add(query_hash)
-    
-    try:
-        logger.info(f"🔍 웹 검색 시작: '{query}'")
-        
-        # DuckDuckGo 검색 실행
-        ddgs = DDGS()
-        results = ddgs.text(
-            query=query, 
-            region='wt-wt', 
-            safesearch='moderate', 
-            max_results=5
-        )
-        
-        if not results:
-            error_msg = f"⚠️ '{query}'에 대한 검색 결과를 찾을 수 없습니다."
-            logger.warning(error_msg)
-            return error_msg
-        
-        # 결과 포매팅
-        formatted_results = format_search_results(query, results)
-        
-        # 캐시에 저장
-        _search_results_cache[query_hash] = formatted_results
-        
-        logger.info(f"✅ 검색 완료: {len(results)}개 결과")
-        return formatted_results
-        
-    except Exception as e:
-        error_msg = f"❌ 검색 오류 발생: {str(e)}"
-        logger.error(f"웹 검색 오류 - Query: '{query}', Error: {e}")
-        
-        # DNS 오류 등 네트워크 문제인 경우 대체 메시지
-        if "dns error" in str(e).lower() or "name or service not known" in str(e).lower():
-            error_msg += "\n🌐 인터넷 연결을 확인하고 다시 시도해주세요."
-        
-        return error_msg
-
-def format_search_results(query: str, results: List[Dict[str, Any]]) -> str:
-    """검색 결과를 포매팅"""
-    formatted = f"🔍 '{query}' 검색 결과:\n\n"
-    
-    # 중복 URL 제거
-    seen_urls = set()
-    unique_results = []
-    
-    for result in results:
-        url = result.get('href', '')
-        if url and url not in seen_urls:
-            unique_results.append(result)
-            seen_urls.add(url)
-    
-    if not unique_results:
-        return f"⚠️ '{query}'에 대한 유효한 검색 결과가 없습니다."
-    
-    for i, result in enumerate(unique_results, 1):
-        title = result.get('title', '제목 없음')
-        body = result.get('body', '설명 없음')
-        href = result.get('href', '#')
-        
-        # 본문이 너무 길면 자르기
-        if len(body) > 150:
-            body = body[:150] + '...'
-            
-        formatted += f"{i}. **{title}**\n"
-        formatted += f"   📄 {body}\n"
-        formatted += f"   🔗 {href}\n\n"
-    
-    return formatted
+@tool("Local Corpus Search Tool")
+def local_corpus_search_tool(query: str) -> str:
+    """로컬 문서 코퍼스(과거 보고서, 메모, PDF 등)에서 관련 구절을 찾는 도구 - 웹 검색 없이 즉시 응답합니다."""
+    index = get_corpus_index()
+    if index is None:
+        return "⚠️ 로컬 코퍼스 색인이 없습니다. 웹 검색 도구를 사용하세요."
+    with profile_span("corpus", query) as span:
+        hits = index.search(query, k=5)
+        span["results"] = len(hits)
+    logger.info("📚 로컬 코퍼스 검색: '%s' - %s개 결과", query, len(hits))
+    return format_corpus_hits(query, hits)
 
 # 주제별 프리셋
 RESEARCH_PRESETS = {
@@ -197,8 +112,14 @@ def get_preset_topic(preset_name: str) -> str:
 class UnifiedResearchCrew:
     """통합된 AI 리서치 크루 시스템"""
     
-    def __init__(self, config: ResearchConfig):
+    def __init__(self, config: ResearchConfig, verbose: bool = True, stream: bool = None, replan: bool = False):
         self.config = config
+        self.verbose = verbose
+        # 작성 단계를 토큰 단위로 보고서 파일/stdout에 기록 (None이면 REPORT_STREAM 환경 변수)
+        self.stream = REPORT_STREAM if stream is None else stream
+        # replan이면 검색 계획 캐시를 쓰지 않고 다시 계획 (새 계획으로 캐시 갱신)
+        self.replan = replan
+        self.report_file = None
         self.setup_environment()
     
     def setup_environment(self):
@@ -216,7 +137,7 @@ class UnifiedResearchCrew:
             goal=f'{self.config.topic}에 대한 효과적인 웹 검색 전략 수립',
             backstory='''다양한 주제를 체계적으로 분석하여 최적의 검색 쿼리를 생성하는 전략가입니다. 
             복잡한 주제를 핵심 질문으로 분해하고, 최신 정보를 얻을 수 있는 검색어를 설계합니다.''',
-            verbose=True,
+            verbose=self.verbose,
             allow_delegation=False,
             llm=f"openai/{MODEL_NAME}",
             max_tokens=1024,
@@ -228,22 +149,32 @@ class UnifiedResearchCrew:
             goal=f'{self.config.topic}에 대한 종합적이고 심층적인 정보 수집 및 분석',
             backstory='''웹 검색을 통해 실시간 정보를 수집하고, 다양한 출처의 정보를 비판적으로 분석하여 
             신뢰할 수 있는 인사이트를 도출하는 숙련된 연구 전문가입니다.''',
-            verbose=True,
+            verbose=self.verbose,
             allow_delegation=False,
-            tools=[improved_web_search_tool],
+            tools=self.research_tools(),
             llm=f"openai/{MODEL_NAME}",
             max_tokens=2000,
             temperature=0.7
         )
 
         # 품질 모드에 따른 작가 에이전트 생성
-        if self.config.quality_mode == "korean_optimized":
-            writer = self._create_korean_optimized_writer()
-        else:
-            writer = self._create_standard_writer()
+        writer = self.create_writer()
         
         return planner, researcher, writer
     
+    def research_tools(self):
+        """리서치 에이전트 도구 (로컬 코퍼스 색인이 있으면 코퍼스 검색 도구 추가)"""
+        tools = [batch_web_search_tool, improved_web_search_tool]
+        if get_corpus_index() is not None:
+            tools.append(local_corpus_search_tool)
+        return tools
+    
+    def create_writer(self):
+        """품질 모드에 따른 작가 에이전트"""
+        if self.config.quality_mode == "korean_optimized":
+            return self._create_korean_optimized_writer()
+        return self._create_standard_writer()
+    
     def _create_standard_writer(self):
         """표준 콘텐츠 작성 에이전트"""
         return Agent(
@@ -251,7 +182,7 @@ class UnifiedResearchCrew:
             goal=f'{self.config.topic}에 대한 매력적이고 유익한 {self.config.report_type} 작성',
             backstory=f'''복잡한 정보를 {self.config.language}로 명확하고 매력적으로 전달하는 전문 작가입니다. 
             다양한 분야의 최신 정보를 독자가 이해하기 쉽고 실용적인 콘텐츠로 변환합니다.''',
-            verbose=True,
+            verbose=self.verbose,
             allow_delegation=False,
             llm=f"openai/{MODEL_NAME}",
             max_tokens=2000,
@@ -267,7 +198,7 @@ class UnifiedResearchCrew:
             자연스럽고 이해하기 쉬운 한국어로 표현합니다. 
             영어 표현을 사용하지 않고 순수 한국어만을 사용하며,
             정확한 정보와 실용적인 인사이트를 제공합니다.''',
-            verbose=True,
+            verbose=self.verbose,
             allow_delegation=False,
             llm=f"openai/{MODEL_NAME}",
             max_tokens=2000,
@@ -275,10 +206,34 @@ class UnifiedResearchCrew:
         )
 
     def create_tasks(self, planner, researcher, writer):
-        """태스크 생성"""
+        """태스크 생성 (검색 계획 캐시가 있으면 계획 태스크 생략)"""
+        research_tasks = self.create_research_tasks(planner, researcher)
         
-        # 1. 검색 계획 수립
-        planning_task = Task(
+        # 3. 콘텐츠 작성 (품질 모드에 따라 다름)
+        write_task = self.create_write_task(writer, research_tasks[-1])
+        
+        return research_tasks + [write_task]
+    
+    def cached_plan(self) -> Optional[str]:
+        """캐시된 검색 계획 (SEARCH_QUERY_n 형식) - replan이거나 유효한 캐시가 없으면 None"""
+        if self.replan:
+            return None
+        cached = planner_cache.get(self.config.topic, self.config.search_queries_count, self.config.language)
+        if cached is None:
+            return None
+        logger.info("📋 검색 계획 캐시 사용 (%.1f시간 전, 검색어 %s개) - 계획 단계 생략",
+                    cached.age_hours, len(cached.queries))
+        return format_plan(cached.queries)
+    
+    def cache_plan(self, output):
+        """계획 태스크 완료 콜백 - 플래너 출력의 검색어를 캐시에 저장"""
+        plan = getattr(output, "raw", None) or str(output)
+        planner_cache.put(self.config.topic, self.config.search_queries_count, self.config.language,
+                          parse_planned_queries(plan, limit=self.config.search_queries_count))
+    
+    def create_planning_task(self, planner) -> Task:
+        """1. 검색 계획 수립 태스크 - SEARCH_QUERY_n 형식으로 출력"""
+        return Task(
             description=f'''"{self.config.topic}"에 대한 포괄적인 연구를 수행해야 합니다.
             
             이 주제를 다음 관점에서 분석하여 {self.config.search_queries_count}개의 구체적이고 효과적인 영어 웹 검색 쿼리를 생성하세요:
@@ -309,17 +264,35 @@ class UnifiedResearchCrew:
             주제: {self.config.topic}에 최적화된 서로 다른 검색어들''',
             agent=planner
         )
+    
+    def create_research_tasks(self, planner, researcher) -> List[Task]:
+        """검색 계획 수립 + 정보 수집 태스크 (검색 계획 캐시가 있으면 정보 수집 태스크만)"""
+        plan = self.cached_plan()
+        if plan is not None:
+            planning_task = None
+            plan_source = "아래 검색 계획"
+            plan_section = f"\n\n            **검색 계획:**\n{plan}"
+        else:
+            planning_task = self.create_planning_task(planner)
+            planning_task.callback = self.cache_plan
+            plan_source = "이전 단계에서 생성된 검색 계획"
+            plan_section = ""
         
-        # 2. 정보 수집
+        # 2. 정보 수집 (로컬 코퍼스 색인이 있으면 코퍼스 검색 단계 추가)
+        corpus_step = ""
+        if get_corpus_index() is not None:
+            corpus_step = ("\n            6. 'Local Corpus Search Tool'로 로컬 문서(과거 보고서, 메모 등)에서도 "
+                           "주제 관련 내용을 찾아 함께 활용하세요.")
         research_task = Task(
-            description=f'''이전 단계에서 생성된 검색 쿼리 목록을 활용하여 "{self.config.topic}"에 대한 심층 웹 검색을 수행합니다.
+            description=f'''{plan_source}의 검색 쿼리 목록을 활용하여 "{self.config.topic}"에 대한 심층 웹 검색을 수행합니다.{plan_section}
 
             **필수 수행 절차:**
-            1. 이전 Task 결과에서 "SEARCH_QUERY_1:", "SEARCH_QUERY_2:" 등의 형식으로 된 검색 쿼리들을 찾아 추출합니다.
+            1. {plan_source}에서 "SEARCH_QUERY_1:", "SEARCH_QUERY_2:" 등의 형식으로 된 검색 쿼리들을 찾아 추출합니다.
             2. 각 SEARCH_QUERY_X에서 따옴표 안의 검색어만 추출합니다.
-            3. 추출된 **모든 검색어를 하나씩 순서대로** 'Web Search Tool'을 사용하여 검색합니다.
-            4. 검색할 때마다 "🔍 검색 중: X/5 - [검색어]" 형태로 진행상황을 알려주세요.
-            5. 만약 어떤 검색이 실패하거나 관련없는 결과가 나오면, 해당 주제의 대체 검색어를 만들어 다시 검색하세요.
+            3. 추출된 **모든 검색어를 리스트로 묶어 'Batch Web Search Tool'을 한 번만 호출**하여 검색합니다.
+               (검색은 동시에 실행되고, 중복 URL이 제거된 결과가 한 번에 반환됩니다)
+            4. 검색 전에 "🔍 검색 중: {self.config.search_queries_count}개 쿼리 - [검색어 목록]" 형태로 진행상황을 알려주세요.
+            5. 만약 어떤 검색이 실패하거나 관련없는 결과가 나오면, 해당 주제의 대체 검색어만 'Web Search Tool'로 다시 검색하세요.{corpus_step}
             
             **보고서 작성 요구사항:**
             모든 검색 완료 후, 수집된 정보를 바탕으로 다음을 포함한 종합 보고서를 **반드시 {self.config.language}로** 작성하세요:
@@ -336,16 +309,16 @@ class UnifiedResearchCrew:
             모든 생성된 검색 쿼리를 통해 얻은 최신 정보를 바탕으로 작성.''',
             
             agent=researcher,
-            context=[planning_task]
+            context=[planning_task] if planning_task else []
         )
-
-        # 3. 콘텐츠 작성 (품질 모드에 따라 다름)
-        if self.config.quality_mode == "korean_optimized":
-            write_task = self._create_korean_optimized_task(writer, research_task)
-        else:
-            write_task = self._create_standard_task(writer, research_task)
         
-        return [planning_task, research_task, write_task]
+        return [planning_task, research_task] if planning_task else [research_task]
+    
+    def create_write_task(self, writer, research_task):
+        """품질 모드에 따른 작성 태스크"""
+        if self.config.quality_mode == "korean_optimized":
+            return self._create_korean_optimized_task(writer, research_task)
+        return self._create_standard_task(writer, research_task)
     
     def _create_standard_task(self, writer, research_task):
         """표준 작성 태스크"""
@@ -408,65 +381,573 @@ class UnifiedResearchCrew:
             context=[research_task]
         )
     
-    def save_result(self, result):
-        """결과를 파일로 저장"""
+    def report_filename(self) -> str:
+        """보고서 파일명"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        suffix = self.config.variant or self.config.quality_mode
+        return f"research_report_{self.config.safe_topic}_{suffix}_{timestamp}.md"
+    
+    def report_header(self, refreshed_from: str = None) -> str:
+        """보고서 파일 머리말 (refreshed_from: 증분 갱신의 기준 보고서)"""
+        header = f"# {self.config.topic} 연구 보고서\n\n"
+        header += f"**생성 시간:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        header += f"**품질 모드:** {self.config.quality_mode}\n"
+        header += f"**언어:** {self.config.language}\n"
+        if self.config.variant:
+            header += f"**보고서 유형:** {self.config.report_type}\n"
+        if refreshed_from:
+            header += f"**갱신 기준:** {refreshed_from}\n"
+        return header + "\n---\n\n"
+    
+    def stream_report(self, write_task, echo: bool = None) -> Optional[StreamingReportWriter]:
+        """작성 태스크 출력을 보고서 파일(.partial)과 stdout으로 스트리밍 (비활성이면 None)"""
+        if not self.stream:
+            return None
+        echo = self.verbose if echo is None else echo
+        return StreamingReportWriter(self.report_filename(), self.report_header(), echo=echo).attach(write_task)
+    
+    def save_result(self, result, stream: StreamingReportWriter = None):
+        """결과를 파일로 저장 - 저장한 파일명 반환 (실패 시 None)
+        
+        stream이 있으면 스트리밍 중인 .partial 파일을 최종 보고서로 마무리한다.
+        """
         if not result:
             logger.error("저장할 결과가 없습니다.")
-            return False
-            
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"research_report_{self.config.safe_topic}_{self.config.quality_mode}_{timestamp}.md"
+            if stream:
+                stream.abort("작성 결과 없음")
+            return None
         
+        if stream:
+            filename = stream.finalize(result)
+            if filename:
+                logger.info("✅ 결과 저장 완료: %s", filename)
+            return filename
+        
+        filename = self.report_filename()
         try:
             with open(filename, 'w', encoding='utf-8') as f:
-                f.write(f"# {self.config.topic} 연구 보고서\n\n")
-                f.write(f"**생성 시간:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"**품질 모드:** {self.config.quality_mode}\n")
-                f.write(f"**언어:** {self.config.language}\n\n")
-                f.write("---\n\n")
+                f.write(self.report_header())
                 f.write(str(result))
             
-            logger.info(f"✅ 결과 저장 완료: {filename}")
-            return True
+            logger.info("✅ 결과 저장 완료: %s", filename)
+            return filename
         except Exception as e:
-            logger.error(f"❌ 파일 저장 실패: {e}")
-            return False
+            logger.error("❌ 파일 저장 실패: %s", e)
+            return None
     
-    def research(self):
-        """메인 리서치 실행 메서드"""
+    @log_context()
+    def research(self, clear_history: bool = True):
+        """메인 리서치 실행 메서드
+        
+        clear_history=False이면 다른 크루와 검색 캐시를 공유한다 (배치 모드).
+        """
+        profiler = RunProfiler(
+            "UnifiedResearchCrew", self.config.topic,
+            quality_mode=self.config.quality_mode,
+            search_queries_count=self.config.search_queries_count,
+            report_type=self.config.report_type,
+            language=self.config.language,
+            model=MODEL_NAME,
+        ).start()
+        saved_file = None
+        stream = None
+        # 검색 결과를 근거로 기록 - 다음 --refresh의 기준
+        evidence = EvidenceSet()
+        evidence_token = search_evidence.set(evidence)
         try:
-            logger.info(f"🚀 '{self.config.topic}' 연구 시작 (모드: {self.config.quality_mode})")
+            logger.info("🚀 '%s' 연구 시작 (모드: %s)", self.config.topic, self.config.quality_mode)
             
             # 검색 히스토리 초기화
-            clear_search_history()
+            if clear_history:
+                clear_search_history()
             
             # 에이전트 생성
             planner, researcher, writer = self.create_agents()
             
             # 태스크 생성
             tasks = self.create_tasks(planner, researcher, writer)
+            profiler.attach_tasks(tasks)
+            stream = self.stream_report(tasks[-1])
             
             # 크루 생성 및 실행
             crew = Crew(
-                agents=[planner, researcher, writer],
+                agents=[task.agent for task in tasks],
                 tasks=tasks,
                 process=Process.sequential,
-                verbose=True
+                verbose=self.verbose
             )
             
-            result = crew.kickoff()
+            with profiler.kickoff():
+                result = crew.kickoff()
+            profiler.record_crew_usage(result)
             
             # 결과 저장
-            if self.save_result(result):
-                logger.info(f"✅ '{self.config.topic}' 연구 완료")
+            saved_file = self.report_file = self.save_result(result, stream)
+            if saved_file:
+                self.save_evidence(evidence, saved_file)
+                logger.info("✅ '%s' 연구 완료", self.config.topic)
                 return result
             else:
                 logger.error("❌ 결과 저장 실패")
                 return None
                 
         except Exception as e:
-            logger.error(f"❌ 연구 실행 실패: {e}")
+            logger.error("❌ 연구 실행 실패: %s", e)
+            # 시간 제한/오류 시 지금까지 작성된 부분 보고서 보존
+            if stream and stream.active:
+                self.report_file = stream.abort(e)
             return None
+        finally:
+            # KeyboardInterrupt 등으로 중단된 경우에도 부분 보고서 보존
+            if stream and stream.active:
+                self.report_file = stream.abort(sys.exc_info()[1] or "작성 미완료")
+            search_evidence.reset(evidence_token)
+            profiler.finish(saved_file)
+    
+    # ===== 증분 갱신 =====
+    def save_evidence(self, evidence: EvidenceSet, report_file: str):
+        """보고서와 근거(검색어, 검색 결과)를 체크포인트로 저장 - 다음 갱신의 기준"""
+        run_id = ResearchCheckpoint.new_run_id(self.config.topic)
+        if self.config.variant:
+            # 작성 변형은 동시에 저장되므로 변형 이름으로 실행 id를 구분
+            run_id = f"{run_id}_{self.config.variant}"
+        checkpoint = ResearchCheckpoint(run_id, self.config.topic, crew="unified")
+        checkpoint.meta.update(quality_mode=self.config.quality_mode,
+                               language=self.config.language, report_type=self.config.report_type)
+        checkpoint.save("evidence", f"검색어 {len(evidence.queries)}개, 검색 결과 {len(evidence.items)}개",
+                        evidence=evidence.to_dict())
+        checkpoint.mark_complete(report_file)
+    
+    def previous_run(self) -> Optional[ResearchCheckpoint]:
+        """같은 주제/설정의 가장 최근 보고서 체크포인트 (보고서 파일이 남아 있는 경우만)"""
+        checkpoint = ResearchCheckpoint.latest(
+            self.config.topic, stage="evidence", crew="unified",
+            quality_mode=self.config.quality_mode, language=self.config.language,
+            report_type=self.config.report_type,
+        )
+        if checkpoint and checkpoint.meta.get("report_file") and os.path.exists(checkpoint.meta["report_file"]):
+            return checkpoint
+        return None
+    
+    @log_context()
+    def refresh(self, clear_history: bool = True) -> Optional[str]:
+        """이전 보고서 증분 갱신 - 저장한 보고서 파일명 반환 (실패 시 None)
+        
+        이전 보고서의 검색어로 다시 검색해 이미 본 URL/내용을 뺀 새 근거만 모으고,
+        새 근거가 배정된 섹션만 다시 작성한다. 새 근거가 없으면 이전 보고서를 그대로 쓰고,
+        기준이 될 이전 보고서가 없으면 전체 리서치를 실행한다.
+        """
+        previous = self.previous_run()
+        if previous is None:
+            logger.info("🆕 '%s' 갱신 기준 보고서가 없어 전체 리서치를 실행합니다", self.config.topic)
+            return self.report_file if self.research(clear_history) else None
+        previous_file = previous.meta["report_file"]
+        previous_evidence = EvidenceSet.from_dict((previous.data("evidence") or {}).get("evidence", {}))
+        
+        profiler = RunProfiler(
+            "UnifiedResearchCrew", self.config.topic,
+            mode="refresh",
+            previous_report=previous_file,
+            quality_mode=self.config.quality_mode,
+            search_queries_count=len(previous_evidence.queries),
+            model=MODEL_NAME,
+        ).start()
+        saved_file = None
+        try:
+            logger.info("🔄 '%s' 보고서 갱신 시작 (기준: %s, 이전 근거 %s개, 검색어 %s개)", self.config.topic,
+                        previous_file, len(previous_evidence.items), len(previous_evidence.queries))
+            if clear_history:
+                clear_search_history()
+            
+            # 1. 같은 검색어로 다시 검색 - 이미 본 URL/내용은 제외 (계획/리서치 에이전트 없음)
+            fresh = previous_evidence.seen_filter()
+            token = search_evidence.set(fresh)
+            try:
+                run_batch_search(previous_evidence.queries)
+            finally:
+                search_evidence.reset(token)
+            if not fresh.items:
+                logger.info("🟰 새 근거 없음 (이미 본 결과 %s개 제외) - 이전 보고서 유지: %s",
+                            fresh.skipped, previous_file)
+                saved_file = self.report_file = previous_file
+                return saved_file
+            
+            # 2. 새 근거를 섹션에 배정하고 해당 섹션만 다시 작성
+            with open(previous_file, encoding='utf-8') as f:
+                sections = split_sections(report_body(f.read()))
+            assigned = assign_evidence(sections, fresh.items)
+            logger.info("🧩 새 근거 %s개 (이미 본 결과 %s개 제외) → 섹션 %s/%s개 갱신%s",
+                        len(fresh.items), fresh.skipped, len([i for i in assigned if i is not None]),
+                        len(sections), ", 새 섹션 추가" if None in assigned else "")
+            updated = self.rewrite_sections(sections, assigned, profiler)
+            
+            # 3. 저장 - 갱신 보고서가 다음 갱신의 기준
+            filename = self.report_filename()
+            with open(filename, 'w', encoding='utf-8') as f:
+                f.write(self.report_header(refreshed_from=previous_file))
+                f.write(merge_sections(updated))
+            saved_file = self.report_file = filename
+            self.save_evidence(previous_evidence.merged(fresh), saved_file)
+            logger.info("✅ '%s' 보고서 갱신 완료: %s", self.config.topic, saved_file)
+            return saved_file
+        except Exception as e:
+            logger.error("❌ 보고서 갱신 실패: %s", e)
+            return None
+        finally:
+            profiler.finish(saved_file)
+    
+    def rewrite_sections(self, sections: List[Section], assigned: Dict[Optional[int], list],
+                         profiler: RunProfiler, concurrency: int = LLM_CONCURRENCY) -> List[Section]:
+        """새 근거가 배정된 섹션만 다시 작성 (동시 실행) - 실패한 섹션은 이전 내용 유지
+        
+        어느 섹션에도 맞지 않는 근거(None 키)는 새 섹션으로 작성해 결론 섹션 앞(없으면 끝)에 넣는다.
+        """
+        updated = list(sections)
+        new_section = Section(f"## 최신 업데이트 ({datetime.now().strftime('%Y-%m-%d')})", "")
+        
+        def rewrite(index: Optional[int]) -> Section:
+            section = new_section if index is None else sections[index]
+            writer = self.create_writer()
+            task = self.create_section_update_task(writer, section, assigned[index])
+            with profiler.span("writer", section.heading or "도입부") as span:
+                result = Crew(agents=[writer], tasks=[task], process=Process.sequential,
+                              verbose=self.verbose).kickoff()
+                span["output_chars"] = len(str(result))
+            # 제목은 이전 보고서 것을 유지 (작가가 제목 줄을 다시 써도 본문만 사용)
+            lines = str(result).strip().splitlines()
+            if lines and lines[0].lstrip().startswith("#"):
+                lines = lines[1:]
+            return Section(section.heading, "\n".join(lines).strip())
+        
+        workers = max(1, min(concurrency, len(assigned)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="writer") as executor:
+            futures = {executor.submit(contextvars.copy_context().run, rewrite, index): index for index in assigned}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    section = future.result()
+                except Exception as e:
+                    logger.error("❌ 섹션 갱신 실패 (%s) - 이전 내용 유지: %s",
+                                 "새 섹션" if index is None else sections[index].heading or "도입부", e)
+                    continue
+                if index is None:
+                    new_section = section
+                else:
+                    updated[index] = section
+        
+        if new_section.body:
+            position = len(updated)
+            if updated and re.search(r'결론|마무리|맺음|conclusion', updated[-1].heading, re.IGNORECASE):
+                position -= 1
+            updated.insert(position, new_section)
+        return updated
+    
+    def create_section_update_task(self, writer, section: Section, items) -> Task:
+        """섹션 하나를 새 근거로 갱신(본문이 없으면 새로 작성)하는 태스크"""
+        if section.body:
+            instruction = f"""아래는 "{self.config.topic}" {self.config.report_type}의 기존 섹션입니다.
+            새로 수집한 근거를 반영해 이 섹션만 갱신하세요.
+            
+            **기존 섹션:**
+            {section.text}"""
+        else:
+            instruction = f"""새로 수집한 근거로 "{self.config.topic}" {self.config.report_type}에 덧붙일
+            새 섹션 "{section.heading.lstrip('# ')}"을 작성하세요."""
+        return Task(
+            description=f"""{instruction}
+            
+            **새 근거 (검색 결과):**
+            {format_evidence(items)}
+            
+            **요구사항:**
+            - 기존 내용 중 여전히 유효한 부분은 유지하고, 새 근거의 최신 정보와 수치를 반영
+            - 새 근거가 기존 내용과 다르면 새 근거를 우선하고 무엇이 바뀌었는지 설명
+            - 섹션 제목 줄 없이 본문만 출력 (다른 섹션이나 보고서 머리말은 쓰지 마세요)
+            - **반드시 {self.config.language}로만** 작성""",
+            expected_output=f"갱신된 섹션 본문 ({self.config.language})",
+            agent=writer
+        )
+    
+    def variant_config(self, quality_mode: str = None, language: str = None,
+                       report_type: str = None) -> ResearchConfig:
+        """현재 설정에서 작성 관련 값만 바꾼 변형 설정"""
+        quality_mode = quality_mode or self.config.quality_mode
+        language = language or self.config.language
+        report_type = report_type or self.config.report_type
+        return ResearchConfig(
+            topic=self.config.topic,
+            search_queries_count=self.config.search_queries_count,
+            word_count_range=self.config.word_count_range,
+            language=language,
+            report_type=report_type,
+            quality_mode=quality_mode,
+            variant=re.sub(r'[^\w-]', '', f"{quality_mode}_{language}_{report_type}")
+        )
+    
+    @log_context()
+    def research_variants(self, variants: List[ResearchConfig],
+                          concurrency: int = LLM_CONCURRENCY) -> Dict[str, Optional[str]]:
+        """계획/검색은 한 번만 실행하고, 같은 연구 결과로 여러 작성 변형을 동시에 생성
+        
+        Returns: {변형 이름: 저장한 보고서 파일명 (실패 시 None)}
+        """
+        profiler = RunProfiler(
+            "UnifiedResearchCrew", self.config.topic,
+            variants=[v.variant for v in variants],
+            search_queries_count=self.config.search_queries_count,
+            model=MODEL_NAME,
+        ).start()
+        saved_files: Dict[str, Optional[str]] = {v.variant: None for v in variants}
+        # 연구 단계의 검색 결과는 모든 변형의 근거 - 변형별 보고서마다 저장해 --refresh 기준으로 쓴다
+        evidence = EvidenceSet()
+        evidence_token = search_evidence.set(evidence)
+        try:
+            logger.info("🚀 '%s' 연구 시작 (작성 변형 %s개)", self.config.topic, len(variants))
+            clear_search_history()
+            
+            # 1. 계획 + 검색 (한 번만)
+            planner, researcher, _ = self.create_agents()
+            research_tasks = list(self.create_research_tasks(planner, researcher))
+            profiler.attach_tasks(research_tasks)
+            crew = Crew(
+                agents=[task.agent for task in research_tasks],
+                tasks=research_tasks,
+                process=Process.sequential,
+                verbose=self.verbose
+            )
+            with profiler.kickoff():
+                crew.kickoff()
+            research_task = research_tasks[-1]
+            if research_task.output is None:
+                logger.error("❌ 연구 단계 결과가 없습니다")
+                return saved_files
+            
+            # 2. 같은 연구 결과(research_task 출력)를 컨텍스트로 변형별 작성 - 동시 실행
+            def write_variant(config: ResearchConfig) -> Optional[str]:
+                variant_crew = UnifiedResearchCrew(config, verbose=self.verbose,
+                                                   stream=self.stream, replan=self.replan)
+                writer = variant_crew.create_writer()
+                write_task = variant_crew.create_write_task(writer, research_task)
+                # 변형은 동시에 작성되므로 stdout 출력 없이 파일로만 스트리밍
+                stream = variant_crew.stream_report(write_task, echo=False)
+                try:
+                    with profiler.span("writer", config.variant) as span:
+                        result = Crew(agents=[writer], tasks=[write_task],
+                                      process=Process.sequential, verbose=self.verbose).kickoff()
+                        span["output_chars"] = len(str(result))
+                    saved = variant_crew.save_result(result, stream)
+                    if saved:
+                        variant_crew.save_evidence(evidence, saved)
+                    return saved
+                finally:
+                    if stream and stream.active:
+                        stream.abort(sys.exc_info()[1] or "작성 미완료")
+            
+            workers = max(1, min(concurrency, len(variants)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="writer") as executor:
+                futures = {executor.submit(contextvars.copy_context().run, write_variant, config): config.variant
+                           for config in variants}
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        saved_files[name] = future.result()
+                    except Exception as e:
+                        logger.error("❌ 작성 변형 '%s' 실패: %s", name, e)
+                    logger.info("%s 작성 변형 '%s' → %s", "✅" if saved_files[name] else "❌",
+                                name, saved_files[name] or "저장 안 됨")
+            return saved_files
+        
+        except Exception as e:
+            logger.error("❌ 연구 실행 실패: %s", e)
+            return saved_files
+        finally:
+            search_evidence.reset(evidence_token)
+            profiler.finish(next((f for f in saved_files.values() if f), None))
+
+def parse_variants(spec: str, crew: UnifiedResearchCrew) -> List[ResearchConfig]:
+    """작성 변형 목록 해석 - 쉼표로 구분한 '품질모드[:언어[:보고서유형]]' (생략한 값은 기본 설정)
+    
+    예: "standard,korean_optimized,standard:English:report"
+    """
+    variants = []
+    seen = set()
+    for item in spec.split(','):
+        parts = [part.strip() for part in item.split(':')]
+        if not parts[0]:
+            continue
+        if parts[0] not in ("standard", "korean_optimized"):
+            raise ValueError(f"알 수 없는 품질 모드: {parts[0]}")
+        parts += [None] * (3 - len(parts))
+        config = crew.variant_config(parts[0], parts[1] or None, parts[2] or None)
+        if config.variant not in seen:
+            seen.add(config.variant)
+            variants.append(config)
+    return variants
+
+# ===== 배치 주제 모드 =====
+class LLMConcurrencyLimiter:
+    """여러 크루가 동시에 실행될 때 전체 LLM 동시 호출 수 제한
+    
+    CrewAI LLM 호출 훅(before/after)에서 세마포어를 잡고 놓는다. 훅은 에이전트 실행 스레드에서
+    동기적으로 호출되므로 스레드당 최대 하나만 보유하며, 호출이 실패해 after 훅이 불리지 않으면
+    같은 스레드의 다음 호출이나 크루 종료 시 release()로 반납된다.
+    """
+    
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._semaphore = threading.BoundedSemaphore(self.limit)
+        self._local = threading.local()
+        self.installed = False
+    
+    def acquire(self):
+        if getattr(self._local, "held", False):
+            return
+        self._semaphore.acquire()
+        self._local.held = True
+    
+    def release(self):
+        if getattr(self._local, "held", False):
+            self._local.held = False
+            self._semaphore.release()
+    
+    def install(self) -> bool:
+        """CrewAI 전역 LLM 훅 등록 (훅 API가 없으면 크루 수로만 제한)"""
+        try:
+            from crewai.hooks import register_before_llm_call_hook, register_after_llm_call_hook
+        except ImportError:
+            logger.warning("CrewAI LLM 훅 API 없음 - LLM 동시 호출 수는 동시 크루 수로만 제한됩니다")
+            return False
+        register_before_llm_call_hook(self._before_llm_call)
+        register_after_llm_call_hook(self._after_llm_call)
+        self.installed = True
+        return True
+    
+    def uninstall(self):
+        if not self.installed:
+            return
+        from crewai.hooks import unregister_before_llm_call_hook, unregister_after_llm_call_hook
+        unregister_before_llm_call_hook(self._before_llm_call)
+        unregister_after_llm_call_hook(self._after_llm_call)
+        self.installed = False
+    
+    def _before_llm_call(self, context):
+        self.acquire()
+        return None
+    
+    def _after_llm_call(self, context):
+        self.release()
+        return None
+
+def load_batch_topics(spec: str) -> List[str]:
+    """배치 주제 목록 해석
+    
+    - "all": 모든 프리셋 주제
+    - 파일 경로: 한 줄에 한 주제 (빈 줄, # 주석 무시)
+    - 그 외: 쉼표로 구분한 주제 또는 프리셋 이름
+    """
+    if spec.strip().lower() == "all":
+        items = list(RESEARCH_PRESETS.values())
+    elif os.path.isfile(spec):
+        with open(spec, encoding='utf-8') as f:
+            items = [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+    else:
+        items = [item.strip() for item in spec.split(',') if item.strip()]
+    
+    # 프리셋 변환 및 중복 제거 (순서 유지)
+    topics = []
+    for item in items:
+        topic = get_preset_topic(item)
+        if topic not in topics:
+            topics.append(topic)
+    return topics
+
+def run_batch(topics: List[str], workers: int = BATCH_WORKERS, llm_concurrency: int = LLM_CONCURRENCY,
+              verbose: bool = False, refresh: bool = False, replan: bool = False, stream: bool = None,
+              **config_kwargs) -> List[Dict[str, Any]]:
+    """여러 주제를 동시에 리서치 - 검색 캐시를 공유하고, 보고서는 끝나는 대로 저장
+    
+    refresh=True이면 주제별로 이전 보고서를 증분 갱신한다 (이전 보고서가 없는 주제는 전체 리서치).
+    replan=True이면 검색 계획 캐시를 쓰지 않는다. stream=False이면 작성 단계를 스트리밍하지 않는다 (기본값 REPORT_STREAM).
+    
+    Returns: 주제별 결과 [{topic, status, seconds, report_file, error}] (입력 순서)
+    """
+    clear_search_history()
+    limiter = LLMConcurrencyLimiter(llm_concurrency)
+    limiter.install()
+    workers = max(1, min(workers, len(topics)))
+    logger.info("📦 배치 리서치 시작: %s개 주제 (동시 크루 %s개, LLM 동시 호출 %s개)",
+                len(topics), workers, limiter.limit)
+    
+    def run_topic(topic: str) -> Dict[str, Any]:
+        crew = UnifiedResearchCrew(ResearchConfig(topic=topic, **config_kwargs), verbose=verbose,
+                                   stream=stream, replan=replan)
+        start = time.perf_counter()
+        error = None
+        try:
+            if refresh:
+                result = crew.refresh(clear_history=False)
+            else:
+                result = crew.research(clear_history=False)
+        except Exception as e:
+            result, error = None, str(e)
+        finally:
+            limiter.release()
+        return {
+            "topic": topic,
+            "status": "success" if result else "failed",
+            "seconds": round(time.perf_counter() - start, 2),
+            "report_file": crew.report_file,
+            "error": error,
+        }
+    
+    batch_start = time.perf_counter()
+    outcomes: Dict[str, Dict[str, Any]] = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="research") as executor:
+            futures = {executor.submit(contextvars.copy_context().run, run_topic, topic): topic for topic in topics}
+            for future in as_completed(futures):
+                outcome = future.result()
+                outcomes[outcome["topic"]] = outcome
+                logger.info("%s [%s/%s] '%s' %.1f초 → %s",
+                            "✅" if outcome["status"] == "success" else "❌",
+                            len(outcomes), len(topics), outcome["topic"], outcome["seconds"],
+                            outcome["report_file"] or "저장 안 됨")
+    finally:
+        limiter.uninstall()
+    
+    results = [outcomes[topic] for topic in topics]
+    save_batch_summary(results, time.perf_counter() - batch_start, workers, limiter.limit)
+    return results
+
+def save_batch_summary(results: List[Dict[str, Any]], wall_time: float, workers: int, llm_concurrency: int):
+    """주제별 소요 시간 요약 출력 및 JSON 저장"""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f"research_batch_summary_{timestamp}.json"
+    sequential_time = sum(r["seconds"] for r in results)
+    succeeded = sum(1 for r in results if r["status"] == "success")
+    
+    print("\n" + "=" * 60)
+    print(f"📦 배치 리서치 요약: {succeeded}/{len(results)}개 성공, 총 {wall_time:.1f}초 "
+          f"(주제별 합계 {sequential_time:.1f}초)")
+    print("=" * 60)
+    for r in sorted(results, key=lambda r: -r["seconds"]):
+        status = "✅" if r["status"] == "success" else "❌"
+        print(f"{status} {r['seconds']:>8.1f}초  {r['topic']}")
+    
+    summary = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "wall_time": round(wall_time, 2),
+        "sequential_time": round(sequential_time, 2),
+        "workers": workers,
+        "llm_concurrency": llm_concurrency,
+        "topics": results,
+    }
+    try:
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"📁 요약 저장: {filename}")
+    except OSError as e:
+        logger.error("❌ 배치 요약 저장 실패: %s", e)
 
 def main():
     """메인 실행 함수 - CLI 인터페이스 포함"""
@@ -493,6 +974,26 @@ def main():
     parser.add_argument('--list-presets', 
                         action='store_true', 
                         help='사용 가능한 프리셋 주제 목록 출력')
+    parser.add_argument('--variants', '-v',
+                        help='한 번의 검색 결과로 여러 보고서 생성 - 쉼표로 구분한 품질모드[:언어[:보고서유형]] '
+                             '(예: standard,korean_optimized,standard:English:report)')
+    parser.add_argument('--batch', '-b',
+                        help='배치 모드 주제 목록 (쉼표 구분, 주제 파일 경로, 또는 all: 모든 프리셋)')
+    parser.add_argument('--workers',
+                        type=int, default=BATCH_WORKERS,
+                        help=f'배치 모드 동시 실행 크루 수 (기본값: {BATCH_WORKERS})')
+    parser.add_argument('--llm-concurrency',
+                        type=int, default=LLM_CONCURRENCY,
+                        help=f'배치 모드 전체 LLM 동시 호출 상한 (기본값: {LLM_CONCURRENCY})')
+    parser.add_argument('--no-stream',
+                        action='store_true',
+                        help='작성 단계 스트리밍 끄기 (완료 후 한 번에 저장)')
+    parser.add_argument('--refresh',
+                        action='store_true',
+                        help='이전 보고서 증분 갱신 - 같은 검색어로 다시 검색해 새 근거가 있는 섹션만 다시 작성')
+    parser.add_argument('--replan',
+                        action='store_true',
+                        help='검색 계획 캐시를 쓰지 않고 다시 계획 (새 계획으로 캐시 갱신)')
     
     args = parser.parse_args()
     
@@ -512,6 +1013,24 @@ def main():
         word_range = (700, 900)
         print("⚠️ 단어 수 형식 오류. 기본값 (700,900) 사용")
     
+    # 배치 모드
+    if args.batch:
+        topics = load_batch_topics(args.batch)
+        if not topics:
+            print("❌ 배치 주제 목록이 비어 있습니다.")
+            return
+        print(f"📦 배치 주제 {len(topics)}개, 동시 크루 {args.workers}개, LLM 동시 호출 {args.llm_concurrency}개")
+        results = run_batch(
+            topics, workers=args.workers, llm_concurrency=args.llm_concurrency,
+            refresh=args.refresh, replan=args.replan, stream=not args.no_stream,
+            search_queries_count=args.queries, word_count_range=word_range,
+            language=args.language, report_type=args.type, quality_mode=args.quality
+        )
+        failed = [r["topic"] for r in results if r["status"] != "success"]
+        if failed:
+            print(f"\n❌ 실패한 주제: {', '.join(failed)}")
+        return
+    
     # 프리셋 확인 및 주제 설정
     topic = get_preset_topic(args.topic)
     
@@ -531,7 +1050,30 @@ def main():
     print(f"🌟 품질 모드: {config.quality_mode}")
     
     # 리서치 실행
-    crew = UnifiedResearchCrew(config)
+    crew = UnifiedResearchCrew(config, stream=not args.no_stream, replan=args.replan)
+    
+    # 멀티 출력 모드: 계획/검색 한 번 + 작성 변형 여러 개
+    if args.variants:
+        try:
+            variants = parse_variants(args.variants, crew)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        print(f"🧩 작성 변형: {', '.join(v.variant for v in variants)}")
+        saved_files = crew.research_variants(variants)
+        for name, filename in saved_files.items():
+            print(f"{'✅' if filename else '❌'} {name}: {filename or '생성 실패'}")
+        return
+    
+    # 증분 갱신 모드
+    if args.refresh:
+        filename = crew.refresh()
+        if filename:
+            print(f"\n✅ '{config.topic}' 보고서 갱신: {filename}")
+        else:
+            print(f"\n❌ 갱신 실패. 로그를 확인해보세요.")
+        return
+    
     result = crew.research()
     
     if result: